@@ -1,6 +1,14 @@
 from flask import Flask, jsonify, request
 from flask_cors import CORS
 from config import Config
+from services.registry import registry
+from services.startup import start_services
+from services.json_provider import FastJSONProvider
+from services.compression import compress_response
+from services.metrics import init_metrics
+from services.tracing import init_tracing
+from services.profiling import init_profiling
+from services.log_pipeline import configure_logging
 import logging
 from datetime import datetime
 
@@ -9,15 +17,8 @@ from routes.auth import auth_bp
 from routes.student import student_bp
 from routes.admin import admin_bp
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('app.log'),
-        logging.StreamHandler()
-    ]
-)
+# Configure logging; file and console output happen on a background thread
+configure_logging(Config.LOG_FILE)
 
 logger = logging.getLogger(__name__)
 
@@ -26,9 +27,25 @@ def create_app():
     app = Flask(__name__)
     app.config.from_object(Config)
     
+    # Fast JSON encoding with consistent datetime/enum handling, compressed above a size threshold
+    app.json = FastJSONProvider(app)
+    app.after_request(compress_response)
+    
+    # Trace ids and sampled request spans first, so every later hook runs inside the request's trace
+    init_tracing(app)
+    
+    # Per-route latency, status, in-flight and Firestore read metrics, served at Config.METRICS_PATH
+    init_metrics(app)
+    
+    # Sampled and admin-requested profiles, downloadable from /api/admin/profiles
+    init_profiling(app)
+    
     # Initialize CORS
     CORS(app, origins=Config.CORS_ORIGINS)
     
+    # Share one set of service clients per worker process
+    registry.init_app(app)
+    
     # Register blueprints
     app.register_blueprint(auth_bp)
     app.register_blueprint(student_bp)
@@ -68,11 +85,21 @@ def create_app():
                 'admin': {
                     'GET /api/admin/applications': 'Get all applications',
                     'GET /api/admin/applications/<id>': 'Get application details',
-                    'POST /api/admin/applications/<id>/approve': 'Approve application',
+                    'POST /api/admin/applications/<id>/approve': 'Approve application and queue disbursement',
                     'POST /api/admin/applications/<id>/reject': 'Reject application',
+                    'POST /api/admin/applications/bulk': 'Approve or reject many applications',
+                    'POST /api/admin/applications/import': 'Import applications from CSV or NDJSON',
+                    'POST /api/admin/payments/<id>/initiate': 'Queue or retry a scholarship disbursement',
+                    'GET /api/admin/payments/<id>/status': 'Get disbursement status',
                     'GET /api/admin/dashboard': 'Get admin dashboard',
                     'GET /api/admin/scholarship-records': 'Get scholarship records',
-                    'GET /api/admin/statistics': 'Get detailed statistics'
+                    'GET /api/admin/scholarship-records/export': 'Stream scholarship records as NDJSON or CSV',
+                    'GET /api/admin/statistics': 'Get detailed statistics and a trend series (?timeframe=all, year, quarter, month or 7d/30d/365d)',
+                    'GET /api/admin/export/statistics': 'Stream a statistics report as CSV, JSON or Parquet',
+                    'POST /api/admin/statistics/rebuild': 'Rebuild statistics from a full recount',
+                    'GET /api/admin/statistics/drift': 'Compare stored statistics with a full recount',
+                    'GET /api/admin/profiles': 'List stored request profiles',
+                    'GET /api/admin/profiles/<id>': 'Download a request profile (collapsed stacks or pstats)'
                 }
             },
             'documentation': 'https://github.com/your-repo/scholarship-dapp/docs'
@@ -82,7 +109,7 @@ def create_app():
     @app.errorhandler(404)
     def not_found(error):
         # Log the requested URL for debugging
-        logger.warning(f"404 Error - Endpoint not found: {request.method} {request.url}")
+        logger.warning("404 Error - Endpoint not found: %s %s", request.method, request.url)
         return jsonify({
             'error': 'Endpoint not found',
             'method': request.method,
@@ -91,7 +118,7 @@ def create_app():
                 'auth': ['/api/auth/login', '/api/auth/profile', '/api/auth/wallet', '/api/auth/verify'],
                 'student': ['/api/student/dashboard', '/api/student/applications', '/api/student/profile', '/api/student/apply'],
                 'admin': ['/api/admin/dashboard', '/api/admin/applications', '/api/admin/statistics'],
-                'health': ['/health', '/api']
+                'health': ['/health', '/api', Config.METRICS_PATH]
             }
         }), 404
     
@@ -104,14 +131,11 @@ def create_app():
         logger.error(f"Internal server error: {error}")
         return jsonify({'error': 'Internal server error'}), 500
     
-    # Flask 3.x compatibility - use before_request instead of before_first_request
+    # Flask 3.x compatibility - use before_request instead of before_first_request.
+    # Under gunicorn the worker's warm-up has normally done this already.
     @app.before_request
     def startup():
-        if not hasattr(app, '_startup_done'):
-            app._startup_done = True
-            logger.info("Scholarship Distribution API starting up...")
-            logger.info(f"Environment: {'Development' if Config.DEBUG else 'Production'}")
-            logger.info(f"Stellar Network: {Config.STELLAR_NETWORK}")
+        start_services(app)
     
     return app
 
@@ -0,0 +1,535 @@
+"""Benchmark every API endpoint through the app factory against local stand-ins.
+
+Firestore, Horizon and Firebase Auth are replaced by the in-process
+stand-ins in benchmarks.stubs with injected latency, so the suite runs
+offline. Each scenario reports p50/p95/p99 latency, throughput and
+downstream calls per request; results can be saved as JSON and compared
+against a previous run to catch regressions.
+
+Run from the backend directory:
+
+    python -m benchmarks.endpoints [--applications 10000] [--requests 200] [--concurrency 8]
+        [--firestore-latency-ms 5] [--horizon-latency-ms 40] [--auth-latency-ms 20]
+        [--storage memory|sqlite] [--only admin.get_all_applications,student.get_student_dashboard]
+        [--output results.json] [--compare baseline.json] [--threshold 0.2]
+
+Seeding a million applications takes several GB of RAM with the memory
+store; use --storage sqlite for the largest datasets.
+"""
+import argparse
+import json
+import logging
+import math
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from stellar_sdk import Keypair, StrKey
+
+from config import Config
+from benchmarks.stubs import DownstreamCalls, InstrumentedStore, Latency, LocalAuth, LocalHorizon
+
+STUDENTS = 50
+APPLICATIONS_PER_WALLET = 20
+SEED_CHUNK_SIZE = 5000
+RECORD_BATCH_SIZE = 400
+BULK_ITEMS = 10
+IMPORT_ROWS = 200
+PROFILES_STORED = 20
+STATUS_WEIGHTS = {'pending': 40, 'approved': 10, 'rejected': 25, 'disbursed': 25}
+ESSAY = ('I am applying for this scholarship to continue my studies and support my family. ' * 3).strip()
+BLUEPRINTS = ('auth', 'student', 'admin')
+
+
+class Scenario:
+    """One endpoint exercised with a request built per iteration"""
+
+    def __init__(self, name: str, endpoint: str, request: Callable[[int, Any], Dict[str, Any]],
+                 expect=(200,), heavy: bool = False, prepare: Optional[Callable] = None):
+        self.name = name
+        self.endpoint = endpoint
+        self.request = request
+        self.expect = set(expect)
+        self.heavy = heavy
+        self.prepare = prepare
+
+
+def _wallet() -> str:
+    return StrKey.encode_ed25519_public_key(os.urandom(32))
+
+
+def _application(wallet: str, status: str, applied_at: datetime, number: int) -> Dict[str, Any]:
+    amount = float(random.randint(5, 50) * 100)
+    application = {
+        'student_wallet': wallet,
+        'student_name': f'Student {number}',
+        'email': f'student{number}@example.edu',
+        'university': 'Example University',
+        'gpa': round(random.uniform(5, 10), 2),
+        'major': 'Computer Science',
+        'year_of_study': random.randint(1, 4),
+        'annual_income': float(random.randint(5, 80) * 1000),
+        'scholarship_amount_requested': amount,
+        'essay': ESSAY,
+        'documents': [],
+        'status': status,
+        'applied_at': applied_at,
+        'reviewed_at': None,
+        'reviewed_by': None,
+        'admin_notes': None,
+        'transaction_hash': None,
+        'disbursed_amount': None
+    }
+    if status != 'pending':
+        application.update({'reviewed_at': applied_at + timedelta(days=3), 'reviewed_by': 'admin'})
+    if status == 'approved':
+        application['approved_amount'] = amount
+    if status == 'disbursed':
+        application.update({'disbursed_amount': amount, 'transaction_hash': os.urandom(32).hex()})
+    return application
+
+
+def _create_pool(firebase, wallets: List[str], status: str, count: int) -> List[Dict[str, Any]]:
+    """Create applications to be consumed one per request, returning them with their ids"""
+    now = datetime.now(timezone.utc)
+    applications = [_application(wallets[i % len(wallets)], status, now, i) for i in range(count)]
+    for application, application_id in zip(applications, firebase.create_applications(applications)):
+        application['id'] = application_id
+    return applications
+
+
+def seed(firebase, auth: LocalAuth, args) -> Dict[str, Any]:
+    """Fill the store with applications, records, users and per-scenario pools"""
+    from services.disbursement_queue import enqueue_disbursement
+
+    wallets = [_wallet() for _ in range(max(STUDENTS, args.applications // APPLICATIONS_PER_WALLET))]
+    statuses = random.choices(list(STATUS_WEIGHTS), weights=list(STATUS_WEIGHTS.values()), k=args.applications)
+    now = datetime.now(timezone.utc)
+    application_ids: List[str] = []
+    student_applications: Dict[str, List[str]] = {wallet: [] for wallet in wallets[:STUDENTS]}
+    records = firebase.db.collection('scholarship_records')
+
+    for start in range(0, args.applications, SEED_CHUNK_SIZE):
+        numbers = range(start, min(start + SEED_CHUNK_SIZE, args.applications))
+        chunk = [
+            _application(wallets[i % len(wallets)], statuses[i], now - timedelta(minutes=random.randint(0, 2 * 365 * 1440)), i)
+            for i in numbers
+        ]
+        ids = firebase.create_applications(chunk)
+
+        batch, pending = firebase.db.batch(), 0
+        for application, application_id in zip(chunk, ids):
+            if len(application_ids) < 1000:
+                application_ids.append(application_id)
+            owned = student_applications.get(application['student_wallet'])
+            if owned is not None and len(owned) < 100:
+                owned.append(application_id)
+            if application['status'] != 'disbursed':
+                continue
+            batch.set(records.document(f'record_{application_id}'), {
+                'student_wallet': application['student_wallet'],
+                'amount': application['disbursed_amount'],
+                'application_id': application_id,
+                'transaction_hash': application['transaction_hash'],
+                'timestamp': application['reviewed_at']
+            })
+            pending += 1
+            if pending == RECORD_BATCH_SIZE:
+                batch.commit()
+                batch, pending = firebase.db.batch(), 0
+        if pending:
+            batch.commit()
+
+    # The seed wrote applied/reviewed dates in the past; recount so the aggregates match them
+    firebase.rebuild_dashboard_stats()
+    firebase.rebuild_rollups()
+
+    users = firebase.db.collection('users')
+    users.document('admin').set({'uid': 'admin', 'email': 'admin@example.edu', 'role': 'admin', 'created_at': now})
+    students = []
+    for number, wallet in enumerate(wallets[:STUDENTS]):
+        uid = f'student-{number}'
+        users.document(uid).set({
+            'uid': uid,
+            'email': f'{uid}@example.edu',
+            'role': 'student',
+            'wallet_address': wallet,
+            'created_at': now,
+            'last_login': now
+        })
+        students.append({'uid': uid, 'wallet': wallet, 'token': auth.token(uid), 'applications': student_applications[wallet]})
+
+    queued = _create_pool(firebase, wallets, 'approved', min(args.requests, 100))
+    for application in queued:
+        enqueue_disbursement(firebase, application, application['approved_amount'], '', 'admin')
+
+    return {
+        'admin_token': auth.token('admin', 'admin@example.edu'),
+        'students': students,
+        'wallets': wallets,
+        'application_ids': application_ids,
+        'approve': _create_pool(firebase, wallets, 'pending', args.requests),
+        'reject': _create_pool(firebase, wallets, 'pending', args.requests),
+        'bulk': _create_pool(firebase, wallets, 'pending', args.requests * BULK_ITEMS),
+        'initiate': _create_pool(firebase, wallets, 'approved', args.requests),
+        'queued': queued
+    }
+
+
+def _bearer(token: str, **headers) -> Dict[str, str]:
+    return {'Authorization': f'Bearer {token}', 'Accept-Encoding': 'gzip', **headers}
+
+
+def _import_body(wallets: List[str], iteration: int) -> bytes:
+    now = datetime.now(timezone.utc)
+    lines = []
+    for row in range(IMPORT_ROWS):
+        application = _application(random.choice(wallets), 'pending', now, iteration * IMPORT_ROWS + row)
+        lines.append(json.dumps({
+            key: value for key, value in application.items()
+            if value is not None and key not in ('status', 'applied_at', 'documents')
+        }))
+    return '\n'.join(lines).encode()
+
+
+def build_scenarios(data: Dict[str, Any]) -> List[Scenario]:
+    admin = data['admin_token']
+    students = data['students']
+    ids = data['application_ids']
+
+    def student(i):
+        return students[i % len(students)]
+
+    def admin_get(path, **kwargs):
+        return lambda i, state: {'method': 'GET', 'path': path, 'headers': _bearer(admin), **kwargs}
+
+    def student_get(path):
+        return lambda i, state: {'method': 'GET', 'path': path, 'headers': _bearer(student(i)['token'])}
+
+    def etag(path, token):
+        def prepare(client):
+            response = client.get(path, headers=_bearer(token))
+            return response.headers.get('ETag')
+        return prepare
+
+    def stored_profiles(client):
+        # Profile a few admin requests so there is something to list and download
+        profile_id = None
+        for _ in range(PROFILES_STORED):
+            response = client.get('/api/admin/dashboard', headers=_bearer(admin, **{Config.PROFILE_HEADER: '1'}))
+            profile_id = response.headers.get('X-Profile-Id', profile_id)
+        return profile_id
+
+    def student_application(i, state):
+        owner = student(i)
+        application_id = owner['applications'][i % len(owner['applications'])] if owner['applications'] else 'missing'
+        return {'method': 'GET', 'path': f'/api/student/applications/{application_id}', 'headers': _bearer(owner['token'])}
+
+    def apply(i, state):
+        owner = student(i)
+        body = _application(owner['wallet'], 'pending', datetime.now(timezone.utc), i)
+        body = {key: value for key, value in body.items() if value is not None and key not in ('status', 'applied_at')}
+        return {'method': 'POST', 'path': '/api/student/apply', 'headers': _bearer(owner['token']), 'json': body}
+
+    def pool_post(pool, action, body):
+        def request(i, state):
+            application = data[pool][i % len(data[pool])]
+            return {
+                'method': 'POST',
+                'path': action.format(id=application['id']),
+                'headers': _bearer(admin),
+                'json': body(application)
+            }
+        return request
+
+    def bulk(i, state):
+        applications = data['bulk'][i * BULK_ITEMS:(i + 1) * BULK_ITEMS]
+        items = [
+            {'id': application['id'], 'decision': 'approve', 'approved_amount': application['scholarship_amount_requested']}
+            if n % 2 == 0 else {'id': application['id'], 'decision': 'reject'}
+            for n, application in enumerate(applications)
+        ]
+        return {'method': 'POST', 'path': '/api/admin/applications/bulk', 'headers': _bearer(admin), 'json': {'items': items}}
+
+    def import_applications(i, state):
+        return {
+            'method': 'POST',
+            'path': '/api/admin/applications/import',
+            'headers': _bearer(admin, **{'Content-Type': 'application/x-ndjson'}),
+            'data': _import_body(data['wallets'], i)
+        }
+
+    admin_applications = '/api/admin/applications?limit=50'
+    return [
+        Scenario('health', 'health_check', lambda i, state: {'method': 'GET', 'path': '/health'}),
+        Scenario('api_info', 'api_info', lambda i, state: {'method': 'GET', 'path': '/api'}),
+
+        Scenario('auth.login', 'auth.login', lambda i, state: {
+            'method': 'POST', 'path': '/api/auth/login', 'json': {'id_token': student(i)['token']}
+        }),
+        Scenario('auth.get_profile', 'auth.get_profile', student_get('/api/auth/profile')),
+        Scenario('auth.update_wallet', 'auth.update_wallet', lambda i, state: {
+            'method': 'PUT', 'path': '/api/auth/wallet', 'headers': _bearer(student(i)['token']),
+            'json': {'wallet_address': student(i)['wallet']}
+        }),
+        Scenario('auth.verify_token', 'auth.verify_token', lambda i, state: {
+            'method': 'POST', 'path': '/api/auth/verify', 'headers': _bearer(student(i)['token'])
+        }),
+
+        Scenario('student.apply_for_scholarship', 'student.apply_for_scholarship', apply, expect=(201,)),
+        Scenario('student.get_student_applications', 'student.get_student_applications',
+                 student_get('/api/student/applications?limit=20')),
+        Scenario('student.get_student_applications[etag]', 'student.get_student_applications',
+                 lambda i, state: {'method': 'GET', 'path': '/api/student/applications?limit=20',
+                                   'headers': _bearer(students[0]['token'], **{'If-None-Match': state or ''})},
+                 expect=(304,), prepare=etag('/api/student/applications?limit=20', students[0]['token'])),
+        Scenario('student.get_application_details', 'student.get_application_details', student_application),
+        Scenario('student.get_student_dashboard', 'student.get_student_dashboard', student_get('/api/student/dashboard')),
+        Scenario('student.get_student_scholarship_records', 'student.get_student_scholarship_records',
+                 student_get('/api/student/scholarship-records?limit=20')),
+        Scenario('student.get_student_profile', 'student.get_student_profile', student_get('/api/student/profile')),
+        Scenario('student.update_student_profile', 'student.update_student_profile', lambda i, state: {
+            'method': 'PUT', 'path': '/api/student/profile', 'headers': _bearer(student(i)['token']),
+            'json': {'wallet_address': student(i)['wallet']}
+        }),
+
+        Scenario('admin.get_all_applications', 'admin.get_all_applications', admin_get(admin_applications)),
+        Scenario('admin.get_all_applications[pending]', 'admin.get_all_applications',
+                 admin_get('/api/admin/applications?limit=50&status=pending')),
+        Scenario('admin.get_all_applications[etag]', 'admin.get_all_applications',
+                 lambda i, state: {'method': 'GET', 'path': admin_applications,
+                                   'headers': _bearer(admin, **{'If-None-Match': state or ''})},
+                 expect=(304,), prepare=etag(admin_applications, admin)),
+        Scenario('admin.get_application_details', 'admin.get_application_details', lambda i, state: {
+            'method': 'GET', 'path': f'/api/admin/applications/{ids[i % len(ids)]}', 'headers': _bearer(admin)
+        }),
+        Scenario('admin.approve_application', 'admin.approve_application', pool_post(
+            'approve', '/api/admin/applications/{id}/approve',
+            lambda application: {'approved_amount': application['scholarship_amount_requested']}
+        ), expect=(202,)),
+        Scenario('admin.reject_application', 'admin.reject_application', pool_post(
+            'reject', '/api/admin/applications/{id}/reject', lambda application: {'admin_notes': 'Incomplete'}
+        )),
+        Scenario('admin.initiate_payment', 'admin.initiate_payment', pool_post(
+            'initiate', '/api/admin/payments/{id}/initiate', lambda application: {}
+        ), expect=(202,)),
+        Scenario('admin.get_payment_status', 'admin.get_payment_status', lambda i, state: {
+            'method': 'GET', 'path': f"/api/admin/payments/{data['queued'][i % len(data['queued'])]['id']}/status",
+            'headers': _bearer(admin)
+        }),
+        Scenario('admin.bulk_review_applications', 'admin.bulk_review_applications', bulk, expect=(202,)),
+        Scenario('admin.import_applications', 'admin.import_applications', import_applications, heavy=True),
+        Scenario('admin.get_admin_dashboard', 'admin.get_admin_dashboard', admin_get('/api/admin/dashboard')),
+        Scenario('admin.get_scholarship_records', 'admin.get_scholarship_records',
+                 admin_get('/api/admin/scholarship-records?limit=50')),
+        Scenario('admin.export_scholarship_records', 'admin.export_scholarship_records',
+                 admin_get('/api/admin/scholarship-records/export?format=ndjson'), heavy=True),
+        Scenario('admin.export_statistics', 'admin.export_statistics',
+                 admin_get('/api/admin/export/statistics?format=csv&timeframe=year'), heavy=True),
+        Scenario('admin.get_detailed_statistics', 'admin.get_detailed_statistics',
+                 admin_get('/api/admin/statistics?timeframe=30d')),
+        Scenario('admin.rebuild_statistics', 'admin.rebuild_statistics', lambda i, state: {
+            'method': 'POST', 'path': '/api/admin/statistics/rebuild', 'headers': _bearer(admin)
+        }, heavy=True),
+        Scenario('admin.get_statistics_drift', 'admin.get_statistics_drift',
+                 admin_get('/api/admin/statistics/drift'), heavy=True),
+        Scenario('admin.get_profiles', 'admin.get_profiles', admin_get('/api/admin/profiles'),
+                 prepare=stored_profiles),
+        Scenario('admin.download_profile', 'admin.download_profile', lambda i, state: {
+            'method': 'GET', 'path': f'/api/admin/profiles/{state}', 'headers': _bearer(admin)
+        }, prepare=stored_profiles)
+    ]
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values), max(1, math.ceil(fraction * len(sorted_values)))) - 1
+    return sorted_values[index]
+
+
+def run_scenario(app, scenario: Scenario, count: int, concurrency: int, calls: DownstreamCalls) -> Dict[str, Any]:
+    state = scenario.prepare(app.test_client()) if scenario.prepare else None
+    statuses: Counter = Counter()
+
+    def one(i):
+        kwargs = scenario.request(i, state)
+        client = app.test_client()
+        started = time.perf_counter()
+        response = client.open(**kwargs)
+        response.get_data()
+        elapsed = time.perf_counter() - started
+        response.close()
+        return elapsed, response.status_code
+
+    before = calls.snapshot()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(one, range(count)))
+    wall = time.perf_counter() - started
+    after = calls.snapshot()
+
+    latencies = sorted(elapsed * 1000 for elapsed, _ in results)
+    for _, status in results:
+        statuses[status] += 1
+    downstream = {name: round((after[name] - before.get(name, 0)) / count, 2) for name in after}
+
+    return {
+        'endpoint': scenario.endpoint,
+        'requests': count,
+        'status_counts': {str(status): total for status, total in sorted(statuses.items())},
+        'errors': sum(total for status, total in statuses.items() if status not in scenario.expect),
+        'p50_ms': round(percentile(latencies, 0.50), 3),
+        'p95_ms': round(percentile(latencies, 0.95), 3),
+        'p99_ms': round(percentile(latencies, 0.99), 3),
+        'mean_ms': round(sum(latencies) / count, 3),
+        'max_ms': round(latencies[-1], 3),
+        'throughput_rps': round(count / wall, 1),
+        'calls_per_request': downstream
+    }
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Return the scenarios whose p50 or p95 grew by more than threshold over the baseline"""
+    regressions = []
+    print(f"\n{'scenario':45} {'p95 base':>10} {'p95 now':>10} {'change':>8}")
+    for name, current in results['scenarios'].items():
+        previous = baseline.get('scenarios', {}).get(name)
+        if not previous:
+            continue
+        change = (current['p95_ms'] - previous['p95_ms']) / previous['p95_ms'] if previous['p95_ms'] else 0.0
+        regressed = any(
+            previous[key] and current[key] > previous[key] * (1 + threshold)
+            for key in ('p50_ms', 'p95_ms')
+        )
+        marker = '  REGRESSION' if regressed else ''
+        print(f"{name:45} {previous['p95_ms']:10.2f} {current['p95_ms']:10.2f} {change:+8.1%}{marker}")
+        if regressed:
+            regressions.append(name)
+    return regressions
+
+
+def build_app(args, calls: DownstreamCalls):
+    from services.firebase_service import FirebaseService
+    from services.local_firestore import MemoryStore, SqliteStore
+    from services.registry import ServiceRegistry
+    from services.stellar_service import StellarService
+    from services.storage import LocalBackend
+    import services.token_verifier as token_verifier
+
+    # The worker would pay queued disbursements in the background and skew the numbers
+    Config.DISBURSEMENT_WORKER_IN_APP = False
+    Config.STELLAR_CHANNEL_SECRETS = []
+    # Only the profile scenarios' own requests are profiled, into a scratch directory
+    Config.PROFILE_SAMPLE_RATE = 0
+    Config.PROFILE_DIR = tempfile.mkdtemp(prefix='benchmark-profiles-')
+    if not Config.ADMIN_SECRET_KEY:
+        Config.ADMIN_SECRET_KEY = Keypair.random().secret
+
+    if args.storage == 'sqlite':
+        inner = SqliteStore(os.path.join(tempfile.mkdtemp(prefix='benchmark-'), 'store.sqlite3'))
+    else:
+        inner = MemoryStore()
+    store = InstrumentedStore(inner, Latency(args.firestore_latency_ms, args.jitter), calls)
+    firebase = FirebaseService(LocalBackend(store))
+    stellar = StellarService(server=LocalHorizon(Latency(args.horizon_latency_ms, args.jitter), calls),
+                             firebase_service=firebase)
+
+    auth = LocalAuth()
+    token_verifier._verifier = auth.verifier(Latency(args.auth_latency_ms, args.jitter), calls)
+
+    from app import create_app
+    app = create_app()
+    ServiceRegistry(firebase_factory=lambda: firebase, stellar_factory=lambda: stellar).init_app(app)
+    logging.getLogger().setLevel(logging.WARNING)
+    return app, firebase, store, auth
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--applications', type=int, default=10000, help='applications to seed (1k to 1M)')
+    parser.add_argument('--requests', type=int, default=200, help='requests per scenario')
+    parser.add_argument('--heavy-requests', type=int, default=5,
+                        help='requests per scenario for exports, imports, rebuilds and drift checks')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--firestore-latency-ms', type=float, default=5)
+    parser.add_argument('--horizon-latency-ms', type=float, default=40)
+    parser.add_argument('--auth-latency-ms', type=float, default=20)
+    parser.add_argument('--jitter', type=float, default=0.2, help='extra random latency as a fraction of the base')
+    parser.add_argument('--storage', choices=('memory', 'sqlite'), default='memory')
+    parser.add_argument('--only', help='comma-separated scenario names to run')
+    parser.add_argument('--list', action='store_true', help='list scenarios and exit')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='write results as JSON to this path')
+    parser.add_argument('--compare', help='baseline JSON to compare against')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='fractional p50/p95 increase over the baseline that counts as a regression')
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    if args.list:
+        for scenario in build_scenarios({'admin_token': '', 'students': [{'token': ''}], 'application_ids': ['']}):
+            print(f"{scenario.name:45} {scenario.endpoint}{'  (heavy)' if scenario.heavy else ''}")
+        return
+
+    calls = DownstreamCalls()
+    app, firebase, store, auth = build_app(args, calls)
+
+    print(f"Seeding {args.applications} applications into {args.storage} storage...")
+    started = time.perf_counter()
+    store.enabled = False
+    data = seed(firebase, auth, args)
+    store.enabled = True
+    print(f"Seeded in {time.perf_counter() - started:.1f}s")
+
+    scenarios = build_scenarios(data)
+    covered = {scenario.endpoint for scenario in scenarios}
+    for rule in app.url_map.iter_rules():
+        if rule.endpoint.split('.')[0] in BLUEPRINTS and rule.endpoint not in covered:
+            print(f"warning: no scenario covers {rule.endpoint} ({rule.rule})", file=sys.stderr)
+
+    if args.only:
+        names = set(args.only.split(','))
+        scenarios = [scenario for scenario in scenarios if scenario.name in names or scenario.endpoint in names]
+
+    results = {
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'settings': {key: value for key, value in vars(args).items() if key not in ('output', 'compare', 'list')},
+        'scenarios': {}
+    }
+
+    print(f"\n{'scenario':45} {'req':>5} {'err':>4} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'rps':>8}  calls/request")
+    for scenario in scenarios:
+        count = args.heavy_requests if scenario.heavy else args.requests
+        result = run_scenario(app, scenario, count, args.concurrency, calls)
+        results['scenarios'][scenario.name] = result
+        downstream = ' '.join(f"{name}={value:g}" for name, value in sorted(result['calls_per_request'].items()) if value)
+        print(f"{scenario.name:45} {count:5d} {result['errors']:4d} {result['p50_ms']:8.2f} "
+              f"{result['p95_ms']:8.2f} {result['p99_ms']:8.2f} {result['throughput_rps']:8.1f}  {downstream}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} scenario(s) regressed by more than {args.threshold:.0%}")
+            sys.exit(1)
+
+    firebase.close()
+
+
+if __name__ == '__main__':
+    main()
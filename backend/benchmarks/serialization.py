@@ -0,0 +1,79 @@
+"""Compare response serialization with Flask's default JSON provider and FastJSONProvider.
+
+Run from the backend directory:
+
+    python -m benchmarks.serialization [--rows 100] [--iterations 2000]
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from google.api_core.datetime_helpers import DatetimeWithNanoseconds
+
+from models import ApplicationStatus
+from services.json_provider import FastJSONProvider, orjson
+
+
+def make_applications(count: int):
+    """Build application dicts shaped like Firestore reads"""
+    now = datetime.now(timezone.utc)
+    statuses = list(ApplicationStatus)
+    rows = []
+    for i in range(count):
+        applied_at = now - timedelta(days=i)
+        rows.append({
+            'id': f'app{i:05d}',
+            'student_wallet': 'G' + ''.join(random.choices('ABCDEFGHIJKLMNOPQRSTUVWXYZ234567', k=55)),
+            'student_name': f'Student {i}',
+            'email': f'student{i}@example.edu',
+            'university': 'Example University',
+            'gpa': round(random.uniform(5, 10), 2),
+            'major': 'Computer Science',
+            'year_of_study': random.randint(1, 4),
+            'scholarship_amount_requested': float(random.randint(100, 5000)),
+            'status': random.choice(statuses),
+            'applied_at': DatetimeWithNanoseconds.fromtimestamp(applied_at.timestamp(), timezone.utc),
+            'reviewed_at': datetime.utcnow() if i % 2 else None,
+            'reviewed_by': 'admin' if i % 2 else None,
+            'admin_notes': 'Looks good' if i % 3 else '',
+            'transaction_hash': f'{i:064x}' if i % 2 else None,
+        })
+    return rows
+
+
+def bench(provider, payload, iterations: int) -> float:
+    """Return the mean seconds per response build"""
+    app = provider._app
+    with app.app_context():
+        provider.response(payload)
+        start = time.perf_counter()
+        for _ in range(iterations):
+            provider.response(payload)
+        return (time.perf_counter() - start) / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100)
+    parser.add_argument('--iterations', type=int, default=2000)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    payload = {'applications': make_applications(args.rows), 'next_page_token': None, 'prev_page_token': None}
+
+    results = {
+        'flask default': bench(DefaultJSONProvider(app), payload, args.iterations),
+        'FastJSONProvider' + ('' if orjson else ' (stdlib fallback)'): bench(FastJSONProvider(app), payload, args.iterations)
+    }
+
+    baseline = results['flask default']
+    print(f"{args.rows}-row application list, {args.iterations} iterations")
+    for name, seconds in results.items():
+        print(f"  {name:<36} {seconds * 1e6:10.1f} us/response  {baseline / seconds:5.1f}x")
+
+
+if __name__ == '__main__':
+    main()
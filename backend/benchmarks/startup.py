@@ -0,0 +1,262 @@
+"""Measure worker startup: import and app creation time, and the first request with and without warm-up.
+
+Every run happens in a fresh interpreter so nothing is already imported or
+cached. Firestore, Horizon and Firebase Auth are the local stand-ins from
+benchmarks.stubs; the services are created on first use, as in a worker.
+Run from the backend directory:
+
+    python -m benchmarks.startup [--runs 5] [--firestore-latency-ms 5] [--horizon-latency-ms 40]
+
+With --gunicorn it instead boots gunicorn (memory storage, no admin key so
+Horizon isn't contacted) with and without preload_app and reports the time
+until every worker has finished warming up and the server's total
+proportional memory (PSS):
+
+    python -m benchmarks.startup --gunicorn [--workers 4] [--runs 3]
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+WARM_REQUESTS = 20
+
+COLUMNS = (
+    ('import_ms', 'import app'),
+    ('create_app_ms', 'create_app()'),
+    ('warm_up_ms', 'warm-up'),
+    ('first_request_ms', 'first request'),
+    ('warm_request_ms', f'next {WARM_REQUESTS} (p50)')
+)
+
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 3)
+
+
+def run_child(args):
+    """One measured startup; prints its timings as JSON"""
+    started = time.perf_counter()
+    import app as app_module
+    result = {'import_ms': _elapsed_ms(started)}
+
+    started = time.perf_counter()
+    app = app_module.create_app()
+    result['create_app_ms'] = _elapsed_ms(started)
+
+    # Stand-ins are set up outside the timed phases
+    import logging
+    from stellar_sdk import Keypair
+    from benchmarks.stubs import DownstreamCalls, InstrumentedStore, Latency, LocalAuth, LocalHorizon
+    from config import Config
+    from services.local_firestore import LocalFirestoreClient, MemoryStore
+    from services.registry import ServiceRegistry
+    import services.token_verifier as token_verifier
+
+    logging.getLogger().setLevel(logging.WARNING)
+    calls = DownstreamCalls()
+    if not Config.ADMIN_SECRET_KEY:
+        Config.ADMIN_SECRET_KEY = Keypair.random().secret
+    auth = LocalAuth()
+    token_verifier._verifier = auth.verifier(Latency(args.auth_latency_ms, 0), calls)
+
+    inner = MemoryStore()
+    wallet = Keypair.random().public_key
+    LocalFirestoreClient(inner).collection('users').document('student').set({
+        'uid': 'student', 'email': 'student@example.edu', 'role': 'student', 'wallet_address': wallet
+    })
+    store = InstrumentedStore(inner, Latency(args.firestore_latency_ms, 0), calls)
+
+    def firebase_factory():
+        from services.firebase_service import FirebaseService
+        from services.storage import LocalBackend
+        return FirebaseService(LocalBackend(store))
+
+    def stellar_factory():
+        from services.stellar_service import StellarService
+        return StellarService(server=LocalHorizon(Latency(args.horizon_latency_ms, 0), calls))
+
+    ServiceRegistry(firebase_factory=firebase_factory, stellar_factory=stellar_factory).init_app(app)
+    client = app.test_client()
+    headers = {'Authorization': f"Bearer {auth.token('student', 'student@example.edu')}"}
+
+    if args.child == 'warm':
+        from services.startup import warm_up
+        started = time.perf_counter()
+        warm_up(app)
+        result['warm_up_ms'] = _elapsed_ms(started)
+
+    started = time.perf_counter()
+    response = client.get('/api/student/dashboard', headers=headers)
+    result['first_request_ms'] = _elapsed_ms(started)
+    result['status'] = response.status_code
+
+    latencies = []
+    for _ in range(WARM_REQUESTS):
+        started = time.perf_counter()
+        client.get('/api/student/dashboard', headers=headers)
+        latencies.append(_elapsed_ms(started))
+    result['warm_request_ms'] = statistics.median(latencies)
+
+    print(json.dumps(result))
+    # Skip interpreter teardown (the in-app disbursement worker, log flushing)
+    os._exit(0)
+
+
+def measure_in_process(args, mode: str) -> Dict[str, Any]:
+    """Median of each phase over args.runs fresh interpreters"""
+    command = [
+        sys.executable, '-m', 'benchmarks.startup', '--child', mode,
+        '--firestore-latency-ms', str(args.firestore_latency_ms),
+        '--horizon-latency-ms', str(args.horizon_latency_ms),
+        '--auth-latency-ms', str(args.auth_latency_ms)
+    ]
+    env = {**os.environ, 'LOG_FILE': os.devnull, 'TRACING_ENABLED': 'False'}
+    runs = []
+    for _ in range(args.runs):
+        output = subprocess.run(command, env=env, capture_output=True, text=True, check=True).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+
+    result = {key: statistics.median([run[key] for run in runs]) for key in runs[0] if key != 'status'}
+    result['errors'] = sum(1 for run in runs if run['status'] != 200)
+    return result
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _pss_mb(pid: int) -> float:
+    """Proportional set size of a process and its children, in MB (Linux only)"""
+    total = 0
+    pids = [pid]
+    try:
+        with open(f'/proc/{pid}/task/{pid}/children') as f:
+            pids += [int(child) for child in f.read().split()]
+    except OSError:
+        pass
+    for process in pids:
+        try:
+            with open(f'/proc/{process}/smaps_rollup') as f:
+                match = re.search(r'^Pss:\s+(\d+) kB', f.read(), re.MULTILINE)
+        except OSError:
+            continue
+        if match:
+            total += int(match.group(1))
+    return round(total / 1024, 1)
+
+
+def boot_gunicorn(workers: int, preload: bool, timeout: float) -> Optional[Dict[str, Any]]:
+    """Start gunicorn, wait until every worker has warmed up, and measure it"""
+    env = {
+        **os.environ,
+        'GUNICORN_PRELOAD': str(preload),
+        'WARMUP_ENABLED': 'True',
+        'STORAGE_BACKEND': 'memory',
+        'ADMIN_SECRET_KEY': '',
+        'LOG_FILE': os.devnull,
+        'PROMETHEUS_MULTIPROC_DIR': tempfile.mkdtemp(prefix='startup-metrics-')
+    }
+    command = [sys.executable, '-m', 'gunicorn', '-w', str(workers), '-b', f'127.0.0.1:{_free_port()}',
+               'app:create_app()']
+
+    ready = threading.Event()
+    warmed = []
+
+    started = time.perf_counter()
+    process = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+
+    def read_log():
+        for line in process.stderr:
+            if 'Worker warm-up finished' in line:
+                warmed.append(time.perf_counter() - started)
+                if len(warmed) == workers:
+                    ready.set()
+
+    reader = threading.Thread(target=read_log, daemon=True)
+    reader.start()
+    try:
+        if not ready.wait(timeout):
+            return None
+        return {
+            'first_worker_ready_s': round(warmed[0], 3),
+            'all_workers_ready_s': round(warmed[-1], 3),
+            'pss_mb': _pss_mb(process.pid)
+        }
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def measure_gunicorn(args, preload: bool) -> Dict[str, Any]:
+    runs = [boot_gunicorn(args.workers, preload, args.timeout) for _ in range(args.runs)]
+    completed = [run for run in runs if run is not None]
+    if not completed:
+        return {'errors': len(runs)}
+    result = {key: statistics.median([run[key] for run in completed]) for key in completed[0]}
+    result['errors'] = len(runs) - len(completed)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--runs', type=int, default=5, help='fresh processes (or server boots) per configuration')
+    parser.add_argument('--firestore-latency-ms', type=float, default=5)
+    parser.add_argument('--horizon-latency-ms', type=float, default=40)
+    parser.add_argument('--auth-latency-ms', type=float, default=20)
+    parser.add_argument('--gunicorn', action='store_true', help='boot gunicorn with and without preload_app')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--timeout', type=float, default=120, help='seconds to wait for a gunicorn boot')
+    parser.add_argument('--output', help='write results as JSON to this path')
+    parser.add_argument('--child', choices=('cold', 'warm'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args)
+        return
+
+    results = {
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'settings': {key: value for key, value in vars(args).items() if key not in ('output', 'child')},
+        'configurations': {}
+    }
+
+    if args.gunicorn:
+        print(f"{'configuration':20} {'first worker s':>15} {'all workers s':>14} {'PSS MB':>8} {'err':>4}")
+        for preload in (False, True):
+            name = 'preload' if preload else 'no preload'
+            result = measure_gunicorn(args, preload)
+            results['configurations'][name] = result
+            print(f"{name:20} {result.get('first_worker_ready_s', float('nan')):15.3f} "
+                  f"{result.get('all_workers_ready_s', float('nan')):14.3f} "
+                  f"{result.get('pss_mb', float('nan')):8.1f} {result['errors']:4d}")
+    else:
+        print(f"{'configuration':20}" + ''.join(f" {label:>16}" for _, label in COLUMNS) + f" {'err':>4}")
+        for mode in ('cold', 'warm'):
+            result = measure_in_process(args, mode)
+            results['configurations'][mode] = result
+            print(f"{mode:20}" + ''.join(
+                f" {result[key]:16.2f}" if key in result else f" {'-':>16}" for key, _ in COLUMNS
+            ) + f" {result['errors']:4d}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,224 @@
+"""Local stand-ins for Firestore, Horizon and Firebase Auth with injected latency.
+
+Each stand-in sleeps for its configured latency before answering and
+counts its calls, so benchmarks can report downstream calls per request
+without any network access.
+"""
+import datetime as dt
+import random
+import threading
+import time
+from collections import Counter
+from typing import Dict, Optional
+
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+from google.auth import crypt, jwt as google_jwt
+from stellar_sdk import Account
+from stellar_sdk.client.response import Response
+from stellar_sdk.exceptions import NotFoundError
+
+from services.local_firestore import DocumentStore
+from services.token_verifier import CertificateCache, TokenVerifier, ID_TOKEN_ISSUER_PREFIX
+
+
+class DownstreamCalls:
+    """Thread-safe counters of calls made to the stand-ins"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts: Counter = Counter()
+
+    def add(self, name: str):
+        with self._lock:
+            self._counts[name] += 1
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counts)
+
+
+class Latency:
+    """Sleeps for a fixed delay plus up to ``jitter`` (a fraction of it) of uniform noise"""
+
+    def __init__(self, milliseconds: float = 0, jitter: float = 0):
+        self.seconds = milliseconds / 1000
+        self.jitter = jitter
+
+    def sleep(self):
+        if self.seconds > 0:
+            time.sleep(self.seconds * (1 + random.uniform(0, self.jitter)))
+
+
+class InstrumentedStore(DocumentStore):
+    """Wraps a local document store, adding latency and counting reads, queries and commits.
+
+    The delay is taken before the wrapped store's lock, so concurrent
+    requests overlap their round trips as they would against Firestore.
+    """
+
+    def __init__(self, store: DocumentStore, latency: Latency, calls: DownstreamCalls):
+        super().__init__()
+        self.store = store
+        self.lock = store.lock
+        self.latency = latency
+        self.calls = calls
+        self.enabled = True
+
+    def _call(self, name: str):
+        if self.enabled:
+            self.calls.add(name)
+            self.latency.sleep()
+
+    def transaction(self):
+        return self.store.transaction()
+
+    def get(self, ref, field_paths=None):
+        self._call('firestore_reads')
+        return self.store.get(ref, field_paths)
+
+    def ids(self, collection):
+        self._call('firestore_queries')
+        return self.store.ids(collection)
+
+    def query(self, query):
+        self._call('firestore_queries')
+        return self.store.query(query)
+
+    def commit(self, writes, reads=None):
+        self._call('firestore_commits')
+        return self.store.commit(writes, reads)
+
+    def close(self):
+        self.store.close()
+
+
+class LocalHorizon:
+    """Horizon stand-in: accepts every transaction and tracks account sequence numbers"""
+
+    def __init__(self, latency: Latency, calls: DownstreamCalls):
+        self.latency = latency
+        self.calls = calls
+        self._lock = threading.Lock()
+        self._sequences: Dict[str, int] = {}
+        self._transactions: Dict[str, Dict] = {}
+
+    def _call(self):
+        self.calls.add('horizon')
+        self.latency.sleep()
+
+    def load_account(self, account_id: str) -> Account:
+        self._call()
+        with self._lock:
+            return Account(account_id, self._sequences.get(account_id, 1000))
+
+    def submit_transaction(self, envelope) -> Dict:
+        self._call()
+        transaction = envelope.transaction
+        source = transaction.source.account_id
+        record = {
+            'hash': envelope.hash_hex(),
+            'ledger': 1,
+            'created_at': dt.datetime.now(dt.timezone.utc).isoformat(),
+            'source_account': source,
+            'fee_charged': transaction.fee,
+            'successful': True,
+            'operation_count': len(transaction.operations)
+        }
+        with self._lock:
+            self._sequences[source] = transaction.sequence
+            self._transactions[record['hash']] = record
+        return record
+
+    def transactions(self):
+        horizon = self
+
+        class _Builder:
+            def transaction(self, transaction_hash: str):
+                self.transaction_hash = transaction_hash
+                return self
+
+            def call(self):
+                horizon._call()
+                record = horizon._transactions.get(self.transaction_hash)
+                if record is None:
+                    raise NotFoundError(Response(404, '{}', {}, ''))
+                return record
+
+        return _Builder()
+
+    def close(self):
+        pass
+
+
+class _StaticCertificates(CertificateCache):
+    def __init__(self, certs: Dict[str, str]):
+        super().__init__()
+        self._certs = certs
+        self._expires_at = float('inf')
+
+
+class _LocalTokenVerifier(TokenVerifier):
+    def __init__(self, latency: Latency, calls: DownstreamCalls, **kwargs):
+        super().__init__(**kwargs)
+        self.latency = latency
+        self.calls = calls
+
+    def _check_revoked(self, claims):
+        # Stands in for the Firebase Auth get_user round trip
+        with self._lock:
+            self.revocation_checks += 1
+        self.calls.add('auth')
+        self.latency.sleep()
+
+
+class LocalAuth:
+    """Issues RS256 ID tokens that the real TokenVerifier accepts, signed by a local key"""
+
+    KEY_ID = 'benchmark'
+
+    def __init__(self, project_id: str = 'benchmark'):
+        self.project_id = project_id
+        key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, 'benchmark')])
+        now = dt.datetime.now(dt.timezone.utc)
+        certificate = (
+            x509.CertificateBuilder()
+            .subject_name(name).issuer_name(name)
+            .public_key(key.public_key())
+            .serial_number(x509.random_serial_number())
+            .not_valid_before(now - dt.timedelta(days=1))
+            .not_valid_after(now + dt.timedelta(days=1))
+            .sign(key, hashes.SHA256())
+        )
+        self._certs = {self.KEY_ID: certificate.public_bytes(serialization.Encoding.PEM).decode()}
+        self._signer = crypt.RSASigner.from_string(
+            key.private_bytes(
+                serialization.Encoding.PEM,
+                serialization.PrivateFormat.PKCS8,
+                serialization.NoEncryption()
+            ),
+            key_id=self.KEY_ID
+        )
+
+    def token(self, uid: str, email: Optional[str] = None) -> str:
+        now = int(time.time())
+        return google_jwt.encode(self._signer, {
+            'iss': ID_TOKEN_ISSUER_PREFIX + self.project_id,
+            'aud': self.project_id,
+            'sub': uid,
+            'email': email or f'{uid}@example.edu',
+            'iat': now,
+            'auth_time': now,
+            'exp': now + 3600
+        }).decode()
+
+    def verifier(self, latency: Latency, calls: DownstreamCalls, cache_size: int = 1024) -> TokenVerifier:
+        return _LocalTokenVerifier(
+            latency, calls,
+            project_id=self.project_id,
+            cache_size=cache_size,
+            certificate_cache=_StaticCertificates(self._certs)
+        )
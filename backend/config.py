@@ -11,10 +11,38 @@ class Config:
     # Firebase
     FIREBASE_CREDENTIALS_PATH = os.environ.get('FIREBASE_CREDENTIALS_PATH', 'firebase-credentials.json')
     FIREBASE_DATABASE_URL = os.environ.get('FIREBASE_DATABASE_URL')
+    FIREBASE_PROJECT_ID = os.environ.get('FIREBASE_PROJECT_ID')
+    
+    # Storage backend: firestore, or memory/sqlite for offline load tests and benchmarks
+    STORAGE_BACKEND = os.environ.get('STORAGE_BACKEND', 'firestore')
+    STORAGE_SQLITE_PATH = os.environ.get('STORAGE_SQLITE_PATH', 'local_store.sqlite3')
+    
+    # ID token verification
+    TOKEN_CACHE_SIZE = int(os.environ.get('TOKEN_CACHE_SIZE', '1024'))
+    TOKEN_CLOCK_SKEW_SECONDS = int(os.environ.get('TOKEN_CLOCK_SKEW_SECONDS', '0'))
     
     # Stellar Network
     STELLAR_NETWORK = os.environ.get('STELLAR_NETWORK', 'testnet')
     STELLAR_HORIZON_URL = os.environ.get('STELLAR_HORIZON_URL', 'https://horizon-testnet.stellar.org')
+    HORIZON_POOL_SIZE = int(os.environ.get('HORIZON_POOL_SIZE', '10'))
+    STELLAR_BAD_SEQ_RETRIES = int(os.environ.get('STELLAR_BAD_SEQ_RETRIES', '2'))
+    # Comma-separated secret keys of funded channel accounts; each one allows
+    # another transaction in flight. Leave empty to submit from the admin account.
+    STELLAR_CHANNEL_SECRETS = [s for s in os.environ.get('STELLAR_CHANNEL_SECRETS', '').split(',') if s]
+    # This process's position among the processes submitting transactions and
+    # their number; each uses its own share of the channel accounts. Set per
+    # worker by gunicorn.conf.py, or by hand when running several
+    # disbursement_worker.py processes
+    WORKER_INDEX = int(os.environ.get('WORKER_INDEX', '0'))
+    WORKER_COUNT = int(os.environ.get('WORKER_COUNT', '1'))
+    
+    # Contract simulation stats are spread over this many counter shards
+    CONTRACT_STATS_SHARDS = int(os.environ.get('CONTRACT_STATS_SHARDS', '10'))
+    CONTRACT_STATS_CACHE_SECONDS = float(os.environ.get('CONTRACT_STATS_CACHE_SECONDS', '5'))
+    
+    # Dashboard statistics, rollups and resource version counters are
+    # incremented on a random one of this many shards
+    STATS_SHARDS = int(os.environ.get('STATS_SHARDS', '10'))
     
     # Smart Contract
     CONTRACT_ID = os.environ.get('CONTRACT_ID')
@@ -25,4 +53,85 @@ class Config:
     
     # Pagination
     DEFAULT_PAGE_SIZE = int(os.environ.get('DEFAULT_PAGE_SIZE', '10'))
-    MAX_PAGE_SIZE = int(os.environ.get('MAX_PAGE_SIZE', '100'))
\ No newline at end of file
+    MAX_PAGE_SIZE = int(os.environ.get('MAX_PAGE_SIZE', '100'))
+    
+    # Response compression (brotli if installed, otherwise gzip)
+    COMPRESSION_ENABLED = os.environ.get('COMPRESSION_ENABLED', 'True').lower() == 'true'
+    COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', '1024'))
+    COMPRESSION_LEVEL = int(os.environ.get('COMPRESSION_LEVEL', '5'))
+    
+    # Logging: records are queued and written by a background thread.
+    # LOG_ROTATION is size, time or none; LOG_FORMAT is text or json.
+    # size and time rotation only work with a single process writing the
+    # file, so gunicorn.conf.py defaults it to none (rotate with logrotate).
+    # LOG_SAMPLE_RATES keeps a fraction of INFO records per logger,
+    # e.g. "services.firebase_service=0.01,routes.auth=0.1"
+    LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+    LOG_FILE = os.environ.get('LOG_FILE', 'app.log')
+    LOG_FORMAT = os.environ.get('LOG_FORMAT', 'text')
+    LOG_ROTATION = os.environ.get('LOG_ROTATION', 'size')
+    LOG_MAX_BYTES = int(os.environ.get('LOG_MAX_BYTES', str(10 * 1024 * 1024)))
+    LOG_ROTATE_WHEN = os.environ.get('LOG_ROTATE_WHEN', 'midnight')
+    LOG_BACKUP_COUNT = int(os.environ.get('LOG_BACKUP_COUNT', '5'))
+    LOG_QUEUE_SIZE = int(os.environ.get('LOG_QUEUE_SIZE', '10000'))
+    LOG_SAMPLE_RATES = os.environ.get('LOG_SAMPLE_RATES', '')
+    
+    # Prometheus metrics; under gunicorn, PROMETHEUS_MULTIPROC_DIR lets /metrics add up every worker.
+    # /metrics answers clients in METRICS_ALLOWED_IPS (addresses or CIDR ranges, loopback by default)
+    # and, when METRICS_TOKEN is set, any client sending it as a Bearer token
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'True').lower() == 'true'
+    METRICS_PATH = os.environ.get('METRICS_PATH', '/metrics')
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+    METRICS_ALLOWED_IPS = [ip for ip in os.environ.get('METRICS_ALLOWED_IPS', '127.0.0.1,::1').split(',') if ip]
+    
+    # Request tracing: every response carries a trace id header; a sampled
+    # fraction of requests have their spans appended to TRACE_EXPORT_PATH as OTLP/JSON
+    # by a background thread; the file is rotated at TRACE_MAX_BYTES.
+    # Callers can ask for their trace with the traceparent sampled flag; each
+    # process grants at most TRACE_PARENT_SAMPLED_PER_SECOND of those requests
+    TRACING_ENABLED = os.environ.get('TRACING_ENABLED', 'True').lower() == 'true'
+    TRACE_SAMPLE_RATE = float(os.environ.get('TRACE_SAMPLE_RATE', '0.01'))
+    TRACE_PARENT_SAMPLED_PER_SECOND = float(os.environ.get('TRACE_PARENT_SAMPLED_PER_SECOND', '1'))
+    TRACE_EXPORT_PATH = os.environ.get('TRACE_EXPORT_PATH', 'traces.jsonl')
+    TRACE_MAX_BYTES = int(os.environ.get('TRACE_MAX_BYTES', str(50 * 1024 * 1024)))
+    TRACE_BACKUP_COUNT = int(os.environ.get('TRACE_BACKUP_COUNT', '3'))
+    TRACE_QUEUE_SIZE = int(os.environ.get('TRACE_QUEUE_SIZE', '1000'))
+    TRACE_ID_HEADER = os.environ.get('TRACE_ID_HEADER', 'X-Trace-Id')
+    
+    # On-demand profiling: admins add the PROFILE_HEADER header (or ?profile=1,
+    # or =pstats) to a request; PROFILE_SAMPLE_RATE profiles a fraction of all
+    # requests. Output is kept in PROFILE_DIR, oldest deleted beyond the limits
+    PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', 'True').lower() == 'true'
+    PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', '0'))
+    PROFILE_HEADER = os.environ.get('PROFILE_HEADER', 'X-Profile')
+    PROFILE_DEFAULT_FORMAT = os.environ.get('PROFILE_DEFAULT_FORMAT', 'collapsed')
+    PROFILE_INTERVAL_MS = float(os.environ.get('PROFILE_INTERVAL_MS', '5'))
+    PROFILE_DIR = os.environ.get('PROFILE_DIR', 'profiles')
+    PROFILE_MAX_FILES = int(os.environ.get('PROFILE_MAX_FILES', '200'))
+    PROFILE_MAX_BYTES = int(os.environ.get('PROFILE_MAX_BYTES', str(50 * 1024 * 1024)))
+    
+    # Worker startup: under gunicorn each worker creates its clients and sends
+    # one request through the app before it accepts traffic
+    WARMUP_ENABLED = os.environ.get('WARMUP_ENABLED', 'True').lower() == 'true'
+    
+    # Concurrent fan-out of independent service calls in route handlers
+    FANOUT_MAX_WORKERS = int(os.environ.get('FANOUT_MAX_WORKERS', '16'))
+    FANOUT_TIMEOUT_SECONDS = float(os.environ.get('FANOUT_TIMEOUT_SECONDS', '10'))
+    
+    # Bulk review
+    BULK_REVIEW_MAX_ITEMS = int(os.environ.get('BULK_REVIEW_MAX_ITEMS', '500'))
+    
+    # Application import
+    IMPORT_CHUNK_SIZE = int(os.environ.get('IMPORT_CHUNK_SIZE', '500'))
+    IMPORT_MAX_REPORTED_ERRORS = int(os.environ.get('IMPORT_MAX_REPORTED_ERRORS', '1000'))
+    
+    # Disbursement queue
+    # Jobs are paid by a single `python disbursement_worker.py` process. Only
+    # set this to True for a lone development server: every web worker would
+    # start its own job worker, all submitting from the same admin account
+    DISBURSEMENT_WORKER_IN_APP = os.environ.get('DISBURSEMENT_WORKER_IN_APP', 'False').lower() == 'true'
+    DISBURSEMENT_WORKER_CONCURRENCY = int(os.environ.get('DISBURSEMENT_WORKER_CONCURRENCY', '4'))
+    DISBURSEMENT_POLL_INTERVAL = float(os.environ.get('DISBURSEMENT_POLL_INTERVAL', '2'))
+    DISBURSEMENT_LEASE_SECONDS = int(os.environ.get('DISBURSEMENT_LEASE_SECONDS', '120'))
+    DISBURSEMENT_MAX_ATTEMPTS = int(os.environ.get('DISBURSEMENT_MAX_ATTEMPTS', '5'))
+    DISBURSEMENT_RETRY_BASE_SECONDS = int(os.environ.get('DISBURSEMENT_RETRY_BASE_SECONDS', '10'))
\ No newline at end of file
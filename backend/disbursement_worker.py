@@ -0,0 +1,38 @@
+"""Standalone disbursement worker.
+
+Processes the disbursement job queue outside the web workers. Run exactly
+one of these next to the web server (leaving DISBURSEMENT_WORKER_IN_APP at
+its default of False) so payments are submitted from one process:
+
+    python disbursement_worker.py
+"""
+import logging
+import signal
+import threading
+
+from services.disbursement_queue import DisbursementWorker
+from services.registry import registry
+from services.log_pipeline import configure_logging
+
+configure_logging()
+
+logger = logging.getLogger(__name__)
+
+
+def main():
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+
+    worker = DisbursementWorker(registry.firebase, registry.stellar)
+    worker.start()
+    logger.info("Disbursement worker running; press Ctrl+C to stop")
+
+    stop.wait()
+    logger.info("Stopping disbursement worker...")
+    worker.stop()
+    registry.teardown()
+
+
+if __name__ == '__main__':
+    main()
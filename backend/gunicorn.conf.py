@@ -0,0 +1,81 @@
+# Gunicorn picks this file up automatically from the working directory.
+import itertools
+import os
+import shutil
+import tempfile
+
+# Threaded (gthread) workers: a long-running streamed export ties up one
+# thread rather than a whole worker process
+threads = int(os.environ.get('GUNICORN_THREADS', '4'))
+
+# Import the app once in the master so workers start with it already loaded
+# and share its memory. Network clients are still created per worker, after
+# the fork (see services.registry), during warm-up in post_worker_init.
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'True').lower() == 'true'
+
+# Every worker appends to the same log file, and workers rotating it
+# themselves would rename it under each other; leave rotation to logrotate.
+# Must be set before the app (and its Config) is loaded.
+os.environ.setdefault('LOG_ROTATION', 'none')
+
+# Each worker writes its metrics to files here and /metrics adds them up.
+# prometheus_client reads this when imported, so it must be set before the app loads.
+metrics_dir = os.environ.setdefault(
+    'PROMETHEUS_MULTIPROC_DIR', os.path.join(tempfile.gettempdir(), 'scholarship-metrics')
+)
+
+
+def on_starting(server):
+    """Start from an empty metrics directory so a previous run's counters aren't added in.
+
+    Warns when workers would each rotate the shared log file. When
+    preloading, also import what the app would otherwise load on first use.
+    """
+    from config import Config
+    if Config.LOG_FILE and Config.LOG_ROTATION != 'none' and server.num_workers > 1:
+        server.log.warning("LOG_ROTATION=%s with %s workers: each worker rotates %s on its own and records will be "
+                           "lost; use LOG_ROTATION=none and rotate with logrotate",
+                           Config.LOG_ROTATION, server.num_workers, Config.LOG_FILE)
+
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir, exist_ok=True)
+    if server.cfg.preload_app:
+        from services.startup import preload_modules
+        preload_modules()
+
+
+def pre_fork(server, worker):
+    """Give the new worker the lowest index no live worker holds"""
+    taken = {getattr(other, 'index', None) for other in server.WORKERS.values()}
+    worker.index = next(index for index in itertools.count() if index not in taken)
+
+
+def post_fork(server, worker):
+    """Tell the worker its index so it submits Stellar transactions from its own channel accounts"""
+    from config import Config
+    Config.WORKER_INDEX = worker.index
+    Config.WORKER_COUNT = server.num_workers
+
+
+def post_worker_init(worker):
+    """Create the worker's clients and warm it up before it accepts connections"""
+    from config import Config
+    from services.startup import warm_up
+    if Config.WARMUP_ENABLED:
+        warm_up(worker.wsgi)
+
+
+def child_exit(server, worker):
+    """Drop a dead worker's live gauges (in-flight requests) from the aggregate"""
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid, metrics_dir)
+
+
+def worker_exit(server, worker):
+    """Finish in-flight disbursements, close the worker's Firestore and Horizon clients, then flush its logs"""
+    from services.disbursement_queue import stop_background_worker
+    from services.log_pipeline import stop_logging
+    from services.registry import registry
+    stop_background_worker()
+    registry.teardown()
+    stop_logging()
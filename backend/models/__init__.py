@@ -33,6 +33,31 @@ class ScholarshipApplication(BaseModel):
     class Config:
         use_enum_values = True
 
+# Fields returned by list endpoints; the essay, documents and financial
+# details are only served by the detail endpoints ("full" view)
+APPLICATION_SUMMARY_FIELDS = [
+    'student_wallet',
+    'student_name',
+    'email',
+    'university',
+    'major',
+    'gpa',
+    'year_of_study',
+    'scholarship_amount_requested',
+    'approved_amount',
+    'status',
+    'applied_at',
+    'reviewed_at',
+    'admin_notes',
+    'disbursed_amount',
+    'transaction_hash',
+]
+
+APPLICATION_VIEWS = {
+    'summary': APPLICATION_SUMMARY_FIELDS,
+    'full': None,
+}
+
 class User(BaseModel):
     uid: str
     email: str
@@ -1,8 +1,21 @@
-from flask import Blueprint, request, jsonify
-from services.auth import admin_required, validate_json, handle_errors
-from services.firebase_service import FirebaseService
-from services.stellar_service import StellarService
-from models import ApplicationStatus
+from flask import Blueprint, Response, request, jsonify, send_file
+from services.auth import admin_required, revocation_required, validate_json, handle_errors
+from services.registry import get_firebase_service, get_stellar_service
+from services.pagination import clamp_page_size
+from services.projection import resolve_application_fields
+from services.export import ndjson_lines, csv_lines, parse_date_param
+from services.disbursement_queue import disbursement_job_data, enqueue_disbursement, job_status
+from services.concurrency import gather
+from services.conditional import conditional_get
+from services.statistics_export import (
+    STATISTICS_EXPORT_FORMATS, APPLICATION_EXPORT_COLUMNS, StatisticsReport, parse_breakdowns, csv_report, json_report, parquet_report, parquet_available
+)
+from services.rollups import timeframe_bounds, series_granularity, build_series, summarize_series
+from services.application_import import detect_import_format, iter_import_rows, validate_import_row, chunked
+from services.resource_versions import APPLICATIONS_VERSION, RECORDS_VERSION
+from services.profiling import PROFILE_FORMATS, list_profiles, profile_path
+from models import ApplicationStatus, APPLICATION_SUMMARY_FIELDS
+from config import Config
 from datetime import datetime
 import logging
 
@@ -10,33 +23,53 @@ logger = logging.getLogger(__name__)
 
 admin_bp = Blueprint('admin', __name__, url_prefix='/api/admin')
 
+RECORD_EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv'
+}
+
+RECORD_EXPORT_COLUMNS = ['id', 'application_id', 'student_wallet', 'amount', 'transaction_hash', 'timestamp']
+
 @admin_bp.route('/applications', methods=['GET'])
 @admin_required
+@conditional_get(lambda: [APPLICATIONS_VERSION])
 @handle_errors
 def get_all_applications():
     """Get all scholarship applications with optional filtering"""
     try:
-        firebase_service = FirebaseService()
+        firebase_service = get_firebase_service()
         
         # Get query parameters
         status = request.args.get('status')
-        limit = int(request.args.get('limit', 50))
+        limit = clamp_page_size(request.args.get('limit'), default=50)
+        page_token = request.args.get('page_token')
+        fields = resolve_application_fields(request.args.get('fields'), request.args.get('view'))
         
         # Validate status if provided
         if status and status not in [s.value for s in ApplicationStatus]:
             return jsonify({'error': f'Invalid status. Valid options: {[s.value for s in ApplicationStatus]}'}), 400
         
-        applications = firebase_service.get_all_applications(status=status, limit=limit)
+        page = firebase_service.get_applications_page(
+            status=status,
+            page_size=limit,
+            page_token=page_token,
+            fields=fields
+        )
+        applications = page['items']
         
         return jsonify({
             'applications': applications,
             'count': len(applications),
+            'next_page_token': page['next_page_token'],
+            'prev_page_token': page['prev_page_token'],
             'filters': {
                 'status': status,
                 'limit': limit
             }
         }), 200
         
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         logger.error(f"Error in get_all_applications: {e}")
         return jsonify({'error': 'Failed to retrieve applications'}), 500
@@ -47,7 +80,7 @@ def get_all_applications():
 def get_application_details(application_id):
     """Get detailed information about a specific application"""
     try:
-        firebase_service = FirebaseService()
+        firebase_service = get_firebase_service()
         application = firebase_service.get_application(application_id)
         
         if not application:
@@ -61,14 +94,14 @@ def get_application_details(application_id):
 
 @admin_bp.route('/applications/<application_id>/approve', methods=['POST'])
 @admin_required
+@revocation_required
 @validate_json(['approved_amount'])
 @handle_errors
 def approve_application(application_id):
-    """Approve an application and release scholarship funds"""
+    """Approve an application and queue the scholarship disbursement"""
     try:
         data = request.json_data
-        firebase_service = FirebaseService()
-        stellar_service = StellarService()
+        firebase_service = get_firebase_service()
         
         # Get application
         application = firebase_service.get_application(application_id)
@@ -84,57 +117,299 @@ def approve_application(application_id):
         if approved_amount <= 0:
             return jsonify({'error': 'Approved amount must be positive'}), 400
         
-        # Release scholarship via smart contract
-        result = stellar_service.release_scholarship(
-            application['student_wallet'], 
-            approved_amount
-        )
-        
-        if not result or not result.get('success'):
-            error_msg = result.get('error', 'Failed to release scholarship on blockchain') if result else 'Blockchain transaction failed'
-            return jsonify({'error': error_msg}), 500
-        
-        # Update application status
+        # Mark as approved and queue the payment in one transaction that
+        # requires the application to still be pending; the disbursement
+        # worker moves it to disbursed once paid
         update_data = {
-            'status': ApplicationStatus.DISBURSED.value,
+            'status': ApplicationStatus.APPROVED.value,
             'reviewed_at': datetime.utcnow(),
             'reviewed_by': request.current_user['uid'],
             'admin_notes': admin_notes,
-            'disbursed_amount': approved_amount,
-            'transaction_hash': result['transaction_hash']
+            'approved_amount': approved_amount
         }
+        job = disbursement_job_data(
+            application_id,
+            application['student_wallet'],
+            approved_amount,
+            admin_notes,
+            request.current_user['uid']
+        )
         
-        success = firebase_service.update_application(application_id, update_data)
-        
-        if not success:
-            logger.error(f"Failed to update application {application_id} after successful blockchain transaction")
-            # Note: The blockchain transaction succeeded, but we failed to update our database
-            # This is a critical issue that needs manual intervention
-        
-        # Create scholarship record
-        record_data = {
-            'student_wallet': application['student_wallet'],
-            'amount': approved_amount,
-            'transaction_hash': result['transaction_hash'],
-            'timestamp': datetime.utcnow(),
-            'application_id': application_id
-        }
+        error = firebase_service.commit_application_reviews([
+            {'id': application_id, 'update': update_data, 'job': job}
+        ])[0]
         
-        firebase_service.create_scholarship_record(record_data)
+        if error == 'Application is not in pending status':
+            return jsonify({'error': error}), 400
+        if error:
+            return jsonify({'error': 'Failed to approve application'}), 500
         
-        logger.info(f"Application {application_id} approved and scholarship disbursed: {approved_amount}")
+        logger.info("Application %s approved, disbursement of %s queued", application_id, approved_amount)
         
         return jsonify({
-            'message': 'Application approved and scholarship disbursed successfully',
-            'transaction_hash': result['transaction_hash'],
+            'message': 'Application approved; scholarship disbursement queued',
             'approved_amount': approved_amount,
-            'status': 'disbursed'
-        }), 200
+            'status': 'approved',
+            'disbursement': job_status({**job, 'id': application_id}),
+            'status_url': f'/api/admin/payments/{application_id}/status'
+        }), 202
         
     except Exception as e:
         logger.error(f"Error in approve_application: {e}")
         return jsonify({'error': 'Failed to approve application'}), 500
 
+@admin_bp.route('/payments/<application_id>/initiate', methods=['POST'])
+@admin_required
+@revocation_required
+@handle_errors
+def initiate_payment(application_id):
+    """Queue (or re-queue after failure) the disbursement of an approved application"""
+    try:
+        # The body is optional: amount and notes default to those given at approval
+        data = request.get_json(silent=True) or {}
+        firebase_service = get_firebase_service()
+        
+        application = firebase_service.get_application(application_id)
+        if not application:
+            return jsonify({'error': 'Application not found'}), 404
+        
+        if application['status'] != ApplicationStatus.APPROVED.value:
+            return jsonify({'error': 'Only approved applications awaiting disbursement can be paid'}), 400
+        
+        amount = float(data.get('amount') or application.get('approved_amount') or application['scholarship_amount_requested'])
+        if amount <= 0:
+            return jsonify({'error': 'Amount must be positive'}), 400
+        
+        job = enqueue_disbursement(
+            firebase_service,
+            application,
+            amount,
+            data.get('admin_notes', application.get('admin_notes', '')),
+            request.current_user['uid']
+        )
+        
+        if not job:
+            return jsonify({'error': 'Failed to queue disbursement'}), 500
+        
+        if not job['created']:
+            return jsonify({
+                'error': 'A disbursement for this application is already in progress',
+                'disbursement': job_status(job)
+            }), 409
+        
+        return jsonify({
+            'message': 'Scholarship disbursement queued',
+            'disbursement': job_status(job),
+            'status_url': f'/api/admin/payments/{application_id}/status'
+        }), 202
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error in initiate_payment: {e}")
+        return jsonify({'error': 'Failed to queue disbursement'}), 500
+
+@admin_bp.route('/payments/<application_id>/status', methods=['GET'])
+@admin_required
+@handle_errors
+def get_payment_status(application_id):
+    """Get the state of an application's disbursement job"""
+    try:
+        job = get_firebase_service().get_disbursement_job(application_id)
+        if not job:
+            return jsonify({'error': 'No disbursement found for this application'}), 404
+        
+        return jsonify({'disbursement': job_status(job)}), 200
+        
+    except Exception as e:
+        logger.error(f"Error in get_payment_status: {e}")
+        return jsonify({'error': 'Failed to get disbursement status'}), 500
+
+@admin_bp.route('/applications/bulk', methods=['POST'])
+@admin_required
+@revocation_required
+@validate_json(['items'])
+@handle_errors
+def bulk_review_applications():
+    """Approve or reject many applications in one request, queueing a disbursement per approval"""
+    try:
+        items = request.json_data['items']
+        firebase_service = get_firebase_service()
+        
+        if not isinstance(items, list) or not items:
+            return jsonify({'error': 'items must be a non-empty list'}), 400
+        
+        if len(items) > Config.BULK_REVIEW_MAX_ITEMS:
+            return jsonify({'error': f'At most {Config.BULK_REVIEW_MAX_ITEMS} items can be reviewed at once'}), 400
+        
+        ids = [item.get('id') for item in items if isinstance(item, dict)]
+        applications = firebase_service.get_applications([i for i in ids if i])
+        
+        results = []
+        reviews = []
+        seen = set()
+        
+        for item in items:
+            item = item if isinstance(item, dict) else {}
+            application_id = item.get('id')
+            decision = item.get('decision')
+            result = {'id': application_id, 'decision': decision, 'success': False}
+            results.append(result)
+            
+            application = applications.get(application_id)
+            if not application_id or application_id in seen:
+                result['error'] = 'Missing or duplicate application id'
+                continue
+            seen.add(application_id)
+            
+            if decision not in ('approve', 'reject'):
+                result['error'] = "decision must be 'approve' or 'reject'"
+                continue
+            
+            if not application:
+                result['error'] = 'Application not found'
+                continue
+            
+            # Checked again inside the transaction; this just skips the obvious ones
+            if application['status'] != ApplicationStatus.PENDING.value:
+                result['error'] = 'Application is not in pending status'
+                continue
+            
+            update_data = {
+                'reviewed_at': datetime.utcnow(),
+                'reviewed_by': request.current_user['uid'],
+                'admin_notes': item.get('admin_notes', '')
+            }
+            job = None
+            
+            if decision == 'reject':
+                update_data['status'] = ApplicationStatus.REJECTED.value
+            else:
+                try:
+                    approved_amount = float(item.get('approved_amount'))
+                except (TypeError, ValueError):
+                    result['error'] = 'approved_amount must be a number'
+                    continue
+                
+                if approved_amount <= 0:
+                    result['error'] = 'Approved amount must be positive'
+                    continue
+                
+                update_data.update({
+                    'status': ApplicationStatus.APPROVED.value,
+                    'approved_amount': approved_amount
+                })
+                job = disbursement_job_data(
+                    application_id,
+                    application['student_wallet'],
+                    approved_amount,
+                    update_data['admin_notes'],
+                    request.current_user['uid']
+                )
+            
+            reviews.append({'id': application_id, 'update': update_data, 'job': job, 'result': result})
+        
+        # Approvals are paid by the disbursement worker, not within this request
+        errors = firebase_service.commit_application_reviews(reviews) if reviews else []
+        
+        queued = 0
+        for review, error in zip(reviews, errors):
+            result = review['result']
+            if error:
+                result['error'] = error
+                continue
+            result['success'] = True
+            result['status'] = review['update']['status']
+            if review['job']:
+                queued += 1
+                result['approved_amount'] = review['update']['approved_amount']
+                result['disbursement'] = job_status({**review['job'], 'id': review['id']})
+                result['status_url'] = f"/api/admin/payments/{review['id']}/status"
+        
+        succeeded = sum(1 for result in results if result['success'])
+        logger.info("Bulk review by %s: %s/%s succeeded, %s disbursements queued",
+                    request.current_user['uid'], succeeded, len(results), queued)
+        
+        return jsonify({
+            'results': results,
+            'summary': {
+                'total': len(results),
+                'succeeded': succeeded,
+                'failed': len(results) - succeeded,
+                'disbursements_queued': queued
+            }
+        }), 202 if queued else 200
+        
+    except Exception as e:
+        logger.error(f"Error in bulk_review_applications: {e}")
+        return jsonify({'error': 'Failed to review applications'}), 500
+
+@admin_bp.route('/applications/import', methods=['POST'])
+@admin_required
+@handle_errors
+def import_applications():
+    """Import applications from a CSV or NDJSON upload"""
+    try:
+        firebase_service = get_firebase_service()
+        stellar_service = get_stellar_service()
+        
+        # Accept either a multipart upload ("file") or the raw request body
+        upload = request.files.get('file')
+        stream = upload.stream if upload else request.stream
+        fmt = detect_import_format(
+            request.args.get('format'),
+            upload.mimetype if upload else request.mimetype,
+            upload.filename if upload else None
+        )
+        
+        imported_by = request.current_user['uid']
+        summary = {'total': 0, 'imported': 0, 'failed': 0}
+        errors = []
+        
+        def report(row_number, messages):
+            summary['failed'] += 1
+            if len(errors) < Config.IMPORT_MAX_REPORTED_ERRORS:
+                errors.append({'row': row_number, 'errors': messages})
+        
+        # Validate and write one chunk at a time so memory stays bounded by the chunk size
+        for chunk in chunked(iter_import_rows(stream, fmt), Config.IMPORT_CHUNK_SIZE):
+            valid_rows = []
+            applications = []
+            for row_number, row, parse_error in chunk:
+                summary['total'] += 1
+                if parse_error:
+                    report(row_number, [parse_error])
+                    continue
+                
+                application, problems = validate_import_row(row, stellar_service.validate_stellar_address, imported_by)
+                if problems:
+                    report(row_number, problems)
+                    continue
+                valid_rows.append(row_number)
+                applications.append(application)
+            
+            if applications:
+                ids = firebase_service.create_applications(applications)
+                for row_number, application_id in zip(valid_rows, ids):
+                    if application_id:
+                        summary['imported'] += 1
+                    else:
+                        report(row_number, ['Failed to save application'])
+        
+        logger.info("Application import by %s: %s", imported_by, summary)
+        
+        return jsonify({
+            'summary': summary,
+            'errors': errors,
+            'errors_truncated': summary['failed'] > len(errors)
+        }), 200
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error in import_applications: {e}")
+        return jsonify({'error': 'Failed to import applications'}), 500
+
 @admin_bp.route('/applications/<application_id>/reject', methods=['POST'])
 @admin_required
 @validate_json()
@@ -143,7 +418,7 @@ def reject_application(application_id):
     """Reject an application"""
     try:
         data = request.json_data
-        firebase_service = FirebaseService()
+        firebase_service = get_firebase_service()
         
         # Get application
         application = firebase_service.get_application(application_id)
@@ -166,7 +441,7 @@ def reject_application(application_id):
         success = firebase_service.update_application(application_id, update_data)
         
         if success:
-            logger.info(f"Application {application_id} rejected")
+            logger.info("Application %s rejected", application_id)
             return jsonify({
                 'message': 'Application rejected successfully',
                 'status': 'rejected'
@@ -180,21 +455,27 @@ def reject_application(application_id):
 
 @admin_bp.route('/dashboard', methods=['GET'])
 @admin_required
+@conditional_get(lambda: [APPLICATIONS_VERSION, RECORDS_VERSION])
 @handle_errors
 def get_admin_dashboard():
     """Get admin dashboard statistics"""
     try:
-        firebase_service = FirebaseService()
-        stellar_service = StellarService()
-        
-        # Get dashboard stats from Firebase
-        stats = firebase_service.get_dashboard_stats()
-        
-        # Get total disbursed from blockchain for verification
-        blockchain_total = stellar_service.get_total_disbursed()
+        firebase_service = get_firebase_service()
+        stellar_service = get_stellar_service()
+        
+        # Stats, blockchain verification and recent applications are fetched concurrently
+        results = gather({
+            'stats': firebase_service.get_dashboard_stats,
+            'blockchain_total': stellar_service.get_total_disbursed,
+            'recent_applications': lambda: firebase_service.get_all_applications(
+                limit=10,
+                fields=APPLICATION_SUMMARY_FIELDS
+            )
+        }, defaults={'blockchain_total': None, 'recent_applications': []})
         
-        # Get recent applications
-        recent_applications = firebase_service.get_all_applications(limit=10)
+        stats = results['stats']
+        blockchain_total = results['blockchain_total']
+        recent_applications = results['recent_applications']
         
         dashboard_data = {
             'statistics': stats,
@@ -219,50 +500,164 @@ def get_admin_dashboard():
 
 @admin_bp.route('/scholarship-records', methods=['GET'])
 @admin_required
+@conditional_get(lambda: [RECORDS_VERSION])
 @handle_errors
 def get_scholarship_records():
     """Get all scholarship disbursement records"""
     try:
-        firebase_service = FirebaseService()
+        firebase_service = get_firebase_service()
         
         # Get query parameters
-        limit = int(request.args.get('limit', 50))
+        limit = clamp_page_size(request.args.get('limit'), default=50)
         student_wallet = request.args.get('student_wallet')
+        page_token = request.args.get('page_token')
         
-        if student_wallet:
-            records = firebase_service.get_scholarship_records_by_student(student_wallet)
-        else:
-            # Get all records (this would need a new method in firebase_service)
-            # For now, we'll return an empty list with a message
-            records = []
+        page = firebase_service.get_scholarship_records_page(
+            student_wallet=student_wallet,
+            page_size=limit,
+            page_token=page_token
+        )
+        records = page['items']
         
         return jsonify({
             'records': records,
             'count': len(records),
+            'next_page_token': page['next_page_token'],
+            'prev_page_token': page['prev_page_token'],
             'filters': {
                 'student_wallet': student_wallet,
                 'limit': limit
             }
         }), 200
         
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         logger.error(f"Error in get_scholarship_records: {e}")
         return jsonify({'error': 'Failed to retrieve scholarship records'}), 500
 
+@admin_bp.route('/scholarship-records/export', methods=['GET'])
+@admin_required
+@handle_errors
+def export_scholarship_records():
+    """Stream the scholarship disbursement ledger as NDJSON or CSV"""
+    try:
+        firebase_service = get_firebase_service()
+        
+        # Get query parameters
+        export_format = request.args.get('format', 'ndjson').lower()
+        student_wallet = request.args.get('student_wallet')
+        start_date = request.args.get('start_date')
+        end_date = request.args.get('end_date')
+        
+        if export_format not in RECORD_EXPORT_FORMATS:
+            return jsonify({'error': f'Invalid format. Valid options: {list(RECORD_EXPORT_FORMATS)}'}), 400
+        
+        start = parse_date_param(start_date, 'start_date') if start_date else None
+        end = parse_date_param(end_date, 'end_date') if end_date else None
+        
+        records = firebase_service.iter_scholarship_records(
+            student_wallet=student_wallet,
+            start=start,
+            end=end
+        )
+        
+        if export_format == 'csv':
+            body = csv_lines(records, RECORD_EXPORT_COLUMNS)
+        else:
+            body = ndjson_lines(records)
+        
+        logger.info("Scholarship records export (%s) started by %s", export_format, request.current_user['uid'])
+        return Response(
+            body,
+            mimetype=RECORD_EXPORT_FORMATS[export_format],
+            headers={'Content-Disposition': f'attachment; filename=scholarship_records.{export_format}'}
+        )
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error in export_scholarship_records: {e}")
+        return jsonify({'error': 'Failed to export scholarship records'}), 500
+
+@admin_bp.route('/export/statistics', methods=['GET'])
+@admin_required
+@handle_errors
+def export_statistics():
+    """Stream a statistics report of applications and disbursements over a timeframe"""
+    try:
+        firebase_service = get_firebase_service()
+        
+        export_format = request.args.get('format', 'csv').lower()
+        timeframe = request.args.get('timeframe', 'all').lower()
+        
+        if export_format not in STATISTICS_EXPORT_FORMATS:
+            return jsonify({'error': f'Invalid format. Valid options: {list(STATISTICS_EXPORT_FORMATS)}'}), 400
+        
+        start, end = timeframe_bounds(timeframe)
+        if request.args.get('start_date'):
+            start = parse_date_param(request.args['start_date'], 'start_date')
+        if request.args.get('end_date'):
+            end = parse_date_param(request.args['end_date'], 'end_date')
+        breakdowns = parse_breakdowns(request.args.get('breakdown'))
+        
+        # Chunked reads: nothing is materialized beyond one chunk and the breakdown totals
+        applications = firebase_service.iter_applications(start, end, fields=APPLICATION_EXPORT_COLUMNS[1:])
+        
+        if export_format == 'parquet':
+            if not parquet_available():
+                return jsonify({'error': 'Parquet export requires the pyarrow package'}), 400
+            body = parquet_report(applications)
+        else:
+            report = StatisticsReport(breakdowns)
+            records = firebase_service.iter_scholarship_records(start=start, end=end)
+            header = {
+                'timeframe': timeframe,
+                'start': start,
+                'end': end,
+                'generated_at': datetime.utcnow(),
+                'breakdowns': ','.join(breakdowns)
+            }
+            report_lines = csv_report if export_format == 'csv' else json_report
+            body = report_lines(header, applications, records, report)
+        
+        logger.info("Statistics export (%s, %s) started by %s", export_format, timeframe, request.current_user['uid'])
+        return Response(
+            body,
+            mimetype=STATISTICS_EXPORT_FORMATS[export_format],
+            headers={'Content-Disposition': f'attachment; filename=scholarship_statistics_{timeframe}.{export_format}'}
+        )
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error in export_statistics: {e}")
+        return jsonify({'error': 'Failed to export statistics'}), 500
+
 @admin_bp.route('/statistics', methods=['GET'])
 @admin_required
+@conditional_get(lambda: [APPLICATIONS_VERSION, RECORDS_VERSION])
 @handle_errors
 def get_detailed_statistics():
-    """Get detailed statistics for analytics"""
+    """Get detailed statistics for analytics, with a trend series for the requested timeframe"""
     try:
-        firebase_service = FirebaseService()
-        stellar_service = StellarService()
+        firebase_service = get_firebase_service()
+        stellar_service = get_stellar_service()
         
-        # Get basic stats
-        stats = firebase_service.get_dashboard_stats()
+        timeframe = request.args.get('timeframe', 'all').lower()
+        start, _ = timeframe_bounds(timeframe)
+        granularity = series_granularity(start)
         
-        # Get blockchain verification
-        blockchain_total = stellar_service.get_total_disbursed()
+        # Get basic stats, the timeframe's rollups and blockchain verification concurrently
+        results = gather({
+            'stats': firebase_service.get_dashboard_stats,
+            'rollups': lambda: firebase_service.get_rollups(granularity, start),
+            'blockchain_total': stellar_service.get_total_disbursed
+        }, defaults={'blockchain_total': None})
+        
+        stats = results['stats']
+        blockchain_total = results['blockchain_total']
+        series = build_series(results['rollups'], start, granularity)
         
         # Calculate additional metrics
         detailed_stats = {
@@ -276,11 +671,89 @@ def get_detailed_statistics():
             'rejection_rate': (
                 stats['rejected_applications'] / stats['total_applications'] * 100
                 if stats['total_applications'] > 0 else 0
-            )
+            ),
+            'timeframe': {
+                'name': timeframe,
+                'start': start,
+                'granularity': granularity,
+                'totals': summarize_series(series),
+                'series': series
+            }
         }
         
         return jsonify(detailed_stats), 200
         
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         logger.error(f"Error in get_detailed_statistics: {e}")
-        return jsonify({'error': 'Failed to retrieve detailed statistics'}), 500
\ No newline at end of file
+        return jsonify({'error': 'Failed to retrieve detailed statistics'}), 500
+
+@admin_bp.route('/statistics/rebuild', methods=['POST'])
+@admin_required
+@handle_errors
+def rebuild_statistics():
+    """Recount all applications and records and reset the stored aggregates"""
+    try:
+        firebase_service = get_firebase_service()
+        stats = firebase_service.rebuild_dashboard_stats()
+        rollups = firebase_service.rebuild_rollups()
+        
+        logger.info("Dashboard statistics rebuilt by %s", request.current_user['uid'])
+        return jsonify({
+            'message': 'Statistics rebuilt successfully',
+            'statistics': stats,
+            'rollup_documents': rollups
+        }), 200
+        
+    except Exception as e:
+        logger.error(f"Error in rebuild_statistics: {e}")
+        return jsonify({'error': 'Failed to rebuild statistics'}), 500
+
+@admin_bp.route('/statistics/drift', methods=['GET'])
+@admin_required
+@handle_errors
+def get_statistics_drift():
+    """Compare the stored aggregates against a full recount"""
+    try:
+        firebase_service = get_firebase_service()
+        return jsonify(firebase_service.check_dashboard_stats_drift()), 200
+        
+    except Exception as e:
+        logger.error(f"Error in get_statistics_drift: {e}")
+        return jsonify({'error': 'Failed to check statistics drift'}), 500
+
+@admin_bp.route('/profiles', methods=['GET'])
+@admin_required
+@handle_errors
+def get_profiles():
+    """List stored request profiles, newest first"""
+    try:
+        profiles = list_profiles()
+        return jsonify({'profiles': profiles, 'count': len(profiles)}), 200
+        
+    except Exception as e:
+        logger.error(f"Error in get_profiles: {e}")
+        return jsonify({'error': 'Failed to list profiles'}), 500
+
+@admin_bp.route('/profiles/<profile_id>', methods=['GET'])
+@admin_required
+@handle_errors
+def download_profile(profile_id):
+    """Download one stored profile as collapsed stacks or a pstats dump"""
+    try:
+        path = profile_path(profile_id)
+        if not path:
+            return jsonify({'error': 'Profile not found'}), 404
+        
+        profile_format = path.rsplit('.', 1)[1]
+        return send_file(
+            path,
+            mimetype=PROFILE_FORMATS[profile_format],
+            as_attachment=True,
+            download_name=f'profile-{profile_id}.{profile_format}'
+        )
+        
+    except Exception as e:
+        logger.error(f"Error in download_profile: {e}")
+        return jsonify({'error': 'Failed to download profile'}), 500
@@ -1,7 +1,6 @@
 from flask import Blueprint, request, jsonify
 from services.auth import auth_required, validate_json, handle_errors
-from services.firebase_service import FirebaseService
-from services.stellar_service import StellarService
+from services.registry import get_firebase_service, get_stellar_service
 from datetime import datetime
 import logging
 
@@ -16,7 +15,7 @@ def login():
     """Authenticate user with Firebase ID token"""
     try:
         data = request.json_data
-        firebase_service = FirebaseService()
+        firebase_service = get_firebase_service()
         
         # Verify the ID token
         decoded_token = firebase_service.verify_token(data['id_token'])
@@ -61,7 +60,7 @@ def login():
             'message': 'Login successful'
         }
         
-        logger.info(f"User {uid} logged in successfully")
+        logger.info("User %s logged in successfully", uid)
         return jsonify(response_data), 200
         
     except Exception as e:
@@ -74,7 +73,7 @@ def login():
 def get_profile():
     """Get current user profile"""
     try:
-        firebase_service = FirebaseService()
+        firebase_service = get_firebase_service()
         user_data = firebase_service.get_user(request.current_user['uid'])
         
         if not user_data:
@@ -104,8 +103,8 @@ def update_wallet():
     """Update user's wallet address"""
     try:
         data = request.json_data
-        firebase_service = FirebaseService()
-        stellar_service = StellarService()
+        firebase_service = get_firebase_service()
+        stellar_service = get_stellar_service()
         
         wallet_address = data['wallet_address']
         
@@ -122,7 +121,7 @@ def update_wallet():
         success = firebase_service.update_user(request.current_user['uid'], update_data)
         
         if success:
-            logger.info(f"Wallet address updated for user {request.current_user['uid']}")
+            logger.info("Wallet address updated for user %s", request.current_user['uid'])
             return jsonify({'message': 'Wallet address updated successfully'}), 200
         else:
             return jsonify({'error': 'Failed to update wallet address'}), 500
@@ -137,7 +136,7 @@ def update_wallet():
 def verify_token():
     """Verify if the current token is valid"""
     try:
-        firebase_service = FirebaseService()
+        firebase_service = get_firebase_service()
         user_data = firebase_service.get_user(request.current_user['uid'])
         
         if not user_data:
@@ -1,8 +1,13 @@
 from flask import Blueprint, request, jsonify
 from services.auth import auth_required, validate_json, handle_errors
-from services.firebase_service import FirebaseService
-from services.stellar_service import StellarService
-from models import ScholarshipApplication, ApplicationStatus
+from services.registry import get_firebase_service, get_stellar_service
+from services.pagination import clamp_page_size
+from services.projection import resolve_application_fields
+from services.concurrency import gather
+from services.conditional import conditional_get
+from services.resource_versions import student_version_key
+from config import Config
+from models import ScholarshipApplication, ApplicationStatus, APPLICATION_SUMMARY_FIELDS
 from datetime import datetime
 import logging
 
@@ -10,6 +15,16 @@ logger = logging.getLogger(__name__)
 
 student_bp = Blueprint('student', __name__, url_prefix='/api/student')
 
+# Applications and scholarship records shown on the dashboard; older ones are
+# paged through /applications and /scholarship-records
+DASHBOARD_PAGE_SIZE = 50
+
+def _student_version_keys():
+    """Version counter for the caller's own applications and records"""
+    user_data = get_firebase_service().get_user(request.current_user['uid'])
+    wallet_address = user_data.get('wallet_address') if user_data else None
+    return [student_version_key(wallet_address)] if wallet_address else None
+
 @student_bp.route('/apply', methods=['POST'])
 @auth_required
 @validate_json(['student_wallet', 'student_name', 'email', 'university', 'gpa', 
@@ -19,8 +34,8 @@ def apply_for_scholarship():
     """Submit a new scholarship application"""
     try:
         data = request.json_data
-        firebase_service = FirebaseService()
-        stellar_service = StellarService()
+        firebase_service = get_firebase_service()
+        stellar_service = get_stellar_service()
         
         # Validate Stellar wallet address
         if not stellar_service.validate_stellar_address(data['student_wallet']):
@@ -44,7 +59,7 @@ def apply_for_scholarship():
         application_id = firebase_service.create_application(application.dict())
         
         if application_id:
-            logger.info(f"New application submitted: {application_id}")
+            logger.info("New application submitted: %s", application_id)
             return jsonify({
                 'message': 'Application submitted successfully',
                 'application_id': application_id,
@@ -59,11 +74,12 @@ def apply_for_scholarship():
 
 @student_bp.route('/applications', methods=['GET'])
 @auth_required
+@conditional_get(_student_version_keys)
 @handle_errors
 def get_student_applications():
     """Get all applications for the authenticated student"""
     try:
-        firebase_service = FirebaseService()
+        firebase_service = get_firebase_service()
         
         # Get user data to find wallet address
         user_data = firebase_service.get_user(request.current_user['uid'])
@@ -81,13 +97,23 @@ def get_student_applications():
                 'wallet_setup_required': True
             }), 200
         
-        applications = firebase_service.get_applications_by_student(wallet_address)
+        page = firebase_service.get_student_applications_page(
+            wallet_address,
+            page_size=clamp_page_size(request.args.get('limit'), default=Config.MAX_PAGE_SIZE),
+            page_token=request.args.get('page_token'),
+            fields=resolve_application_fields(request.args.get('fields'), request.args.get('view'))
+        )
+        applications = page['items']
         
         return jsonify({
             'applications': applications,
-            'count': len(applications)
+            'count': len(applications),
+            'next_page_token': page['next_page_token'],
+            'prev_page_token': page['prev_page_token']
         }), 200
         
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         logger.error(f"Error in get_student_applications: {e}")
         return jsonify({'error': 'Failed to retrieve applications'}), 500
@@ -98,7 +124,7 @@ def get_student_applications():
 def get_application_details(application_id):
     """Get details of a specific application"""
     try:
-        firebase_service = FirebaseService()
+        firebase_service = get_firebase_service()
         application = firebase_service.get_application(application_id)
         
         if not application:
@@ -117,12 +143,13 @@ def get_application_details(application_id):
 
 @student_bp.route('/dashboard', methods=['GET'])
 @auth_required
+@conditional_get(_student_version_keys)
 @handle_errors
 def get_student_dashboard():
     """Get student dashboard data"""
     try:
-        firebase_service = FirebaseService()
-        stellar_service = StellarService()
+        firebase_service = get_firebase_service()
+        stellar_service = get_stellar_service()
         
         # Get user data
         user_data = firebase_service.get_user(request.current_user['uid'])
@@ -157,54 +184,97 @@ def get_student_dashboard():
         
         wallet_address = user_data['wallet_address']
         
-        # Get applications
-        applications = firebase_service.get_applications_by_student(wallet_address)
-        
-        # Get scholarship records
-        scholarship_records = firebase_service.get_scholarship_records_by_student(wallet_address)
-        
-        # Get total received amount from blockchain
-        total_received = stellar_service.get_student_total_amount(wallet_address) or 0.0
-        
-        # Calculate stats
-        total_applications = len(applications)
-        pending_applications = len([app for app in applications if app['status'] == 'pending'])
-        approved_applications = len([app for app in applications if app['status'] in ['approved', 'disbursed']])
-        rejected_applications = len([app for app in applications if app['status'] == 'rejected'])
+        page_size = clamp_page_size(request.args.get('limit'), default=DASHBOARD_PAGE_SIZE)
+        
+        # Applications, scholarship records, the counts and the on-chain total are independent reads
+        results = gather({
+            'applications': lambda: firebase_service.get_student_applications_page(
+                wallet_address,
+                page_size=page_size,
+                fields=APPLICATION_SUMMARY_FIELDS
+            ),
+            'scholarship_records': lambda: firebase_service.get_scholarship_records_page(
+                wallet_address,
+                page_size=page_size
+            ),
+            'counts': lambda: firebase_service.get_student_application_counts(wallet_address),
+            'total_received': lambda: stellar_service.get_student_total_amount(wallet_address)
+        }, defaults={'total_received': None})
+        
+        applications = results['applications']['items']
+        counts = results['counts']
+        total_received = results['total_received'] or 0.0
         
         dashboard_data = {
             'applications': applications,
+            'next_page_token': results['applications']['next_page_token'],
             'recent_applications': applications[:3],  # Frontend expects this field for recent apps
-            'scholarship_history': scholarship_records,
+            'scholarship_history': results['scholarship_records']['items'],
+            'scholarship_history_next_page_token': results['scholarship_records']['next_page_token'],
             'total_received': total_received,
             'total_awarded': total_received,  # Frontend expects this field
             # Flatten stats for direct frontend access
-            'total_applications': total_applications,
-            'pending_applications': pending_applications,
-            'approved_applications': approved_applications,
-            'rejected_applications': rejected_applications,
+            **counts,
             # Keep nested stats for compatibility
-            'stats': {
-                'total_applications': total_applications,
-                'pending_applications': pending_applications,
-                'approved_applications': approved_applications,
-                'rejected_applications': rejected_applications,
-            }
+            'stats': dict(counts)
         }
         
         return jsonify(dashboard_data), 200
         
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         logger.error(f"Error in get_student_dashboard: {e}")
         return jsonify({'error': 'Failed to retrieve dashboard data'}), 500
 
+@student_bp.route('/scholarship-records', methods=['GET'])
+@auth_required
+@conditional_get(_student_version_keys)
+@handle_errors
+def get_student_scholarship_records():
+    """Get the authenticated student's scholarship records, newest first"""
+    try:
+        firebase_service = get_firebase_service()
+        
+        user_data = firebase_service.get_user(request.current_user['uid'])
+        if not user_data:
+            return jsonify({'error': 'User not found'}), 404
+        
+        wallet_address = user_data.get('wallet_address')
+        if not wallet_address:
+            return jsonify({
+                'records': [],
+                'count': 0,
+                'wallet_setup_required': True
+            }), 200
+        
+        page = firebase_service.get_scholarship_records_page(
+            wallet_address,
+            page_size=clamp_page_size(request.args.get('limit'), default=Config.MAX_PAGE_SIZE),
+            page_token=request.args.get('page_token')
+        )
+        records = page['items']
+        
+        return jsonify({
+            'records': records,
+            'count': len(records),
+            'next_page_token': page['next_page_token'],
+            'prev_page_token': page['prev_page_token']
+        }), 200
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error in get_student_scholarship_records: {e}")
+        return jsonify({'error': 'Failed to retrieve scholarship records'}), 500
+
 @student_bp.route('/profile', methods=['GET'])
 @auth_required
 @handle_errors
 def get_student_profile():
     """Get student profile information"""
     try:
-        firebase_service = FirebaseService()
+        firebase_service = get_firebase_service()
         user_data = firebase_service.get_user(request.current_user['uid'])
         
         if not user_data:
@@ -233,8 +303,8 @@ def update_student_profile():
     """Update student profile information"""
     try:
         data = request.json_data
-        firebase_service = FirebaseService()
-        stellar_service = StellarService()
+        firebase_service = get_firebase_service()
+        stellar_service = get_stellar_service()
         
         # Validate Stellar wallet address
         if not stellar_service.validate_stellar_address(data['wallet_address']):
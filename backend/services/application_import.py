@@ -0,0 +1,107 @@
+import csv
+import io
+import json
+from datetime import datetime
+from itertools import islice
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple
+
+from pydantic import TypeAdapter, ValidationError
+
+from models import ScholarshipApplication, ApplicationStatus
+
+IMPORT_FORMATS = ('csv', 'ndjson')
+
+# Built once: TypeAdapter compiles the model's validator up front
+APPLICATION_ADAPTER = TypeAdapter(ScholarshipApplication)
+
+# Fields set by the import itself rather than taken from the file
+_SERVER_FIELDS = ('id', 'status', 'applied_at', 'reviewed_at', 'reviewed_by',
+                  'admin_notes', 'transaction_hash', 'disbursed_amount')
+
+ImportRow = Tuple[int, Optional[Dict[str, Any]], Optional[str]]
+
+
+def detect_import_format(explicit: Optional[str], content_type: Optional[str],
+                         filename: Optional[str] = None) -> str:
+    """Work out the upload format from a query parameter, file name or content type"""
+    if explicit:
+        fmt = explicit.lower()
+    elif filename and '.' in filename:
+        fmt = filename.rsplit('.', 1)[1].lower()
+    elif content_type and 'csv' in content_type:
+        fmt = 'csv'
+    else:
+        fmt = 'ndjson'
+
+    if fmt in ('jsonl', 'json'):
+        fmt = 'ndjson'
+    if fmt not in IMPORT_FORMATS:
+        raise ValueError(f"format must be one of: {', '.join(IMPORT_FORMATS)}")
+    return fmt
+
+
+def iter_import_rows(stream: BinaryIO, fmt: str) -> Iterator[ImportRow]:
+    """Yield (row_number, row, parse_error) from an uploaded file, one line at a time"""
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+
+    if fmt == 'csv':
+        reader = csv.DictReader(text)
+        for row in reader:
+            # Blank cells mean "not provided" so optional fields take their defaults
+            cleaned = {key: value for key, value in row.items() if key and value not in ('', None)}
+            if isinstance(cleaned.get('documents'), str):
+                cleaned['documents'] = [d.strip() for d in cleaned['documents'].split(';') if d.strip()]
+            yield reader.line_num, cleaned, None
+        return
+
+    for line_number, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield line_number, None, f'Invalid JSON: {e}'
+            continue
+        if not isinstance(row, dict):
+            yield line_number, None, 'Each line must be a JSON object'
+            continue
+        yield line_number, row, None
+
+
+def _format_validation_error(error: ValidationError) -> List[str]:
+    return [
+        f"{'.'.join(str(part) for part in item['loc']) or 'row'}: {item['msg']}"
+        for item in error.errors()
+    ]
+
+
+def validate_import_row(row: Dict[str, Any], address_validator: Callable[[str], bool],
+                        imported_by: str) -> Tuple[Optional[Dict[str, Any]], List[str]]:
+    """Validate one row, returning the application to store or the list of problems"""
+    data = {key: value for key, value in row.items() if key not in _SERVER_FIELDS}
+    data.update({
+        'status': ApplicationStatus.PENDING.value,
+        'applied_at': datetime.utcnow()
+    })
+
+    try:
+        application = APPLICATION_ADAPTER.validate_python(data)
+    except ValidationError as e:
+        return None, _format_validation_error(e)
+
+    if not address_validator(application.student_wallet):
+        return None, ['student_wallet: Invalid Stellar wallet address']
+
+    stored = application.model_dump()
+    stored['imported_by'] = imported_by
+    return stored, []
+
+
+def chunked(iterable, size: int):
+    """Yield lists of up to size items"""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
@@ -1,7 +1,10 @@
 from functools import wraps
 from flask import request, jsonify, current_app
 import jwt
-from services.firebase_service import FirebaseService
+from services.registry import get_firebase_service
+from services.token_verifier import TokenRevokedError, get_token_verifier
+from services.tracing import span
+from services.profiling import start_requested_profile
 import logging
 
 logger = logging.getLogger(__name__)
@@ -10,32 +13,34 @@ def auth_required(f):
     """Decorator to require authentication for API endpoints"""
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        token = None
-        
-        # Check for Authorization header
-        if 'Authorization' in request.headers:
-            auth_header = request.headers['Authorization']
-            try:
-                token = auth_header.split(" ")[1]  # Bearer <token>
-            except IndexError:
-                return jsonify({'error': 'Invalid authorization header format'}), 401
-        
-        if not token:
-            return jsonify({'error': 'Authentication token required'}), 401
-        
-        try:
-            firebase_service = FirebaseService()
-            decoded_token = firebase_service.verify_token(token)
+        with span('auth_required'):
+            token = None
             
-            if not decoded_token:
-                return jsonify({'error': 'Invalid or expired token'}), 401
+            # Check for Authorization header
+            if 'Authorization' in request.headers:
+                auth_header = request.headers['Authorization']
+                try:
+                    token = auth_header.split(" ")[1]  # Bearer <token>
+                except IndexError:
+                    return jsonify({'error': 'Invalid authorization header format'}), 401
             
-            # Add user info to request context
-            request.current_user = decoded_token
+            if not token:
+                return jsonify({'error': 'Authentication token required'}), 401
             
-        except Exception as e:
-            logger.error(f"Authentication error: {e}")
-            return jsonify({'error': 'Authentication failed'}), 401
+            try:
+                firebase_service = get_firebase_service()
+                decoded_token = firebase_service.verify_token(token)
+                
+                if not decoded_token:
+                    return jsonify({'error': 'Invalid or expired token'}), 401
+                
+                # Add user info to request context
+                request.current_user = decoded_token
+                request.id_token = token
+                
+            except Exception as e:
+                logger.error(f"Authentication error: {e}")
+                return jsonify({'error': 'Authentication failed'}), 401
         
         return f(*args, **kwargs)
     
@@ -46,18 +51,46 @@ def admin_required(f):
     @wraps(f)
     @auth_required
     def decorated_function(*args, **kwargs):
-        try:
-            firebase_service = FirebaseService()
-            user_data = firebase_service.get_user(request.current_user['uid'])
-            
-            if not user_data or user_data.get('role') != 'admin':
-                return jsonify({'error': 'Admin access required'}), 403
-            
-            request.current_user_data = user_data
-            
-        except Exception as e:
-            logger.error(f"Admin check error: {e}")
-            return jsonify({'error': 'Authorization failed'}), 403
+        with span('admin_required'):
+            try:
+                firebase_service = get_firebase_service()
+                user_data = firebase_service.get_user(request.current_user['uid'])
+                
+                if not user_data or user_data.get('role') != 'admin':
+                    return jsonify({'error': 'Admin access required'}), 403
+                
+                request.current_user_data = user_data
+                start_requested_profile()
+                
+            except Exception as e:
+                logger.error(f"Admin check error: {e}")
+                return jsonify({'error': 'Authorization failed'}), 403
+        
+        return f(*args, **kwargs)
+    
+    return decorated_function
+
+def revocation_required(f):
+    """Decorator to re-check the caller's token against Firebase revocations.
+
+    Verified tokens are cached until they expire, so sensitive endpoints use
+    this after auth_required/admin_required to also reject tokens revoked since.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        with span('revocation_required'):
+            try:
+                get_token_verifier().verify(request.id_token, check_revoked=True)
+                
+            except TokenRevokedError as e:
+                logger.warning("Rejected revoked token: %s", e)
+                return jsonify({'error': 'Token has been revoked'}), 401
+            except ValueError:
+                return jsonify({'error': 'Invalid or expired token'}), 401
+            except Exception as e:
+                # The user lookup failed, which says nothing about the token
+                logger.error(f"Revocation check error: {e}")
+                return jsonify({'error': 'Could not check the token against revocations, please retry'}), 503
         
         return f(*args, **kwargs)
     
@@ -68,22 +101,23 @@ def validate_json(required_fields=None):
     def decorator(f):
         @wraps(f)
         def decorated_function(*args, **kwargs):
-            if not request.is_json:
-                return jsonify({'error': 'Content-Type must be application/json'}), 400
-            
-            data = request.get_json()
-            if not data:
-                return jsonify({'error': 'No JSON data provided'}), 400
-            
-            if required_fields:
-                missing_fields = [field for field in required_fields if field not in data]
-                if missing_fields:
-                    return jsonify({
-                        'error': 'Missing required fields',
-                        'missing_fields': missing_fields
-                    }), 400
-            
-            request.json_data = data
+            with span('validate_json'):
+                if not request.is_json:
+                    return jsonify({'error': 'Content-Type must be application/json'}), 400
+                
+                data = request.get_json()
+                if not data:
+                    return jsonify({'error': 'No JSON data provided'}), 400
+                
+                if required_fields:
+                    missing_fields = [field for field in required_fields if field not in data]
+                    if missing_fields:
+                        return jsonify({
+                            'error': 'Missing required fields',
+                            'missing_fields': missing_fields
+                        }), 400
+                
+                request.json_data = data
             return f(*args, **kwargs)
         
         return decorated_function
@@ -94,7 +128,9 @@ def handle_errors(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
         try:
-            return f(*args, **kwargs)
+            # The view itself; time outside this span is spent in the decorators above
+            with span(f.__name__):
+                return f(*args, **kwargs)
         except ValueError as e:
             return jsonify({'error': f'Invalid input: {str(e)}'}), 400
         except Exception as e:
@@ -0,0 +1,60 @@
+import gzip
+from typing import Optional
+
+from flask import Response, request
+
+from config import Config
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {'application/json', 'application/x-ndjson', 'text/csv', 'text/plain', 'text/html'}
+
+
+def _choose_encoding() -> Optional[str]:
+    accepted = request.accept_encodings
+    if brotli is not None and accepted['br']:
+        return 'br'
+    if accepted['gzip']:
+        return 'gzip'
+    return None
+
+
+def compress_response(response: Response) -> Response:
+    """Compress a buffered response body above Config.COMPRESSION_MIN_SIZE.
+
+    Registered as an after_request hook. Brotli is used when installed and
+    accepted by the client, gzip otherwise. Streamed responses (exports) and
+    bodies that are already encoded are left alone.
+    """
+    if (not Config.COMPRESSION_ENABLED
+            or response.direct_passthrough
+            or response.is_streamed
+            or response.status_code < 200 or response.status_code in (204, 304)
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+
+    response.vary.add('Accept-Encoding')
+
+    if response.content_length is not None and response.content_length < Config.COMPRESSION_MIN_SIZE:
+        return response
+
+    encoding = _choose_encoding()
+    if encoding is None:
+        return response
+
+    body = response.get_data()
+    if len(body) < Config.COMPRESSION_MIN_SIZE:
+        return response
+
+    if encoding == 'br':
+        compressed = brotli.compress(body, quality=Config.COMPRESSION_LEVEL)
+    else:
+        compressed = gzip.compress(body, compresslevel=Config.COMPRESSION_LEVEL)
+
+    response.set_data(compressed)
+    response.headers['Content-Encoding'] = encoding
+    return response
@@ -0,0 +1,81 @@
+import contextvars
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, Optional
+
+from flask import current_app, has_app_context
+
+from config import Config
+from services.profiling import profiled_thread
+
+logger = logging.getLogger(__name__)
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_pid: Optional[int] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Return this process's fan-out pool, creating it after a fork"""
+    global _executor, _executor_pid
+    if _executor is None or _executor_pid != os.getpid():
+        with _executor_lock:
+            if _executor is None or _executor_pid != os.getpid():
+                _executor = ThreadPoolExecutor(max_workers=Config.FANOUT_MAX_WORKERS, thread_name_prefix='fanout')
+                _executor_pid = os.getpid()
+    return _executor
+
+
+def _in_app_context(call: Callable[[], Any]) -> Callable[[], Any]:
+    """Run call inside the caller's app context so registry lookups resolve the same services.
+
+    The caller's context variables are copied too, so per-request state such
+    as the metrics read counter follows the call onto the pool thread, and a
+    profiled request's sampler watches the pool thread while it runs the call.
+    """
+    context = contextvars.copy_context()
+    app = current_app._get_current_object() if has_app_context() else None
+
+    def run():
+        with profiled_thread():
+            if app is None:
+                return call()
+            with app.app_context():
+                return call()
+    return lambda: context.run(run)
+
+
+def gather(calls: Dict[str, Callable[[], Any]], timeout: Optional[float] = None,
+           timeouts: Optional[Dict[str, float]] = None, defaults: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Run independent zero-argument calls concurrently and return their results by name.
+
+    Each call gets `timeout` seconds (or its own entry in `timeouts`),
+    measured from when the batch starts, so the whole fan-out takes about as
+    long as the slowest call. A call that raises or times out yields its
+    entry in `defaults`; calls without a default re-raise. A timed-out call
+    is not interrupted, its result is just no longer waited for.
+    """
+    timeout = timeout if timeout is not None else Config.FANOUT_TIMEOUT_SECONDS
+    timeouts = timeouts or {}
+    defaults = defaults or {}
+
+    executor = _get_executor()
+    started = time.monotonic()
+    futures = {name: executor.submit(_in_app_context(call)) for name, call in calls.items()}
+
+    results = {}
+    for name, future in futures.items():
+        remaining = max(started + timeouts.get(name, timeout) - time.monotonic(), 0)
+        try:
+            results[name] = future.result(timeout=remaining)
+        except Exception as e:
+            if isinstance(e, FutureTimeoutError):
+                e = TimeoutError(f"{name} did not finish within {timeouts.get(name, timeout)}s")
+            if name not in defaults:
+                raise e
+            logger.warning("Fan-out call %s failed, using default: %s", name, e)
+            results[name] = defaults[name]
+    return results
@@ -0,0 +1,56 @@
+import hashlib
+import json
+import logging
+from datetime import datetime, timezone
+from functools import wraps
+from typing import Callable, List, Optional
+
+from flask import Response, make_response, request
+
+from services.registry import get_firebase_service
+from services.tracing import span
+
+logger = logging.getLogger(__name__)
+
+
+def conditional_get(version_keys: Callable[..., Optional[List[str]]]):
+    """Decorator adding an ETag to a GET endpoint and answering If-None-Match with 304.
+
+    version_keys(*view_args) names the resource version counters the
+    response depends on (see FirebaseService.get_resource_versions). The
+    ETag is derived from those counters, the request URL and the caller,
+    so a matching request is answered after a single small read without
+    running the view. Returning None from version_keys skips the check.
+    ETags also change at UTC midnight, when rolling timeframes move on.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            with span('conditional_get') as current:
+                keys = version_keys(*args, **kwargs)
+                versions = get_firebase_service().get_resource_versions(keys) if keys else None
+                if versions is not None:
+                    user = getattr(request, 'current_user', None) or {}
+                    today = datetime.now(timezone.utc).date().isoformat()
+                    payload = json.dumps([request.full_path, user.get('uid'), versions, today], sort_keys=True)
+                    etag = hashlib.sha1(payload.encode('utf-8')).hexdigest()
+                    not_modified = request.if_none_match.contains_weak(etag)
+                    current.set_attribute('http.not_modified', not_modified)
+
+            if versions is None:
+                return f(*args, **kwargs)
+
+            if not_modified:
+                response = Response(status=304)
+            else:
+                response = make_response(f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag, weak=True)
+            # Responses are per-user; clients must revalidate before reusing them
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+
+        return decorated_function
+    return decorator
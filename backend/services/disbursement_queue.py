@@ -0,0 +1,303 @@
+import logging
+import os
+import socket
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Dict, Any, List
+
+from config import Config
+from models import ApplicationStatus
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = 'queued'
+JOB_SUBMITTED = 'submitted'
+JOB_CONFIRMED = 'confirmed'
+JOB_FAILED = 'failed'
+
+# Time allowed after a transaction's time bound for it to show up on Horizon
+LEDGER_SETTLE_SECONDS = 15
+
+# Fields of a job that are only meaningful to workers
+_INTERNAL_JOB_FIELDS = ('worker_id', 'lease_expires_at', 'created')
+
+
+def disbursement_job_data(application_id: str, student_wallet: str, amount: float,
+                          admin_notes: str, reviewed_by: str) -> Dict[str, Any]:
+    """Build a new queued job; it is stored under the application id"""
+    now = datetime.now(timezone.utc)
+    return {
+        'application_id': application_id,
+        'student_wallet': student_wallet,
+        'amount': amount,
+        'admin_notes': admin_notes,
+        'reviewed_by': reviewed_by,
+        'status': JOB_QUEUED,
+        'attempts': 0,
+        'max_attempts': Config.DISBURSEMENT_MAX_ATTEMPTS,
+        'next_attempt_at': now,
+        'lease_expires_at': None,
+        'worker_id': None,
+        'transaction_hash': None,
+        'submitted_at': None,
+        'error': None,
+        'created_at': now,
+        'updated_at': now
+    }
+
+
+def enqueue_disbursement(firebase_service, application: Dict[str, Any], amount: float,
+                         admin_notes: str, reviewed_by: str) -> Optional[Dict[str, Any]]:
+    """Queue the on-chain payment for an approved application.
+
+    The job id is the application id, so an application never has more than
+    one active disbursement. Returns the job (with 'created' False if one was
+    already queued) or None if it could not be stored.
+    """
+    job_data = disbursement_job_data(
+        application['id'], application['student_wallet'], amount, admin_notes, reviewed_by
+    )
+    return firebase_service.create_disbursement_job(application['id'], job_data)
+
+
+def job_status(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the client-facing view of a job"""
+    return {key: value for key, value in job.items() if key not in _INTERNAL_JOB_FIELDS}
+
+
+class DisbursementWorker:
+    """Pays out queued disbursement jobs in the background.
+
+    Due jobs are polled from Firestore and leased so only one worker handles
+    each. Each round's payments go out together, up to 100 per transaction;
+    the Firestore reads and writes around them run on a small thread pool.
+    The transaction hash is saved on the jobs before submission, so a job
+    interrupted mid-payment is resolved by looking the transaction up on
+    Horizon instead of paying twice.
+    """
+
+    def __init__(self, firebase_service, stellar_service, concurrency: Optional[int] = None,
+                 poll_interval: Optional[float] = None, lease_seconds: Optional[int] = None):
+        self.firebase_service = firebase_service
+        self.stellar_service = stellar_service
+        self.concurrency = concurrency or Config.DISBURSEMENT_WORKER_CONCURRENCY
+        self.poll_interval = poll_interval if poll_interval is not None else Config.DISBURSEMENT_POLL_INTERVAL
+        self.lease_seconds = lease_seconds or Config.DISBURSEMENT_LEASE_SECONDS
+        self.worker_id = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='disbursement')
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Run the poll loop on a daemon thread"""
+        self._thread = threading.Thread(target=self.run_forever, name='disbursement-worker', daemon=True)
+        self._thread.start()
+        logger.info("Disbursement worker %s started", self.worker_id)
+
+    def stop(self, timeout: Optional[float] = None):
+        """Stop polling and wait for in-flight jobs to finish"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+        self._executor.shutdown(wait=True)
+
+    def run_forever(self):
+        """Poll for due jobs until stop() is called"""
+        while not self._stop.is_set():
+            try:
+                processed = self.run_once()
+            except Exception as e:
+                logger.error(f"Disbursement worker poll failed: {e}")
+                processed = 0
+            if not processed:
+                self._stop.wait(self.poll_interval)
+
+    def run_once(self) -> int:
+        """Claim one round of due jobs and pay them together, returning how many were processed"""
+        # Imported here so importing the queue (the routes do) doesn't load stellar_sdk
+        from services.stellar_service import MAX_OPERATIONS_PER_TRANSACTION
+        jobs = self.firebase_service.get_due_disbursement_jobs(limit=MAX_OPERATIONS_PER_TRANSACTION)
+        claimed = [job for job in self._executor.map(self._claim, jobs) if job]
+        if not claimed:
+            return 0
+
+        ready = [job for job, pay in zip(claimed, self._executor.map(self.prepare, claimed)) if pay]
+        if ready:
+            self.pay(ready)
+        return len(claimed)
+
+    def _claim(self, job: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        return self.firebase_service.claim_disbursement_job(job['id'], self.worker_id, self.lease_seconds)
+
+    def prepare(self, job: Dict[str, Any]) -> bool:
+        """Settle what can be settled without paying; returns whether the job should be paid now. Never raises"""
+        try:
+            return self._prepare(job)
+        except Exception as e:
+            logger.error(f"Disbursement job {job['id']} failed: {e}")
+            self._retry_or_fail(job, str(e))
+            return False
+
+    def _prepare(self, job: Dict[str, Any]) -> bool:
+        if job.get('transaction_hash'):
+            # An earlier attempt got as far as submitting; find out what happened to it
+            outcome = self.stellar_service.get_transaction_outcome(job['transaction_hash'])
+            if outcome:
+                self._finalize(job, job['transaction_hash'])
+                return False
+            if outcome is None and not self._submission_expired(job):
+                self._reschedule(job, self._submission_deadline(job))
+                return False
+            # The transaction failed or can no longer be included: safe to pay again,
+            # unless the previous attempt was the last and was only rescheduled to
+            # check its submission (this claim hasn't attempted anything yet)
+            if self._out_of_attempts(job, job.get('attempts', 0) - 1):
+                self._fail(job, job.get('error') or 'Disbursement did not reach the ledger')
+                return False
+            return True
+
+        application = self.firebase_service.get_application(job['application_id'])
+        if not application or application['status'] != ApplicationStatus.APPROVED.value:
+            self._fail(job, 'Application is no longer awaiting disbursement')
+            return False
+        return True
+
+    def pay(self, jobs: List[Dict[str, Any]]):
+        """Pay the jobs with as few transactions as possible, then settle each one. Never raises"""
+        def mark_submitted(transaction_hash: str, indexes: List[int]):
+            submitted_at = datetime.now(timezone.utc)
+            saved = self.firebase_service.update_disbursement_jobs([jobs[index]['id'] for index in indexes], {
+                'status': JOB_SUBMITTED,
+                'transaction_hash': transaction_hash,
+                'submitted_at': submitted_at
+            })
+            if not saved:
+                raise RuntimeError('Could not record transaction hash before submission')
+            for index in indexes:
+                jobs[index]['transaction_hash'] = transaction_hash
+                jobs[index]['submitted_at'] = submitted_at
+
+        try:
+            results = self.stellar_service.transfer_xlm_batch(
+                [(job['student_wallet'], job['amount']) for job in jobs], on_submit=mark_submitted
+            )
+        except Exception as e:
+            logger.error(f"Disbursement batch of {len(jobs)} jobs failed: {e}")
+            results = [{'success': False, 'error': str(e)} for _ in jobs]
+
+        for _ in self._executor.map(self._settle, jobs, results):
+            pass
+
+    def _settle(self, job: Dict[str, Any], result: Dict[str, Any]):
+        # success None means the transaction may still land; its hash is on the job,
+        # so the retry checks it before paying again
+        try:
+            if result.get('success'):
+                self._finalize(job, result['transaction_hash'])
+            else:
+                self._retry_or_fail(job, result.get('error') or 'Blockchain transaction failed')
+        except Exception as e:
+            logger.error(f"Disbursement job {job['id']} failed: {e}")
+            self._retry_or_fail(job, str(e))
+
+    def _finalize(self, job: Dict[str, Any], transaction_hash: str):
+        """Record a confirmed payment; safe to repeat if interrupted"""
+        application = self.firebase_service.get_application(job['application_id'])
+        if application and application['status'] != ApplicationStatus.DISBURSED.value:
+            updated = self.firebase_service.update_application(job['application_id'], {
+                'status': ApplicationStatus.DISBURSED.value,
+                'disbursed_amount': job['amount'],
+                'transaction_hash': transaction_hash
+            })
+            if not updated:
+                raise RuntimeError('Payment confirmed but the application could not be updated')
+
+        # The record id is the job id, so a repeated finalize cannot record the payment twice
+        recorded = self.firebase_service.record_confirmed_disbursement(job['id'], {
+            'student_wallet': job['student_wallet'],
+            'amount': job['amount'],
+            'transaction_hash': transaction_hash,
+            'timestamp': datetime.utcnow(),
+            'application_id': job['application_id']
+        })
+        if recorded is None:
+            raise RuntimeError('Payment confirmed but the scholarship record could not be stored')
+
+        self.firebase_service.update_disbursement_job(job['id'], {
+            'status': JOB_CONFIRMED,
+            'transaction_hash': transaction_hash,
+            'confirmed_at': datetime.now(timezone.utc),
+            'lease_expires_at': None,
+            'error': None
+        })
+        logger.info("Disbursement job %s confirmed: %s XLM to %s", job['id'], job['amount'], job['student_wallet'])
+
+    def _retry_or_fail(self, job: Dict[str, Any], error: str):
+        # Never give up while the last submitted transaction could still land
+        if self._out_of_attempts(job, job.get('attempts', 0)) and (
+                not job.get('transaction_hash') or self._submission_expired(job)):
+            self._fail(job, error)
+            return
+
+        delay = Config.DISBURSEMENT_RETRY_BASE_SECONDS * 2 ** (job.get('attempts', 1) - 1)
+        next_attempt_at = datetime.now(timezone.utc) + timedelta(seconds=delay)
+        if job.get('transaction_hash'):
+            # Don't retry before the last submission has had a chance to land
+            next_attempt_at = max(next_attempt_at, self._submission_deadline(job))
+
+        logger.warning("Disbursement job %s attempt %s failed, retrying at %s: %s", job['id'], job.get('attempts'), next_attempt_at, error)
+        self._reschedule(job, next_attempt_at, error)
+
+    def _reschedule(self, job: Dict[str, Any], next_attempt_at: datetime, error: Optional[str] = None):
+        # A job with a transaction hash stays 'submitted' so the next attempt checks it first
+        self.firebase_service.update_disbursement_job(job['id'], {
+            'next_attempt_at': next_attempt_at,
+            'lease_expires_at': None,
+            'error': error
+        })
+
+    def _fail(self, job: Dict[str, Any], error: str):
+        logger.error(f"Disbursement job {job['id']} failed permanently: {error}")
+        self.firebase_service.update_disbursement_job(job['id'], {
+            'status': JOB_FAILED,
+            'lease_expires_at': None,
+            'error': error
+        })
+
+    def _out_of_attempts(self, job: Dict[str, Any], attempts_made: int) -> bool:
+        """Whether a job that has made attempts_made attempts may not be tried again"""
+        return attempts_made >= job.get('max_attempts', Config.DISBURSEMENT_MAX_ATTEMPTS)
+
+    def _submission_deadline(self, job: Dict[str, Any]) -> datetime:
+        # Imported here so importing the queue (the routes do) doesn't load stellar_sdk
+        from services.stellar_service import TRANSACTION_TIMEOUT_SECONDS
+        submitted_at = job.get('submitted_at') or datetime.now(timezone.utc)
+        return submitted_at + timedelta(seconds=TRANSACTION_TIMEOUT_SECONDS + LEDGER_SETTLE_SECONDS)
+
+    def _submission_expired(self, job: Dict[str, Any]) -> bool:
+        return datetime.now(timezone.utc) >= self._submission_deadline(job)
+
+
+_worker: Optional[DisbursementWorker] = None
+_worker_lock = threading.Lock()
+
+
+def start_background_worker(firebase_service, stellar_service) -> DisbursementWorker:
+    """Start this process's in-app disbursement worker if it isn't running yet"""
+    global _worker
+    with _worker_lock:
+        if _worker is None or _worker._stop.is_set():
+            _worker = DisbursementWorker(firebase_service, stellar_service)
+            _worker.start()
+    return _worker
+
+
+def stop_background_worker(timeout: Optional[float] = None):
+    """Stop the in-app disbursement worker, if one was started"""
+    global _worker
+    with _worker_lock:
+        if _worker is not None:
+            _worker.stop(timeout)
+            _worker = None
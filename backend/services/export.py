@@ -0,0 +1,53 @@
+import csv
+import io
+from datetime import datetime, date
+from enum import Enum
+from typing import Iterable, Iterator, Dict, Any, List
+
+from services.json_provider import dumps_bytes
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    return str(value)
+
+
+def ndjson_lines(rows: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    """Serialize rows as newline-delimited JSON, one line at a time"""
+    for row in rows:
+        # Same encoder and datetime format as the JSON API responses
+        yield dumps_bytes(row).decode('utf-8') + '\n'
+
+
+def csv_lines(rows: Iterable[Dict[str, Any]], columns: List[str]) -> Iterator[str]:
+    """Serialize rows as CSV with a header, one line at a time"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush():
+        line = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return line
+
+    writer.writerow(columns)
+    yield flush()
+
+    for row in rows:
+        writer.writerow([
+            _json_default(row.get(column)) if isinstance(row.get(column), (datetime, date, Enum))
+            else row.get(column, '')
+            for column in columns
+        ])
+        yield flush()
+
+
+def parse_date_param(value: str, name: str) -> datetime:
+    """Parse an ISO date or datetime query parameter"""
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f'{name} must be an ISO 8601 date')
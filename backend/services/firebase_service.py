@@ -1,30 +1,96 @@
-import firebase_admin
-from firebase_admin import credentials, firestore, auth
-from typing import Optional, List, Dict, Any
+from firebase_admin import firestore
+from typing import Optional, List, Dict, Any, Iterator, Tuple
+from datetime import datetime, timedelta, timezone
 import logging
+import random
 from config import Config
+from services.pagination import paginate_query, iter_query_chunks
+from services.token_verifier import get_token_verifier
+from services.metrics import instrument_service
+from services.firestore_reads import count_query, get_document, get_documents, stream_query
+from services.sharded_counter import ShardedCounter
+from services.resource_versions import (
+    APPLICATIONS_VERSION, RECORDS_VERSION, RESOURCE_VERSIONS_COLLECTION, student_version_key
+)
+from services.storage import StorageBackend, create_storage_backend
+from services.rollups import (
+    DAILY_ROLLUPS_COLLECTION, MONTHLY_ROLLUPS_COLLECTION, ROLLUP_FIELDS, merge_rollup_shards, rollup_delta,
+    rollup_periods, rollup_shard_id
+)
 
 logger = logging.getLogger(__name__)
 
+STATS_COLLECTION = 'stats'
+DASHBOARD_STATS_DOC = 'dashboard'
+STUDENTS_HELPED_COLLECTION = 'stats_students'
+DISBURSEMENT_JOBS_COLLECTION = 'disbursement_jobs'
+CONTRACT_STAT_COUNTERS = ['total_disbursed', 'total_scholarships', 'total_students']
+DASHBOARD_STAT_COUNTERS = ['total_applications', 'status_counts', 'total_disbursed', 'total_students_helped']
+
+# Firestore rejects batches with more than 500 writes
+BATCH_WRITE_LIMIT = 500
+
+# Statistics writes per batch: the dashboard aggregate and the daily and
+# monthly rollups
+STATS_WRITES = 3
+
+# An imported application writes itself and its student's version counter,
+# plus statistics and the applications version counter per batch
+IMPORT_BATCH_SIZE = (BATCH_WRITE_LIMIT - STATS_WRITES - 1) // 2
+
+# A review writes the application, its disbursement job, a wallet marker and
+# the student's version counter, plus statistics and the applications version
+# counter per transaction
+REVIEW_BATCH_SIZE = (BATCH_WRITE_LIMIT - STATS_WRITES - 1) // 4
+
+
+def _counts_as_approved(status: Optional[str]) -> int:
+    """Approved and disbursed applications both count as approved"""
+    return int(status in ('approved', 'disbursed'))
+
+
+def _format_dashboard_stats(aggregate: Dict[str, Any]) -> Dict[str, Any]:
+    """Shape the stored aggregate into the dashboard stats response"""
+    status_counts = aggregate.get('status_counts', {})
+    return {
+        'total_applications': aggregate.get('total_applications', 0),
+        'pending_applications': status_counts.get('pending', 0),
+        'approved_applications': status_counts.get('approved', 0) + status_counts.get('disbursed', 0),
+        'rejected_applications': status_counts.get('rejected', 0),
+        'total_disbursed': float(aggregate.get('total_disbursed', 0.0)),
+        'total_students_helped': aggregate.get('total_students_helped', 0)
+    }
+
+
+@instrument_service('firebase')
 class FirebaseService:
-    def __init__(self):
-        if not firebase_admin._apps:
-            try:
-                cred = credentials.Certificate(Config.FIREBASE_CREDENTIALS_PATH)
-                firebase_admin.initialize_app(cred, {
-                    'databaseURL': Config.FIREBASE_DATABASE_URL
-                })
-                logger.info("Firebase initialized successfully")
-            except Exception as e:
-                logger.error(f"Failed to initialize Firebase: {e}")
-                raise
+    def __init__(self, storage: Optional[StorageBackend] = None):
+        # Firestore unless Config.STORAGE_BACKEND selects a local store
+        self.storage = storage or create_storage_backend()
+        self.db = self.storage.client
+        self.contract_stats = self._contract_stats_counter()
+        # Not cached: a response is only as fresh as the version counters its ETag is built from
+        self.dashboard_stats = ShardedCounter(
+            self._dashboard_stats_ref(), DASHBOARD_STAT_COUNTERS, num_shards=Config.STATS_SHARDS, cache_seconds=0
+        )
+        self._dashboard_stats_seeded = False
+
+    def close(self):
+        """Close the underlying database client"""
+        self.storage.close()
 
-        self.db = firestore.client()
+    def _contract_stats_counter(self) -> ShardedCounter:
+        return ShardedCounter(
+            self.db.collection('contract_data').document('global_stats'),
+            CONTRACT_STAT_COUNTERS,
+            num_shards=Config.CONTRACT_STATS_SHARDS,
+            cache_seconds=Config.CONTRACT_STATS_CACHE_SECONDS
+        )
 
-    def verify_token(self, id_token: str) -> Optional[Dict[str, Any]]:
+    def verify_token(self, id_token: str, check_revoked: bool = False) -> Optional[Dict[str, Any]]:
         """Verify Firebase ID token and return decoded token"""
         try:
-            decoded_token = auth.verify_id_token(id_token)
+            decoded_token = get_token_verifier().verify(id_token, check_revoked=check_revoked)
             return decoded_token
         except Exception as e:
             logger.error(f"Token verification failed: {e}")
@@ -35,13 +101,13 @@ class FirebaseService:
         try:
             # First try user_profiles collection (new format)
             doc_ref = self.db.collection('user_profiles').document(uid)
-            doc = doc_ref.get()
+            doc = get_document(doc_ref)
             if doc.exists:
                 return doc.to_dict()
             
             # Fallback to users collection (old format)
             doc_ref = self.db.collection('users').document(uid)
-            doc = doc_ref.get()
+            doc = get_document(doc_ref)
             if doc.exists:
                 return doc.to_dict()
                 
@@ -54,7 +120,7 @@ class FirebaseService:
         """Create new user in Firestore"""
         try:
             self.db.collection('users').document(uid).set(user_data)
-            logger.info(f"User {uid} created successfully")
+            logger.info("User %s created successfully", uid)
             return True
         except Exception as e:
             logger.error(f"Failed to create user {uid}: {e}")
@@ -64,7 +130,7 @@ class FirebaseService:
         """Update user data in Firestore"""
         try:
             self.db.collection('users').document(uid).update(update_data)
-            logger.info(f"User {uid} updated successfully")
+            logger.info("User %s updated successfully", uid)
             return True
         except Exception as e:
             logger.error(f"Failed to update user {uid}: {e}")
@@ -73,19 +139,69 @@ class FirebaseService:
     def create_application(self, application_data: Dict[str, Any]) -> Optional[str]:
         """Create new scholarship application"""
         try:
-            doc_ref = self.db.collection('applications').add(application_data)
-            application_id = doc_ref[1].id
-            logger.info(f"Application {application_id} created successfully")
+            doc_ref = self.db.collection('applications').document()
+            status = application_data.get('status', 'pending')
+            wallet = application_data.get('student_wallet')
+
+            def create_in_transaction(transaction):
+                helped_change = self._update_student_helped(
+                    transaction, wallet, _counts_as_approved(status)
+                )
+                transaction.set(doc_ref, application_data)
+                self._bump_versions(transaction, [APPLICATIONS_VERSION, student_version_key(wallet)])
+                self._write_stats_delta(
+                    transaction,
+                    new_applications=1,
+                    status_changes={status: 1},
+                    students_helped=helped_change
+                )
+
+            self._run_transaction(create_in_transaction)
+            application_id = doc_ref.id
+            logger.info("Application %s created successfully", application_id)
             return application_id
         except Exception as e:
             logger.error(f"Failed to create application: {e}")
             return None
 
+    def create_applications(self, applications: List[Dict[str, Any]]) -> List[Optional[str]]:
+        """Create many new pending applications with batched writes.
+
+        Each WriteBatch chunk also carries the matching statistics and version
+        increments. Returns the new document id per application, or None
+        where its chunk failed to commit.
+        """
+        collection = self.db.collection('applications')
+        ids: List[Optional[str]] = []
+        for start in range(0, len(applications), IMPORT_BATCH_SIZE):
+            chunk = applications[start:start + IMPORT_BATCH_SIZE]
+            try:
+                batch = self.db.batch()
+                refs = []
+                status_changes: Dict[str, int] = {}
+                for application_data in chunk:
+                    doc_ref = collection.document()
+                    batch.create(doc_ref, application_data)
+                    refs.append(doc_ref)
+                    status = application_data.get('status', 'pending')
+                    status_changes[status] = status_changes.get(status, 0) + 1
+
+                self._bump_versions(batch, [APPLICATIONS_VERSION] + [
+                    student_version_key(application_data.get('student_wallet')) for application_data in chunk
+                ])
+                self._write_stats_delta(batch, new_applications=len(chunk), status_changes=status_changes)
+                batch.commit()
+                ids.extend(doc_ref.id for doc_ref in refs)
+            except Exception as e:
+                logger.error(f"Failed to create {len(chunk)} applications: {e}")
+                ids.extend([None] * len(chunk))
+        return ids
+
     def get_application(self, application_id: str) -> Optional[Dict[str, Any]]:
         """Get application by ID"""
         try:
             doc_ref = self.db.collection('applications').document(application_id)
-            doc = doc_ref.get()
+            doc = get_document(doc_ref)
             if doc.exists:
                 data = doc.to_dict()
                 data['id'] = doc.id
@@ -95,42 +211,172 @@ class FirebaseService:
             logger.error(f"Failed to get application {application_id}: {e}")
             return None
 
+    def get_applications(self, application_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get several applications with one multi-get, keyed by ID (missing IDs are omitted)"""
+        try:
+            collection = self.db.collection('applications')
+            refs = [collection.document(application_id) for application_id in dict.fromkeys(application_ids)]
+            applications = {}
+            for doc in get_documents(self.db, refs):
+                if doc.exists:
+                    data = doc.to_dict()
+                    data['id'] = doc.id
+                    applications[doc.id] = data
+            return applications
+        except Exception as e:
+            logger.error(f"Failed to get applications {application_ids}: {e}")
+            return {}
+
     def update_application(self, application_id: str, update_data: Dict[str, Any]) -> bool:
         """Update application"""
         try:
-            self.db.collection('applications').document(application_id).update(update_data)
-            logger.info(f"Application {application_id} updated successfully")
+            doc_ref = self.db.collection('applications').document(application_id)
+
+            def update_in_transaction(transaction):
+                current = get_document(doc_ref, transaction=transaction).to_dict() or {}
+                old_status = current.get('status', 'pending')
+                new_status = update_data.get('status', old_status)
+                helped_change = 0
+                if old_status != new_status:
+                    helped_change = self._update_student_helped(
+                        transaction,
+                        current.get('student_wallet'),
+                        _counts_as_approved(new_status) - _counts_as_approved(old_status)
+                    )
+                transaction.update(doc_ref, update_data)
+                self._bump_versions(transaction, [APPLICATIONS_VERSION, student_version_key(current.get('student_wallet'))])
+                if old_status != new_status:
+                    self._write_stats_delta(
+                        transaction,
+                        status_changes={old_status: -1, new_status: 1},
+                        students_helped=helped_change
+                    )
+
+            self._run_transaction(update_in_transaction)
+
+            logger.info("Application %s updated successfully", application_id)
             return True
         except Exception as e:
             logger.error(f"Failed to update application {application_id}: {e}")
             return False
 
-    def get_applications_by_student(self, student_wallet: str) -> List[Dict[str, Any]]:
-        """Get all applications by student wallet address"""
-        try:
-            query = self.db.collection('applications').where('student_wallet', '==', student_wallet)
-            docs = query.stream()
-            applications = []
-            for doc in docs:
-                data = doc.to_dict()
-                data['id'] = doc.id
-                applications.append(data)
-            return applications
-        except Exception as e:
-            logger.error(f"Failed to get applications for student {student_wallet}: {e}")
-            return []
+    def commit_application_reviews(self, reviews: List[Dict[str, Any]]) -> List[Optional[str]]:
+        """Review pending applications, queueing a disbursement job for each approval.
+
+        Each review holds the application ``id``, its ``update`` data and,
+        for approvals, the ``job`` to store under the application id. Reviews
+        are committed in transactions of up to REVIEW_BATCH_SIZE that re-read
+        the applications and only apply the ones still pending, so two
+        reviews of the same application can't both succeed. Statistics change
+        in the same transaction. Returns one error message per review, or None
+        where the review was written.
+        """
+        errors: List[Optional[str]] = []
+        for start in range(0, len(reviews), REVIEW_BATCH_SIZE):
+            chunk = reviews[start:start + REVIEW_BATCH_SIZE]
+
+            def review_in_transaction(transaction, chunk=chunk):
+                return self._commit_review_chunk(transaction, chunk)
 
-    def get_all_applications(self, status: Optional[str] = None, limit: int = 100) -> List[Dict[str, Any]]:
-        """Get all applications, optionally filtered by status"""
+            try:
+                errors.extend(self._run_transaction(review_in_transaction))
+            except Exception as e:
+                logger.error(f"Failed to commit {len(chunk)} application reviews: {e}")
+                errors.extend([str(e)] * len(chunk))
+        return errors
+
+    def _commit_review_chunk(self, transaction, reviews: List[Dict[str, Any]]) -> List[Optional[str]]:
+        applications = self.db.collection('applications')
+        jobs = self.db.collection(DISBURSEMENT_JOBS_COLLECTION)
+
+        current = {
+            snapshot.id: snapshot.to_dict()
+            for snapshot in get_documents(self.db, [applications.document(review['id']) for review in reviews],
+                                          transaction=transaction)
+            if snapshot.exists
+        }
+        job_refs = [jobs.document(review['id']) for review in reviews if review.get('job')]
+        previous_jobs = {
+            snapshot.id: snapshot.to_dict()
+            for snapshot in (get_documents(self.db, job_refs, transaction=transaction) if job_refs else ())
+            if snapshot.exists
+        }
+
+        errors: List[Optional[str]] = []
+        accepted = []
+        for review in reviews:
+            application = current.get(review['id'])
+            previous_job = previous_jobs.get(review['id'])
+            if application is None:
+                errors.append('Application not found')
+            elif application.get('status', 'pending') != 'pending':
+                errors.append('Application is not in pending status')
+            elif previous_job and previous_job.get('status') != 'failed':
+                errors.append('A disbursement for this application is already in progress')
+            else:
+                errors.append(None)
+                accepted.append((review, application, previous_job))
+
+        status_changes: Dict[str, int] = {}
+        wallet_changes: Dict[str, int] = {}
+        versions = [APPLICATIONS_VERSION]
+        for review, application, _ in accepted:
+            old_status = application.get('status', 'pending')
+            new_status = review['update'].get('status', old_status)
+            if old_status != new_status:
+                status_changes[old_status] = status_changes.get(old_status, 0) - 1
+                status_changes[new_status] = status_changes.get(new_status, 0) + 1
+
+            wallet = application.get('student_wallet')
+            versions.append(student_version_key(wallet))
+            change = _counts_as_approved(new_status) - _counts_as_approved(old_status)
+            if wallet and change:
+                wallet_changes[wallet] = wallet_changes.get(wallet, 0) + change
+
+        # Last read: the markers of the wallets whose approved count changes
+        helped_ref = self.db.collection(STUDENTS_HELPED_COLLECTION)
+        markers = list(get_documents(
+            self.db, [helped_ref.document(wallet) for wallet in wallet_changes], transaction=transaction
+        )) if wallet_changes else []
+
+        for review, _, previous_job in accepted:
+            transaction.update(applications.document(review['id']), review['update'])
+            if review.get('job'):
+                job = dict(review['job'])
+                if previous_job and previous_job.get('transaction_hash'):
+                    # Keep the last submission so the worker checks whether it landed before paying
+                    job.update({'status': 'submitted',
+                                'transaction_hash': previous_job['transaction_hash'],
+                                'submitted_at': previous_job.get('submitted_at')})
+                transaction.set(jobs.document(review['id']), job)
+
+        helped_change = 0
+        for snapshot in markers:
+            before = (snapshot.to_dict() or {}).get('approved_applications', 0) if snapshot.exists else 0
+            after = max(before + wallet_changes[snapshot.id], 0)
+            transaction.set(snapshot.reference, {'approved_applications': after})
+            helped_change += int(after > 0) - int(before > 0)
+
+        if accepted:
+            self._bump_versions(transaction, versions)
+            self._write_stats_delta(transaction, status_changes=status_changes, students_helped=helped_change)
+        return errors
+
+    def get_all_applications(self, status: Optional[str] = None, limit: int = 100,
+                             fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Get all applications, optionally filtered by status and projected to fields"""
         try:
             query = self.db.collection('applications')
             
             if status:
                 query = query.where('status', '==', status)
             
+            if fields:
+                query = query.select(fields)
+            
             query = query.order_by('applied_at', direction=firestore.Query.DESCENDING).limit(limit)
             
-            docs = query.stream()
+            docs = stream_query(query)
             applications = []
             for doc in docs:
                 data = doc.to_dict()
@@ -141,90 +387,465 @@ class FirebaseService:
             logger.error(f"Failed to get applications: {e}")
             return []
 
-    def create_scholarship_record(self, record_data: Dict[str, Any]) -> Optional[str]:
-        """Create scholarship disbursement record"""
+    def get_applications_page(self, status: Optional[str] = None, page_size: int = 50,
+                              page_token: Optional[str] = None,
+                              fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Get one page of applications, newest first, optionally filtered by status"""
+        query = self.db.collection('applications')
+        if status:
+            query = query.where('status', '==', status)
+        return self._get_page(query, 'applied_at', page_size, page_token, fields)
+
+    def get_student_applications_page(self, student_wallet: str, page_size: int = 50,
+                                      page_token: Optional[str] = None,
+                                      fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Get one page of a student's applications, newest first"""
+        query = self.db.collection('applications').where('student_wallet', '==', student_wallet)
+        return self._get_page(query, 'applied_at', page_size, page_token, fields)
+
+    def get_student_application_counts(self, student_wallet: str) -> Dict[str, int]:
+        """Count a student's applications by status with count() aggregations rather than reading them"""
+        query = self.db.collection('applications').where('student_wallet', '==', student_wallet)
+        return {
+            'total_applications': count_query(query),
+            'pending_applications': count_query(query.where('status', '==', 'pending')),
+            'approved_applications': count_query(query.where('status', 'in', ['approved', 'disbursed'])),
+            'rejected_applications': count_query(query.where('status', '==', 'rejected'))
+        }
+
+    def get_scholarship_records_page(self, student_wallet: Optional[str] = None, page_size: int = 50,
+                                     page_token: Optional[str] = None) -> Dict[str, Any]:
+        """Get one page of scholarship records, newest first, optionally for one student"""
+        query = self.db.collection('scholarship_records')
+        if student_wallet:
+            query = query.where('student_wallet', '==', student_wallet)
+        return self._get_page(query, 'timestamp', page_size, page_token)
+
+    def iter_applications(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                          fields: Optional[List[str]] = None) -> Iterator[Dict[str, Any]]:
+        """Stream applications oldest first, filtered by applied_at in [start, end)"""
+        query = self.db.collection('applications')
+        if start:
+            query = query.where('applied_at', '>=', start)
+        if end:
+            query = query.where('applied_at', '<', end)
+        if fields:
+            query = query.select(list(dict.fromkeys([*fields, 'applied_at'])))
+
+        for doc in iter_query_chunks(query, 'applied_at'):
+            data = doc.to_dict()
+            data['id'] = doc.id
+            yield data
+
+    def iter_scholarship_records(self, student_wallet: Optional[str] = None,
+                                 start: Optional[datetime] = None,
+                                 end: Optional[datetime] = None) -> Iterator[Dict[str, Any]]:
+        """Stream scholarship records oldest first, filtered by wallet and [start, end)"""
+        query = self.db.collection('scholarship_records')
+        if student_wallet:
+            query = query.where('student_wallet', '==', student_wallet)
+        if start:
+            query = query.where('timestamp', '>=', start)
+        if end:
+            query = query.where('timestamp', '<', end)
+
+        for doc in iter_query_chunks(query, 'timestamp'):
+            data = doc.to_dict()
+            data['id'] = doc.id
+            yield data
+
+    def _get_page(self, query, order_field: str, page_size: int, page_token: Optional[str],
+                  fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Run a cursor-paginated query and convert the snapshots to dicts"""
+        if fields:
+            # The cursor needs the order field even when the caller didn't ask for it
+            query = query.select(list(dict.fromkeys([*fields, order_field])))
+        page = paginate_query(query, order_field, page_size, page_token)
+        items = []
+        for doc in page['snapshots']:
+            data = doc.to_dict()
+            data['id'] = doc.id
+            items.append(data)
+        return {
+            'items': items,
+            'next_page_token': page['next_page_token'],
+            'prev_page_token': page['prev_page_token']
+        }
+
+    def get_dashboard_stats(self) -> Dict[str, Any]:
+        """Get dashboard statistics from the incrementally maintained aggregate"""
+        try:
+            aggregate = self.dashboard_stats.read(use_cache=False)
+            if not aggregate or not aggregate.get('rebuilt_at'):
+                # A full recount is too slow for a GET; seed it with POST /api/admin/statistics/rebuild
+                logger.warning("Dashboard stats aggregate not seeded; returning zeros until it is rebuilt")
+                return _format_dashboard_stats({})
+
+            return _format_dashboard_stats(aggregate)
+        except Exception as e:
+            logger.error(f"Failed to get dashboard stats: {e}")
+            return _format_dashboard_stats({})
+
+    def rebuild_dashboard_stats(self) -> Dict[str, Any]:
+        """Recount all applications and records and overwrite the aggregates"""
+        aggregate, approved_by_wallet = self._recount_dashboard_stats()
+
+        helped_ref = self.db.collection(STUDENTS_HELPED_COLLECTION)
+        writes = [(helped_ref.document(wallet), {'approved_applications': count})
+                  for wallet, count in approved_by_wallet.items()]
+        writes.extend((doc.reference, None) for doc in stream_query(helped_ref)
+                      if doc.id not in approved_by_wallet)
+
+        for start in range(0, len(writes), BATCH_WRITE_LIMIT):
+            batch = self.db.batch()
+            for doc_ref, data in writes[start:start + BATCH_WRITE_LIMIT]:
+                if data is None:
+                    batch.delete(doc_ref)
+                else:
+                    batch.set(doc_ref, data)
+            batch.commit()
+
+        aggregate['updated_at'] = firestore.SERVER_TIMESTAMP
+        aggregate['rebuilt_at'] = firestore.SERVER_TIMESTAMP
+        # Bumping the versions invalidates ETags of responses built from the old numbers
+        batch = self.db.batch()
+        self.dashboard_stats.reset(batch, aggregate)
+        self._bump_versions(batch, [APPLICATIONS_VERSION, RECORDS_VERSION])
+        batch.commit()
+        self._dashboard_stats_seeded = True
+        logger.info("Dashboard stats rebuilt from a full recount")
+        return _format_dashboard_stats(aggregate)
+
+    def check_dashboard_stats_drift(self) -> Dict[str, Any]:
+        """Compare the stored aggregates against a full recount"""
+        stored = _format_dashboard_stats(self.dashboard_stats.read(use_cache=False) or {})
+        recomputed = _format_dashboard_stats(self._recount_dashboard_stats()[0])
+
+        drift = {
+            key: recomputed[key] - stored[key]
+            for key in recomputed
+            if abs(recomputed[key] - stored[key]) > 1e-6
+        }
+        return {
+            'stored': stored,
+            'recomputed': recomputed,
+            'drift': drift,
+            'consistent': not drift
+        }
+
+    def get_rollups(self, granularity: str, start: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """Get daily or monthly rollups from start (inclusive) onwards, oldest first"""
+        try:
+            collection = DAILY_ROLLUPS_COLLECTION if granularity == 'daily' else MONTHLY_ROLLUPS_COLLECTION
+            query = self.db.collection(collection)
+            if start is not None:
+                query = query.where('date', '>=', start)
+            query = query.order_by('date').select(['date'] + ROLLUP_FIELDS)
+
+            return merge_rollup_shards([doc.to_dict() for doc in stream_query(query)])
+        except Exception as e:
+            logger.error(f"Failed to get {granularity} rollups: {e}")
+            return []
+
+    def rebuild_rollups(self) -> int:
+        """Recount the daily and monthly rollups from applications and records.
+
+        Applications count as received on applied_at and as approved or
+        rejected on reviewed_at; records count as disbursements on their
+        timestamp. Each period's total goes to its base document and its
+        shards are deleted. Returns the number of rollup documents written.
+        """
+        rollups: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+        def add(moment: Optional[datetime], delta: Dict[str, Any]):
+            if not isinstance(moment, datetime) or not delta:
+                return
+            if moment.tzinfo is None:
+                moment = moment.replace(tzinfo=timezone.utc)
+            for collection, doc_id, period_start in rollup_periods(moment.astimezone(timezone.utc)):
+                rollup = rollups.setdefault((collection, doc_id), {'date': period_start})
+                for field, value in delta.items():
+                    rollup[field] = rollup.get(field, 0) + value
+
+        applications = self.db.collection('applications').select(['applied_at', 'reviewed_at', 'status'])
+        for doc in stream_query(applications):
+            data = doc.to_dict()
+            add(data.get('applied_at'), rollup_delta(new_applications=1))
+            add(data.get('reviewed_at'), rollup_delta(status_changes={data.get('status', 'pending'): 1}))
+
+        for doc in stream_query(self.db.collection('scholarship_records').select(['timestamp', 'amount'])):
+            data = doc.to_dict()
+            add(data.get('timestamp'), rollup_delta(disbursed=data.get('amount', 0), disbursements=1))
+
+        writes = [(self.db.collection(collection).document(doc_id), rollup)
+                  for (collection, doc_id), rollup in rollups.items()]
+        for collection in (DAILY_ROLLUPS_COLLECTION, MONTHLY_ROLLUPS_COLLECTION):
+            writes.extend((doc.reference, None) for doc in stream_query(self.db.collection(collection).select([]))
+                          if (collection, doc.id) not in rollups)
+
+        # The last batch also bumps the applications and records versions, so
+        # cached statistics responses are rebuilt from the new rollups
+        chunk_size = BATCH_WRITE_LIMIT - 2
+        for start in range(0, max(len(writes), 1), chunk_size):
+            batch = self.db.batch()
+            for doc_ref, data in writes[start:start + chunk_size]:
+                if data is None:
+                    batch.delete(doc_ref)
+                else:
+                    batch.set(doc_ref, {**data, 'updated_at': firestore.SERVER_TIMESTAMP})
+            if start + chunk_size >= len(writes):
+                self._bump_versions(batch, [APPLICATIONS_VERSION, RECORDS_VERSION])
+            batch.commit()
+
+        logger.info("Statistics rollups rebuilt: %s documents", len(rollups))
+        return len(rollups)
+
+    def _recount_dashboard_stats(self):
+        """Scan applications and records, returning the aggregate and per-wallet approvals"""
+        status_counts: Dict[str, int] = {}
+        approved_by_wallet: Dict[str, int] = {}
+        total_applications = 0
+
+        for doc in stream_query(self.db.collection('applications')):
+            data = doc.to_dict()
+            total_applications += 1
+
+            status = data.get('status', 'pending')
+            status_counts[status] = status_counts.get(status, 0) + 1
+
+            wallet = data.get('student_wallet')
+            if _counts_as_approved(status) and wallet:
+                approved_by_wallet[wallet] = approved_by_wallet.get(wallet, 0) + 1
+
+        total_disbursed = 0.0
+        for doc in stream_query(self.db.collection('scholarship_records')):
+            total_disbursed += doc.to_dict().get('amount', 0)
+
+        aggregate = {
+            'total_applications': total_applications,
+            'status_counts': status_counts,
+            'total_disbursed': total_disbursed,
+            'total_students_helped': len(approved_by_wallet)
+        }
+        return aggregate, approved_by_wallet
+
+    def _dashboard_stats_ref(self):
+        return self.db.collection(STATS_COLLECTION).document(DASHBOARD_STATS_DOC)
+
+    def _dashboard_stats_ready(self) -> bool:
+        """Whether rebuild_dashboard_stats has seeded the aggregate.
+
+        Until then increments are not applied: on a deployment with existing
+        data they would otherwise become totals that only count what changed
+        since. Once seen, the marker is remembered for the process.
+        """
+        if not self._dashboard_stats_seeded:
+            base = get_document(self._dashboard_stats_ref())
+            self._dashboard_stats_seeded = bool(base.exists and (base.to_dict() or {}).get('rebuilt_at'))
+        return self._dashboard_stats_seeded
+
+    def _write_stats_delta(self, writer, new_applications: int = 0, status_changes: Optional[Dict[str, int]] = None,
+                           disbursed: float = 0, disbursements: int = 0, students_helped: int = 0):
+        """Apply a statistics change to the dashboard aggregate and today's rollups.
+
+        Used inside a transaction or batch so the statistics commit together
+        with the change they describe. Every write goes to a random shard, so
+        concurrent changes don't contend on one document.
+        """
+        deltas = {
+            'total_applications': new_applications,
+            'status_counts': {status: change for status, change in (status_changes or {}).items() if change},
+            'total_disbursed': disbursed,
+            'total_students_helped': students_helped
+        }
+        if any(deltas.values()) and self._dashboard_stats_ready():
+            self.dashboard_stats.increment(writer, deltas, updated_at=firestore.SERVER_TIMESTAMP)
+
+        delta = rollup_delta(new_applications, status_changes, disbursed, disbursements)
+        if not delta:
+            return
+        shard = random.randrange(Config.STATS_SHARDS)
+        for collection, doc_id, period_start in rollup_periods(datetime.now(timezone.utc)):
+            writer.set(self.db.collection(collection).document(rollup_shard_id(doc_id, shard)), {
+                'date': period_start,
+                'updated_at': firestore.SERVER_TIMESTAMP,
+                **{field: firestore.Increment(value) for field, value in delta.items()}
+            }, merge=True)
+
+    def _update_student_helped(self, transaction, wallet: Optional[str], change: int) -> int:
+        """Track a wallet's approved applications, returning the change in students helped.
+
+        Reads inside the transaction, so it must run before any of its writes.
+        """
+        if not change or not wallet:
+            return 0
+
+        doc_ref = self.db.collection(STUDENTS_HELPED_COLLECTION).document(wallet)
+        snapshot = get_document(doc_ref, transaction=transaction)
+        before = (snapshot.to_dict() or {}).get('approved_applications', 0) if snapshot.exists else 0
+        after = max(before + change, 0)
+
+        transaction.set(doc_ref, {'approved_applications': after})
+        return int(after > 0) - int(before > 0)
+
+    def _version_counter(self, key: str) -> ShardedCounter:
+        return ShardedCounter(
+            self.db.collection(RESOURCE_VERSIONS_COLLECTION).document(key), ['version'],
+            num_shards=Config.STATS_SHARDS, cache_seconds=0
+        )
+
+    def get_resource_versions(self, keys: List[str]) -> Optional[Dict[str, int]]:
+        """Read the version counters for the given resources (0 if never written)"""
         try:
-            doc_ref = self.db.collection('scholarship_records').add(record_data)
-            record_id = doc_ref[1].id
-            logger.info(f"Scholarship record {record_id} created successfully")
-            return record_id
+            # One batched read of every key's base document and shards
+            refs, owners = [], {}
+            for key in keys:
+                counter = self._version_counter(key)
+                for doc_ref in [counter.doc_ref] + [counter.shard_ref(index) for index in range(counter.num_shards)]:
+                    refs.append(doc_ref)
+                    owners[doc_ref.path] = key
+
+            versions = {key: 0 for key in keys}
+            for snapshot in get_documents(self.db, refs):
+                if snapshot.exists:
+                    versions[owners[snapshot.reference.path]] += snapshot.get('version') or 0
+            return versions
         except Exception as e:
-            logger.error(f"Failed to create scholarship record: {e}")
+            logger.error(f"Failed to get resource versions: {e}")
             return None
 
-    def get_scholarship_records_by_student(self, student_wallet: str) -> List[Dict[str, Any]]:
-        """Get scholarship records for a student"""
+    def _bump_versions(self, writer, keys: List[Optional[str]]):
+        """Increment resource version counters as part of a transaction or batch"""
+        for key in dict.fromkeys(key for key in keys if key):
+            self._version_counter(key).increment(writer, {'version': 1}, updated_at=firestore.SERVER_TIMESTAMP)
+
+    def _run_transaction(self, callback):
+        """Run callback(transaction) in a transaction of the storage backend"""
+        return self.storage.run_transaction(callback)
+
+    def create_disbursement_job(self, job_id: str, job_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Create a disbursement job unless an active one already exists.
+
+        Returns the stored job with a 'created' flag; a job that previously
+        failed is replaced by the new one.
+        """
         try:
-            query = self.db.collection('scholarship_records').where('student_wallet', '==', student_wallet)
-            query = query.order_by('timestamp', direction=firestore.Query.DESCENDING)
-            
-            docs = query.stream()
-            records = []
-            for doc in docs:
+            doc_ref = self.db.collection(DISBURSEMENT_JOBS_COLLECTION).document(job_id)
+
+            def create_in_transaction(transaction):
+                snapshot = get_document(doc_ref, transaction=transaction)
+                previous = snapshot.to_dict() if snapshot.exists else {}
+                if snapshot.exists and previous.get('status') != 'failed':
+                    return {**previous, 'id': job_id, 'created': False}
+                job = dict(job_data)
+                if previous.get('transaction_hash'):
+                    # Keep the last submission so the retry checks whether it landed before paying
+                    job.update({'status': 'submitted',
+                                'transaction_hash': previous['transaction_hash'],
+                                'submitted_at': previous.get('submitted_at')})
+                transaction.set(doc_ref, job)
+                return {**job, 'id': job_id, 'created': True}
+
+            job = self._run_transaction(create_in_transaction)
+            if job['created']:
+                logger.info("Disbursement job %s queued", job_id)
+            return job
+        except Exception as e:
+            logger.error(f"Failed to create disbursement job {job_id}: {e}")
+            return None
+
+    def get_disbursement_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get disbursement job by ID"""
+        try:
+            doc = get_document(self.db.collection(DISBURSEMENT_JOBS_COLLECTION).document(job_id))
+            if doc.exists:
                 data = doc.to_dict()
                 data['id'] = doc.id
-                records.append(data)
-            return records
+                return data
+            return None
         except Exception as e:
-            logger.error(f"Failed to get scholarship records for {student_wallet}: {e}")
-            return []
+            logger.error(f"Failed to get disbursement job {job_id}: {e}")
+            return None
 
-    def get_dashboard_stats(self) -> Dict[str, Any]:
-        """Get dashboard statistics"""
+    def update_disbursement_job(self, job_id: str, update_data: Dict[str, Any]) -> bool:
+        """Update disbursement job"""
         try:
-            stats = {
-                'total_applications': 0,
-                'pending_applications': 0,
-                'approved_applications': 0,
-                'rejected_applications': 0,
-                'total_disbursed': 0.0,
-                'total_students_helped': 0
-            }
+            update_data['updated_at'] = datetime.now(timezone.utc)
+            self.db.collection(DISBURSEMENT_JOBS_COLLECTION).document(job_id).update(update_data)
+            return True
+        except Exception as e:
+            logger.error(f"Failed to update disbursement job {job_id}: {e}")
+            return False
 
-            # Count applications by status
-            applications = self.db.collection('applications').stream()
-            student_wallets = set()
-            
-            for doc in applications:
-                data = doc.to_dict()
-                stats['total_applications'] += 1
-                
-                status = data.get('status', 'pending')
-                if status == 'pending':
-                    stats['pending_applications'] += 1
-                elif status in ['approved', 'disbursed']:  # Count both approved and disbursed as approved
-                    stats['approved_applications'] += 1
-                elif status == 'rejected':
-                    stats['rejected_applications'] += 1
-                
-                if status in ['approved', 'disbursed']:
-                    student_wallets.add(data.get('student_wallet'))
+    def update_disbursement_jobs(self, job_ids: List[str], update_data: Dict[str, Any]) -> bool:
+        """Apply the same update to several disbursement jobs in one batch"""
+        try:
+            update_data['updated_at'] = datetime.now(timezone.utc)
+            collection = self.db.collection(DISBURSEMENT_JOBS_COLLECTION)
+            batch = self.db.batch()
+            for job_id in job_ids:
+                batch.update(collection.document(job_id), update_data)
+            batch.commit()
+            return True
+        except Exception as e:
+            logger.error(f"Failed to update disbursement jobs {', '.join(job_ids)}: {e}")
+            return False
+
+    def get_due_disbursement_jobs(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Get queued or in-flight jobs whose next attempt is due"""
+        try:
+            query = self.db.collection(DISBURSEMENT_JOBS_COLLECTION)
+            query = query.where('status', 'in', ['queued', 'submitted'])
+            query = query.where('next_attempt_at', '<=', datetime.now(timezone.utc))
+            query = query.order_by('next_attempt_at').limit(limit)
 
-            # Calculate total disbursed from scholarship records
-            records = self.db.collection('scholarship_records').stream()
-            for doc in records:
+            jobs = []
+            for doc in stream_query(query):
                 data = doc.to_dict()
-                stats['total_disbursed'] += data.get('amount', 0)
+                data['id'] = doc.id
+                jobs.append(data)
+            return jobs
+        except Exception as e:
+            logger.error(f"Failed to get due disbursement jobs: {e}")
+            return []
 
-            stats['total_students_helped'] = len(student_wallets)
-            
-            return stats
+    def claim_disbursement_job(self, job_id: str, worker_id: str, lease_seconds: int) -> Optional[Dict[str, Any]]:
+        """Take a lease on a due job so no other worker processes it concurrently"""
+        try:
+            doc_ref = self.db.collection(DISBURSEMENT_JOBS_COLLECTION).document(job_id)
+
+            def claim_in_transaction(transaction):
+                snapshot = get_document(doc_ref, transaction=transaction)
+                if not snapshot.exists:
+                    return None
+
+                job = snapshot.to_dict()
+                now = datetime.now(timezone.utc)
+                lease_expires_at = job.get('lease_expires_at')
+                if job.get('status') not in ('queued', 'submitted') or job.get('next_attempt_at', now) > now:
+                    return None
+                if lease_expires_at and lease_expires_at > now:
+                    return None
+
+                lease = {
+                    'worker_id': worker_id,
+                    'lease_expires_at': now + timedelta(seconds=lease_seconds),
+                    'attempts': job.get('attempts', 0) + 1,
+                    'updated_at': now
+                }
+                transaction.update(doc_ref, lease)
+                return {**job, **lease, 'id': job_id}
+
+            return self._run_transaction(claim_in_transaction)
         except Exception as e:
-            logger.error(f"Failed to get dashboard stats: {e}")
-            return {
-                'total_applications': 0,
-                'pending_applications': 0,
-                'approved_applications': 0,
-                'rejected_applications': 0,
-                'total_disbursed': 0.0,
-                'total_students_helped': 0
-            }
+            logger.error(f"Failed to claim disbursement job {job_id}: {e}")
+            return None
 
     def get_student_profile(self, student_address: str) -> Optional[Dict[str, Any]]:
         """Get student profile from smart contract simulation"""
         try:
             doc_ref = self.db.collection('student_profiles').document(student_address)
-            doc = doc_ref.get()
+            doc = get_document(doc_ref)
             if doc.exists:
                 return doc.to_dict()
             return None
@@ -236,30 +857,85 @@ class FirebaseService:
         """Update student profile for smart contract simulation"""
         try:
             self.db.collection('student_profiles').document(student_address).set(profile_data, merge=True)
-            logger.info(f"Student profile updated for {student_address}")
+            logger.info("Student profile updated for %s", student_address)
             return True
         except Exception as e:
             logger.error(f"Failed to update student profile {student_address}: {e}")
             return False
 
-    def get_contract_stats(self) -> Optional[Dict[str, Any]]:
-        """Get contract statistics from smart contract simulation"""
+    def record_confirmed_disbursement(self, record_id: str, record_data: Dict[str, Any]) -> Optional[bool]:
+        """Store a confirmed payment's scholarship record and apply it to the contract simulation.
+
+        Both happen in one transaction that first checks whether record_id
+        exists, so finalizing the same payment again changes nothing. Returns
+        True if the payment was recorded now, False if it already had been,
+        or None on error.
+        """
         try:
-            doc_ref = self.db.collection('contract_data').document('global_stats')
-            doc = doc_ref.get()
-            if doc.exists:
-                return doc.to_dict()
-            return None
+            doc_ref = self.db.collection('scholarship_records').document(record_id)
+            wallet = record_data.get('student_wallet')
+            amount = record_data.get('amount', 0)
+
+            def record_in_transaction(transaction):
+                if get_document(doc_ref, transaction=transaction).exists:
+                    return False
+                self._apply_contract_disbursements(transaction, [(wallet, amount)])
+                transaction.create(doc_ref, record_data)
+                self._bump_versions(transaction, [RECORDS_VERSION, student_version_key(wallet)])
+                self._write_stats_delta(transaction, disbursed=amount, disbursements=1)
+                return True
+
+            recorded = self._run_transaction(record_in_transaction)
+            if recorded:
+                self.contract_stats.invalidate()
+                logger.info("Scholarship record %s created successfully", record_id)
+            return recorded
         except Exception as e:
-            logger.error(f"Failed to get contract stats: {e}")
+            logger.error(f"Failed to record disbursement {record_id}: {e}")
             return None
 
-    def update_contract_stats(self, stats_data: Dict[str, Any]) -> bool:
-        """Update contract statistics for smart contract simulation"""
+    def _apply_contract_disbursements(self, transaction, payments: List[Tuple[str, float]]):
+        """Apply confirmed (student_address, amount) payments to the contract simulation.
+
+        Student profiles and the global contract stats change with atomic
+        increments, so concurrent releases never lose an update. New students
+        are detected from the profiles read first, so this must run before
+        any of the transaction's writes. The caller bumps the students'
+        version counters.
+        """
+        totals: Dict[str, Dict[str, Any]] = {}
+        for student_address, amount in payments:
+            entry = totals.setdefault(student_address, {'amount': 0, 'count': 0})
+            entry['amount'] += amount
+            entry['count'] += 1
+
+        profiles = self.db.collection('student_profiles')
+        refs = [profiles.document(address) for address in totals]
+        existing = {snapshot.id for snapshot in get_documents(self.db, refs, transaction=transaction) if snapshot.exists}
+        new_students = len(totals) - len(existing)
+
+        for doc_ref in refs:
+            entry = totals[doc_ref.id]
+            profile = {
+                'total_received': firestore.Increment(entry['amount']),
+                'scholarship_count': firestore.Increment(entry['count']),
+                'last_scholarship_date': firestore.SERVER_TIMESTAMP
+            }
+            if doc_ref.id not in existing:
+                profile['address'] = doc_ref.id
+            transaction.set(doc_ref, profile, merge=True)
+
+        # Global totals go to a random shard so payouts don't contend on one document
+        self.contract_stats.increment(transaction, {
+            'total_disbursed': sum(e['amount'] for e in totals.values()),
+            'total_scholarships': sum(e['count'] for e in totals.values()),
+            'total_students': new_students
+        }, last_updated=firestore.SERVER_TIMESTAMP)
+
+    def get_contract_stats(self, use_cache: bool = True) -> Optional[Dict[str, Any]]:
+        """Get contract statistics from smart contract simulation, summed across counter shards"""
         try:
-            self.db.collection('contract_data').document('global_stats').set(stats_data, merge=True)
-            logger.info("Contract stats updated")
-            return True
+            return self.contract_stats.read(use_cache=use_cache)
         except Exception as e:
-            logger.error(f"Failed to update contract stats: {e}")
-            return False
\ No newline at end of file
+            logger.error(f"Failed to get contract stats: {e}")
+            return None
\ No newline at end of file
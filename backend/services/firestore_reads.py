@@ -0,0 +1,85 @@
+from typing import Any, Dict, Iterable, Iterator
+
+# Firestore bills one document read per this many index entries a count() matches
+COUNT_ENTRIES_PER_READ = 1000
+
+from services.metrics import count_reads
+from services.tracing import SPAN_KIND_CLIENT, span, start_span
+
+
+def _collection(query) -> str:
+    if hasattr(query, 'id'):
+        return query.id  # a CollectionReference
+    # google-cloud-firestore queries keep their collection as _parent; local queries keep its path
+    parent = getattr(query, '_parent', None)
+    return parent.id if parent is not None else getattr(query, '_collection', '')
+
+
+def _filters(query) -> str:
+    """Filtered fields and operators (never values, which may identify a student)"""
+    described = []
+    for field_filter in getattr(query, '_field_filters', None) or getattr(query, '_filters', ()):
+        if isinstance(field_filter, tuple):
+            described.append(f'{field_filter[0]} {field_filter[1]}')
+        elif hasattr(field_filter, 'field'):
+            described.append(f'{field_filter.field.field_path} {field_filter.op.name}')
+        else:
+            described.append(type(field_filter).__name__)
+    return ', '.join(described)
+
+
+def _query_attributes(query) -> Dict[str, Any]:
+    attributes = {'db.collection': _collection(query), 'db.filters': _filters(query)}
+    if getattr(query, '_limit', None):
+        attributes['db.limit'] = query._limit
+    return attributes
+
+
+def get_document(doc_ref, transaction=None):
+    """Get one document, counting the read and tracing it"""
+    with span('firestore.get', SPAN_KIND_CLIENT, **{'db.collection': doc_ref.parent.id}) as current:
+        snapshot = doc_ref.get(transaction=transaction)
+        current.set_attribute('db.found', snapshot.exists)
+    count_reads()
+    return snapshot
+
+
+def get_documents(client, refs: Iterable, transaction=None) -> Iterator:
+    """Batch-get documents with get_all, counting and tracing every document returned"""
+    refs = list(refs)
+    current = start_span(
+        'firestore.get_all', SPAN_KIND_CLIENT,
+        **{'db.collection': refs[0].parent.id if refs else '', 'db.requested': len(refs)}
+    )
+    documents = 0
+    try:
+        for snapshot in client.get_all(refs, transaction=transaction):
+            documents += 1
+            count_reads()
+            yield snapshot
+    finally:
+        current.set_attribute('db.documents', documents)
+        current.end()
+
+
+def stream_query(query) -> Iterator:
+    """Stream a query's results, counting and tracing every document read"""
+    current = start_span('firestore.query', SPAN_KIND_CLIENT, **_query_attributes(query))
+    documents = 0
+    try:
+        for snapshot in query.stream():
+            documents += 1
+            count_reads()
+            yield snapshot
+    finally:
+        current.set_attribute('db.documents', documents)
+        current.end()
+
+
+def count_query(query) -> int:
+    """Count a query's matches with a count() aggregation, counting the reads it is billed and tracing it"""
+    with span('firestore.count', SPAN_KIND_CLIENT, **_query_attributes(query)) as current:
+        count = query.count(alias='count').get()[0][0].value
+        current.set_attribute('db.count', count)
+    count_reads(max(1, -(-count // COUNT_ENTRIES_PER_READ)))
+    return count
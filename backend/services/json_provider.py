@@ -0,0 +1,82 @@
+import dataclasses
+import json
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from enum import Enum
+from typing import Any
+
+from flask.json.provider import DefaultJSONProvider
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - falls back to the standard library
+    orjson = None
+
+
+def _default(obj: Any) -> Any:
+    """Convert values the encoders don't handle natively"""
+    if isinstance(obj, datetime):
+        # Firestore returns DatetimeWithNanoseconds; naive values are stored as UTC
+        if obj.tzinfo is None:
+            obj = obj.replace(tzinfo=timezone.utc)
+        return obj.isoformat()
+    if isinstance(obj, date):
+        return obj.isoformat()
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode='json')
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    # Firestore DocumentReference
+    if hasattr(obj, 'path') and hasattr(obj, 'id') and hasattr(obj, 'parent'):
+        return obj.path
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps_bytes(obj: Any, indent: bool = False) -> bytes:
+    """Serialize obj to UTF-8 JSON, compact unless indent is set"""
+    if orjson is not None:
+        option = orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=_default, option=option)
+    if indent:
+        return json.dumps(obj, default=_default, indent=2, ensure_ascii=False).encode('utf-8')
+    return json.dumps(obj, default=_default, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """JSON provider backed by orjson when it is installed.
+
+    Datetimes (including Firestore timestamps) are always written as ISO
+    8601 in UTC, enums as their value and pydantic models as their JSON
+    dump. Keys are not sorted.
+    """
+
+    sort_keys = False
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if orjson is not None and set(kwargs) <= {'indent', 'separators'}:
+            return dumps_bytes(obj, indent=bool(kwargs.get('indent'))).decode('utf-8')
+        kwargs.setdefault('default', _default)
+        kwargs.setdefault('sort_keys', self.sort_keys)
+        kwargs.setdefault('ensure_ascii', False)
+        return json.dumps(obj, **kwargs)
+
+    def loads(self, s: Any, **kwargs: Any) -> Any:
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        # Build the body as bytes directly instead of going through str
+        body = dumps_bytes(obj, indent=indent)
+        return self._app.response_class(body + b'\n', mimetype=self.mimetype)
@@ -0,0 +1,952 @@
+import base64
+import copy
+import json
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from bisect import bisect_left, bisect_right, insort
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from functools import cmp_to_key
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from google.api_core import exceptions as gexc
+from google.cloud.firestore_v1 import transforms
+
+ASCENDING = 'ASCENDING'
+DESCENDING = 'DESCENDING'
+
+_RANGE_OPERATORS = ('<', '<=', '>', '>=')
+
+# Same default as google-cloud-firestore's transactional()
+MAX_TRANSACTION_ATTEMPTS = 5
+TRANSACTION_BACKOFF_SECONDS = 0.005
+
+# Above this many equality matches, an ordered query with a limit walks the
+# sorted index instead of sorting every match
+EQUALITY_SCAN_LIMIT = 2000
+
+# Sorts after every document id
+_MAX_ID = '\U0010ffff'
+
+# Fields the services filter on; the SQLite store keeps an expression index
+# for each so equality and range filters do not scan the whole collection
+# (the memory store indexes any field on demand)
+INDEXED_FIELDS = {
+    'applications': ['status', 'student_wallet', 'applied_at'],
+    'scholarship_records': ['student_wallet', 'timestamp', 'application_id'],
+    'disbursement_jobs': ['status', 'next_attempt_at'],
+    'users': ['role'],
+    'stats_daily': ['date'],
+    'stats_monthly': ['date']
+}
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _normalize(value):
+    """Copy a value the way Firestore stores it: datetimes come back as aware UTC"""
+    if isinstance(value, datetime):
+        return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+    if isinstance(value, dict):
+        return {key: _normalize(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(item) for item in value]
+    return value
+
+
+def _get_path(data, path: str):
+    current = data
+    for part in path.split('.'):
+        if not isinstance(current, dict) or part not in current:
+            raise KeyError(path)
+        current = current[part]
+    return current
+
+
+def _resolve(value, old):
+    """Apply a field transform (Increment, SERVER_TIMESTAMP, ...) to the old value"""
+    if value is transforms.SERVER_TIMESTAMP:
+        return _now()
+    if isinstance(value, transforms.Increment):
+        base = old if isinstance(old, (int, float)) and not isinstance(old, bool) else 0
+        return base + value.value
+    if isinstance(value, transforms.Maximum):
+        return value.value if not isinstance(old, (int, float)) else max(old, value.value)
+    if isinstance(value, transforms.Minimum):
+        return value.value if not isinstance(old, (int, float)) else min(old, value.value)
+    if isinstance(value, transforms.ArrayUnion):
+        current = list(old) if isinstance(old, list) else []
+        return current + [item for item in _normalize(value.values) if item not in current]
+    if isinstance(value, transforms.ArrayRemove):
+        current = list(old) if isinstance(old, list) else []
+        return [item for item in current if item not in value.values]
+    return _normalize(copy.deepcopy(value))
+
+
+def _set_path(data: Dict[str, Any], path: str, value):
+    parts = path.split('.')
+    current = data
+    for part in parts[:-1]:
+        if not isinstance(current.get(part), dict):
+            current[part] = {}
+        current = current[part]
+    if value is transforms.DELETE_FIELD:
+        current.pop(parts[-1], None)
+    else:
+        current[parts[-1]] = _resolve(value, current.get(parts[-1]))
+
+
+def _merge(target: Dict[str, Any], data: Dict[str, Any]):
+    for key, value in data.items():
+        if isinstance(value, dict) and value:
+            if not isinstance(target.get(key), dict):
+                target[key] = {}
+            _merge(target[key], value)
+        elif value is transforms.DELETE_FIELD:
+            target.pop(key, None)
+        else:
+            target[key] = _resolve(value, target.get(key))
+
+
+def _project(data: Dict[str, Any], field_paths) -> Dict[str, Any]:
+    result: Dict[str, Any] = {}
+    for path in field_paths:
+        try:
+            value = _get_path(data, path)
+        except KeyError:
+            continue
+        _set_path(result, path, value)
+    return result
+
+
+def _type_rank(value) -> int:
+    """Firestore's cross-type ordering: null < bool < number < timestamp < string < bytes < reference < array < map"""
+    if value is None:
+        return 0
+    if isinstance(value, bool):
+        return 1
+    if isinstance(value, (int, float)):
+        return 2
+    if isinstance(value, datetime):
+        return 3
+    if isinstance(value, str):
+        return 4
+    if isinstance(value, bytes):
+        return 5
+    if isinstance(value, DocumentReference):
+        return 6
+    if isinstance(value, list):
+        return 8
+    return 9
+
+
+def _compare(a, b) -> int:
+    rank_a, rank_b = _type_rank(a), _type_rank(b)
+    if rank_a != rank_b:
+        return -1 if rank_a < rank_b else 1
+    if isinstance(a, DocumentReference):
+        a, b = a.path, b.path
+    if isinstance(a, datetime):
+        a, b = _normalize(a), _normalize(b)
+    if a == b:
+        return 0
+    try:
+        return -1 if a < b else 1
+    except TypeError:
+        return 0
+
+
+class DocumentSnapshot:
+    def __init__(self, reference: 'DocumentReference', data: Optional[Dict[str, Any]],
+                 create_time: Optional[datetime] = None, update_time: Optional[datetime] = None):
+        self.reference = reference
+        self._data = data
+        self.create_time = create_time
+        self.update_time = update_time
+
+    @property
+    def id(self) -> str:
+        return self.reference.id
+
+    @property
+    def exists(self) -> bool:
+        return self._data is not None
+
+    def to_dict(self) -> Optional[Dict[str, Any]]:
+        return copy.deepcopy(self._data) if self._data is not None else None
+
+    def get(self, field_path: str):
+        return copy.deepcopy(_get_path(self._data or {}, field_path))
+
+
+class DocumentReference:
+    def __init__(self, client: 'LocalFirestoreClient', collection: str, doc_id: str):
+        self._client = client
+        self._collection = collection
+        self.id = doc_id
+
+    @property
+    def path(self) -> str:
+        return f"{self._collection}/{self.id}"
+
+    @property
+    def parent(self) -> 'CollectionReference':
+        return CollectionReference(self._client, self._collection)
+
+    def __eq__(self, other):
+        return isinstance(other, DocumentReference) and other.path == self.path
+
+    def __hash__(self):
+        return hash(self.path)
+
+    def collection(self, name: str) -> 'CollectionReference':
+        return CollectionReference(self._client, f"{self.path}/{name}")
+
+    def get(self, field_paths=None, transaction=None, **kwargs) -> DocumentSnapshot:
+        snapshot = self._client._store.get(self, field_paths)
+        if transaction is not None:
+            transaction._record_reads([snapshot])
+        return snapshot
+
+    def set(self, document_data, merge=False):
+        self._client._store.commit([('set', self, document_data, merge)])
+
+    def create(self, document_data):
+        self._client._store.commit([('create', self, document_data, False)])
+
+    def update(self, field_updates):
+        self._client._store.commit([('update', self, field_updates, False)])
+
+    def delete(self):
+        self._client._store.commit([('delete', self, None, False)])
+
+
+class Query:
+    """Immutable query with Firestore's filter, ordering and cursor semantics"""
+
+    def __init__(self, client: 'LocalFirestoreClient', collection: str, filters=(), orders=(),
+                 limit=None, limit_to_last=False, start=None, end=None, projection=None):
+        self._client = client
+        self._collection = collection
+        self._filters = tuple(filters)
+        self._orders = tuple(orders)
+        self._limit = limit
+        self._limit_to_last = limit_to_last
+        self._start = start
+        self._end = end
+        self._projection = projection
+
+    def _copy(self, **changes) -> 'Query':
+        state = dict(filters=self._filters, orders=self._orders, limit=self._limit,
+                     limit_to_last=self._limit_to_last, start=self._start, end=self._end,
+                     projection=self._projection)
+        state.update(changes)
+        return Query(self._client, self._collection, **state)
+
+    def where(self, field_path=None, op_string=None, value=None, filter=None) -> 'Query':
+        if filter is not None:
+            field_path, op_string, value = filter.field_path, filter.op_string, filter.value
+        return self._copy(filters=self._filters + ((field_path, op_string, _normalize(value)),))
+
+    def order_by(self, field_path: str, direction: str = ASCENDING) -> 'Query':
+        return self._copy(orders=self._orders + ((field_path, direction),))
+
+    def limit(self, count: int) -> 'Query':
+        return self._copy(limit=count, limit_to_last=False)
+
+    def limit_to_last(self, count: int) -> 'Query':
+        return self._copy(limit=count, limit_to_last=True)
+
+    def select(self, field_paths) -> 'Query':
+        return self._copy(projection=tuple(field_paths))
+
+    def count(self, alias: Optional[str] = None) -> 'AggregationQuery':
+        return AggregationQuery(self, alias or 'field_1')
+
+    def _cursor(self, values, before: bool):
+        if isinstance(values, DocumentSnapshot):
+            snapshot = values
+            values = dict(snapshot._data or {})
+            values['__name__'] = snapshot.id
+        if isinstance(values, dict):
+            values = [values[field] if field in values else _get_path(values, field)
+                      for field, _ in self._effective_orders()[:len(values)]]
+        return [_normalize(value) for value in values], before
+
+    def start_after(self, values) -> 'Query':
+        return self._copy(start=self._cursor(values, False))
+
+    def start_at(self, values) -> 'Query':
+        return self._copy(start=self._cursor(values, True))
+
+    def end_before(self, values) -> 'Query':
+        return self._copy(end=self._cursor(values, True))
+
+    def end_at(self, values) -> 'Query':
+        return self._copy(end=self._cursor(values, False))
+
+    def stream(self, transaction=None, **kwargs) -> Iterator[DocumentSnapshot]:
+        snapshots = self._client._store.query(self)
+        if transaction is not None:
+            transaction._record_reads(snapshots)
+        return iter(snapshots)
+
+    def get(self, transaction=None, **kwargs) -> List[DocumentSnapshot]:
+        return list(self.stream())
+
+    def _matches(self, doc_id: str, data: Dict[str, Any]) -> bool:
+        for field, op, value in self._filters:
+            try:
+                actual = doc_id if field == '__name__' else _get_path(data, field)
+            except KeyError:
+                return False
+            same_type = _type_rank(actual) == _type_rank(value)
+            if op == '==' and _compare(actual, value) != 0:
+                return False
+            if op == '!=' and (actual is None or _compare(actual, value) == 0):
+                return False
+            if op == '<' and not (same_type and _compare(actual, value) < 0):
+                return False
+            if op == '<=' and not (same_type and _compare(actual, value) <= 0):
+                return False
+            if op == '>' and not (same_type and _compare(actual, value) > 0):
+                return False
+            if op == '>=' and not (same_type and _compare(actual, value) >= 0):
+                return False
+            if op == 'in' and not any(_compare(actual, item) == 0 for item in value):
+                return False
+            if op == 'not-in' and any(_compare(actual, item) == 0 for item in value):
+                return False
+            if op == 'array-contains' and not (isinstance(actual, list) and value in actual):
+                return False
+            if op == 'array-contains-any' and not (isinstance(actual, list) and any(item in actual for item in value)):
+                return False
+        return True
+
+    def _effective_orders(self) -> List[Tuple[str, str]]:
+        orders = list(self._orders)
+        # An inequality filter implies ordering on its field first
+        for field, op, _ in self._filters:
+            if op in _RANGE_OPERATORS + ('!=', 'not-in') and not any(order[0] == field for order in orders):
+                orders.insert(0, (field, ASCENDING))
+                break
+        if not any(field == '__name__' for field, _ in orders):
+            orders.append(('__name__', orders[-1][1] if orders else ASCENDING))
+        return orders
+
+    def _position(self, row, cursor, orders) -> int:
+        values, _ = cursor
+        for (field, direction), value in zip(orders, values):
+            actual = row[0] if field == '__name__' else _get_path(row[1], field)
+            if field == '__name__' and isinstance(value, DocumentReference):
+                value = value.id
+            result = _compare(actual, value)
+            if result:
+                return -result if direction == DESCENDING else result
+        return 0
+
+    def _evaluate(self, items) -> List[Tuple[str, Dict[str, Any]]]:
+        """Filter, order, apply cursors and limit to (doc_id, data) pairs"""
+        orders = self._effective_orders()
+        ordered_fields = [field for field, _ in orders if field != '__name__']
+        rows = []
+        for doc_id, data in items:
+            if not self._matches(doc_id, data):
+                continue
+            # Like Firestore, documents missing an ordered field are excluded
+            try:
+                for field in ordered_fields:
+                    _get_path(data, field)
+            except KeyError:
+                continue
+            rows.append((doc_id, data))
+
+        def compare_rows(a, b):
+            for field, direction in orders:
+                if field == '__name__':
+                    result = _compare(a[0], b[0])
+                else:
+                    result = _compare(_get_path(a[1], field), _get_path(b[1], field))
+                if result:
+                    return -result if direction == DESCENDING else result
+            return 0
+
+        rows.sort(key=cmp_to_key(compare_rows))
+
+        if self._start:
+            inclusive = self._start[1]
+            rows = [row for row in rows
+                    if self._position(row, self._start, orders) >= (0 if inclusive else 1)]
+        if self._end:
+            before = self._end[1]
+            rows = [row for row in rows
+                    if self._position(row, self._end, orders) <= (-1 if before else 0)]
+
+        if self._limit is not None:
+            rows = rows[-self._limit:] if self._limit_to_last else rows[:self._limit]
+        return rows
+
+
+class AggregationResult:
+    def __init__(self, alias: str, value: int):
+        self.alias = alias
+        self.value = value
+
+
+class AggregationQuery:
+    """A count() over a query; get() returns [[AggregationResult]] as Firestore does"""
+
+    def __init__(self, query: Query, alias: str):
+        self._query = query
+        self._alias = alias
+
+    def get(self, transaction=None, **kwargs) -> List[List[AggregationResult]]:
+        return [[AggregationResult(self._alias, len(self._query._client._store.query(self._query)))]]
+
+
+class CollectionReference(Query):
+    def __init__(self, client: 'LocalFirestoreClient', name: str):
+        super().__init__(client, name)
+        self.id = name.rsplit('/', 1)[-1]
+
+    def document(self, document_id: Optional[str] = None) -> DocumentReference:
+        return DocumentReference(self._client, self._collection, document_id or uuid.uuid4().hex[:20])
+
+    def add(self, document_data, document_id=None):
+        doc_ref = self.document(document_id)
+        doc_ref.create(document_data)
+        return _now(), doc_ref
+
+    def list_documents(self) -> List[DocumentReference]:
+        return [self.document(doc_id) for doc_id in self._client._store.ids(self._collection)]
+
+
+class WriteBatch:
+    def __init__(self, client: 'LocalFirestoreClient'):
+        self._client = client
+        self._writes = []
+
+    def set(self, reference, document_data, merge=False):
+        self._writes.append(('set', reference, document_data, merge))
+
+    def create(self, reference, document_data):
+        self._writes.append(('create', reference, document_data, False))
+
+    def update(self, reference, field_updates):
+        self._writes.append(('update', reference, field_updates, False))
+
+    def delete(self, reference):
+        self._writes.append(('delete', reference, None, False))
+
+    def commit(self):
+        """Apply all writes atomically"""
+        self._client._store.commit(self._writes)
+        self._writes = []
+        return []
+
+    def __len__(self):
+        return len(self._writes)
+
+
+class Transaction(WriteBatch):
+    """Optimistic transaction: commit fails with Aborted if a document it read has changed since"""
+
+    def __init__(self, client: 'LocalFirestoreClient'):
+        super().__init__(client)
+        self._reads: Dict[Tuple[str, str], Optional[datetime]] = {}
+
+    def get(self, ref_or_query):
+        if isinstance(ref_or_query, DocumentReference):
+            return iter([ref_or_query.get(transaction=self)])
+        return ref_or_query.stream(transaction=self)
+
+    def _record_reads(self, snapshots):
+        for snapshot in snapshots:
+            key = (snapshot.reference._collection, snapshot.id)
+            self._reads.setdefault(key, snapshot.update_time)
+
+    def commit(self):
+        self._client._store.commit(self._writes, self._reads)
+        self._writes = []
+        return []
+
+
+class DocumentStore:
+    """Storage behind LocalFirestoreClient.
+
+    Subclasses load and persist plain documents; filtering, ordering,
+    transforms and atomic multi-document commits are shared.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self._last_commit = _now()
+
+    @contextmanager
+    def transaction(self):
+        """Hold the store exclusively while a commit checks its reads and applies its writes"""
+        with self.lock:
+            yield
+
+    def _commit_time(self) -> datetime:
+        # Strictly increasing, so update_time identifies a document version
+        now = _now()
+        self._last_commit = now if now > self._last_commit else self._last_commit + timedelta(microseconds=1)
+        return self._last_commit
+
+    def get(self, ref: DocumentReference, field_paths=None) -> DocumentSnapshot:
+        with self.lock:
+            data, create_time, update_time = self._load(ref._collection, ref.id)
+        if data is not None and field_paths:
+            data = _project(data, field_paths)
+        return DocumentSnapshot(ref, data, create_time, update_time)
+
+    def ids(self, collection: str) -> List[str]:
+        with self.lock:
+            return self._ids(collection)
+
+    def query(self, query: Query) -> List[DocumentSnapshot]:
+        with self.lock:
+            items = self._scan(query._collection, query._filters)
+        rows = query._evaluate([(doc_id, item[0]) for doc_id, item in items.items()])
+
+        snapshots = []
+        for doc_id, data in rows:
+            if query._projection is not None:
+                data = _project(data, query._projection)
+            ref = DocumentReference(query._client, query._collection, doc_id)
+            snapshots.append(DocumentSnapshot(ref, data, *items[doc_id][1:]))
+        return snapshots
+
+    def commit(self, writes, reads: Optional[Dict[Tuple[str, str], Optional[datetime]]] = None):
+        """Apply set/create/update/delete writes atomically, failing them all on any error.
+
+        reads maps documents a transaction read to the update_time it saw;
+        if any of them has changed since, nothing is written and Aborted is
+        raised so the transaction can be retried.
+        """
+        with self.transaction():
+            for (collection, doc_id), update_time in (reads or {}).items():
+                if self._load(collection, doc_id)[2] != update_time:
+                    raise gexc.Aborted(f"Transaction contention on {collection}/{doc_id}")
+
+            staged: Dict[Tuple[str, str], Optional[Dict[str, Any]]] = {}
+            for op, ref, data, merge in writes:
+                key = (ref._collection, ref.id)
+                current = staged[key] if key in staged else self._load(*key)[0]
+                if op == 'create':
+                    if current is not None:
+                        raise gexc.AlreadyExists(f"Document already exists: {ref.path}")
+                    current = {}
+                    _merge(current, data)
+                elif op == 'set':
+                    if not merge or current is None:
+                        current = {}
+                    _merge(current, data)
+                elif op == 'update':
+                    if current is None:
+                        raise gexc.NotFound(f"No document to update: {ref.path}")
+                    for path, value in data.items():
+                        _set_path(current, path, value)
+                else:
+                    current = None
+                staged[key] = current
+            self._write(staged, self._commit_time())
+
+    def close(self):
+        pass
+
+    def _load(self, collection: str, doc_id: str):
+        """Return (data, create_time, update_time) for a document; data is a private copy or None"""
+        raise NotImplementedError
+
+    def _ids(self, collection: str) -> List[str]:
+        raise NotImplementedError
+
+    def _scan(self, collection: str, filters) -> Dict[str, Tuple[Dict[str, Any], datetime, datetime]]:
+        """Return candidate documents for a query; filters are re-checked afterwards"""
+        raise NotImplementedError
+
+    def _write(self, staged: Dict[Tuple[str, str], Optional[Dict[str, Any]]], now: datetime):
+        raise NotImplementedError
+
+
+def _index_key(value):
+    """Hashable sort key that orders values like _compare"""
+    rank = _type_rank(value)
+    if rank == 0:
+        return (rank,)
+    if rank == 3:
+        return (rank, _normalize(value))
+    if rank == 6:
+        return (rank, value.path)
+    if rank >= 8:
+        return (rank, repr(value))
+    return (rank, value)
+
+
+class MemoryStore(DocumentStore):
+    """Keeps documents in process memory; each process has its own data.
+
+    Like Firestore's automatic single-field indexes, every field gets a
+    hash index (for == and ``in``) and a sorted index (for ordered queries
+    with cursors and limits) the first time a query needs one, so a page
+    query touches about as many documents as it returns.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._collections: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._times: Dict[Tuple[str, str], Tuple[datetime, datetime]] = {}
+        self._hash_indexes: Dict[str, Dict[str, Dict[Any, Set[str]]]] = {}
+        self._sorted_indexes: Dict[str, Dict[str, List[Tuple[Any, str]]]] = {}
+
+    def query(self, query: Query) -> List[DocumentSnapshot]:
+        with self.lock:
+            docs = self._collections.get(query._collection, {})
+            snapshots = []
+            for doc_id, data in self._plan(query, docs):
+                data = _project(data, query._projection) if query._projection is not None else copy.deepcopy(data)
+                ref = DocumentReference(query._client, query._collection, doc_id)
+                snapshots.append(DocumentSnapshot(ref, data, *self._times[(query._collection, doc_id)]))
+            return snapshots
+
+    def _plan(self, query: Query, docs) -> List[Tuple[str, Dict[str, Any]]]:
+        orders = query._effective_orders()
+        walkable = (not query._limit_to_last and len(orders) == 2 and orders[1][0] == '__name__'
+                    and orders[0][0] != '__name__' and orders[0][1] == orders[1][1])
+
+        candidates = self._equality_candidates(query)
+        if candidates is not None and (len(candidates) <= EQUALITY_SCAN_LIMIT or not walkable):
+            return query._evaluate([(doc_id, docs[doc_id]) for doc_id in candidates])
+        if walkable:
+            return self._walk(query, docs, orders[0])
+        return query._evaluate(list(docs.items()))
+
+    def _equality_candidates(self, query: Query) -> Optional[Set[str]]:
+        """The smallest set of ids matching one of the query's == or ``in`` filters"""
+        best = None
+        for field, op, value in query._filters:
+            if field == '__name__' or op not in ('==', 'in'):
+                continue
+            index = self._hash_index(query._collection, field)
+            if op == '==':
+                ids = index.get(_index_key(value), set())
+            else:
+                ids = set().union(*(index.get(_index_key(item), set()) for item in value))
+            if best is None or len(ids) < len(best):
+                best = ids
+        return best
+
+    def _walk(self, query: Query, docs, order: Tuple[str, str]) -> List[Tuple[str, Dict[str, Any]]]:
+        """Read a sorted index in query order, stopping once the limit is reached"""
+        field, direction = order
+        orders = query._effective_orders()
+        index = self._sorted_index(query._collection, field)
+        lo, hi = 0, len(index)
+
+        # Narrow the index range using range filters and cursors on the ordered field
+        for f, op, value in query._filters:
+            if f == field and op in _RANGE_OPERATORS:
+                # Range filters only match values of their own type
+                key = _index_key(value)
+                if op in ('>', '>='):
+                    lo = max(lo, bisect_left(index, (key,)))
+                    hi = min(hi, bisect_left(index, ((key[0] + 1,),)))
+                else:
+                    hi = min(hi, bisect_right(index, (key, _MAX_ID)))
+                    lo = max(lo, bisect_left(index, ((key[0],),)))
+        for cursor, is_start in ((query._start, True), (query._end, False)):
+            if cursor and cursor[0]:
+                key = _index_key(cursor[0][0])
+                if is_start != (direction == DESCENDING):
+                    lo = max(lo, bisect_left(index, (key,)))
+                else:
+                    hi = min(hi, bisect_right(index, (key, _MAX_ID)))
+
+        positions = range(hi - 1, lo - 1, -1) if direction == DESCENDING else range(lo, hi)
+        rows = []
+        for position in positions:
+            doc_id = index[position][1]
+            row = (doc_id, docs[doc_id])
+            if query._start and query._position(row, query._start, orders) < (0 if query._start[1] else 1):
+                continue
+            if query._end and query._position(row, query._end, orders) > (-1 if query._end[1] else 0):
+                break
+            if not query._matches(*row):
+                continue
+            rows.append(row)
+            if query._limit is not None and len(rows) >= query._limit:
+                break
+        return rows
+
+    def _hash_index(self, collection: str, field: str) -> Dict[Any, Set[str]]:
+        indexes = self._hash_indexes.setdefault(collection, {})
+        if field not in indexes:
+            index: Dict[Any, Set[str]] = {}
+            for doc_id, data in self._collections.get(collection, {}).items():
+                try:
+                    index.setdefault(_index_key(_get_path(data, field)), set()).add(doc_id)
+                except KeyError:
+                    continue
+            indexes[field] = index
+        return indexes[field]
+
+    def _sorted_index(self, collection: str, field: str) -> List[Tuple[Any, str]]:
+        indexes = self._sorted_indexes.setdefault(collection, {})
+        if field not in indexes:
+            index = []
+            for doc_id, data in self._collections.get(collection, {}).items():
+                try:
+                    index.append((_index_key(_get_path(data, field)), doc_id))
+                except KeyError:
+                    continue
+            index.sort()
+            indexes[field] = index
+        return indexes[field]
+
+    def _reindex(self, collection: str, doc_id: str, old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]]):
+        """Move a document's entries in every index built for its collection"""
+        def key(data, field):
+            try:
+                return _index_key(_get_path(data, field)) if data is not None else None
+            except KeyError:
+                return None
+
+        for field, index in self._hash_indexes.get(collection, {}).items():
+            before, after = key(old, field), key(new, field)
+            if before == after:
+                continue
+            if before is not None:
+                index[before].discard(doc_id)
+                if not index[before]:
+                    del index[before]
+            if after is not None:
+                index.setdefault(after, set()).add(doc_id)
+
+        for field, index in self._sorted_indexes.get(collection, {}).items():
+            before, after = key(old, field), key(new, field)
+            if before == after:
+                continue
+            if before is not None:
+                position = bisect_left(index, (before, doc_id))
+                if position < len(index) and index[position] == (before, doc_id):
+                    del index[position]
+            if after is not None:
+                insort(index, (after, doc_id))
+
+    def _load(self, collection, doc_id):
+        data = self._collections.get(collection, {}).get(doc_id)
+        create_time, update_time = self._times.get((collection, doc_id), (None, None))
+        return copy.deepcopy(data), create_time, update_time
+
+    def _ids(self, collection):
+        return list(self._collections.get(collection, {}))
+
+    def _write(self, staged, now):
+        for (collection, doc_id), data in staged.items():
+            docs = self._collections.setdefault(collection, {})
+            self._reindex(collection, doc_id, docs.get(doc_id), data)
+            if data is None:
+                docs.pop(doc_id, None)
+                self._times.pop((collection, doc_id), None)
+                continue
+            created = self._times[(collection, doc_id)][0] if doc_id in docs else now
+            docs[doc_id] = data
+            self._times[(collection, doc_id)] = (created, now)
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {'__datetime__': _normalize(value).strftime('%Y-%m-%dT%H:%M:%S.%f')}
+    if isinstance(value, bytes):
+        return {'__bytes__': base64.b64encode(value).decode('ascii')}
+    if isinstance(value, DocumentReference):
+        return {'__reference__': value.path}
+    raise TypeError(f"Cannot store {type(value).__name__} in a document")
+
+
+def _decode_object(obj):
+    if '__datetime__' in obj and len(obj) == 1:
+        return datetime.strptime(obj['__datetime__'], '%Y-%m-%dT%H:%M:%S.%f').replace(tzinfo=timezone.utc)
+    if '__bytes__' in obj and len(obj) == 1:
+        return base64.b64decode(obj['__bytes__'])
+    return obj
+
+
+def _sql_value(value):
+    """The value a json_extract() expression yields for a stored field value, or None if not indexable"""
+    if isinstance(value, datetime):
+        return _encode_value(value)['__datetime__']
+    if isinstance(value, (int, float, str)) and not isinstance(value, bool):
+        return value
+    return None
+
+
+class SqliteStore(DocumentStore):
+    """Keeps documents as JSON rows in a SQLite database shared by every process using the file.
+
+    Fields listed in INDEXED_FIELDS get expression indexes and their
+    equality, ``in`` and range filters are pushed down to SQLite.
+    Commits take SQLite's write lock (BEGIN IMMEDIATE) while checking a
+    transaction's reads, so transactions stay serializable across
+    processes as well as threads.
+    """
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._depth = 0
+        with self.lock:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS documents ('
+                'collection TEXT NOT NULL, id TEXT NOT NULL, data TEXT NOT NULL, '
+                'create_time TEXT NOT NULL, update_time TEXT NOT NULL, '
+                'PRIMARY KEY (collection, id))'
+            )
+            for collection, fields in INDEXED_FIELDS.items():
+                for field in fields:
+                    self._conn.execute(
+                        f'CREATE INDEX IF NOT EXISTS idx_{collection}_{field} '
+                        f'ON documents (collection, {self._field_expression(field)}) '
+                        f"WHERE collection = '{collection}'"
+                    )
+
+    @staticmethod
+    def _field_expression(field: str) -> str:
+        # Datetimes are stored as {"__datetime__": iso}; COALESCE picks the
+        # sortable ISO string for them and the plain value otherwise
+        return (f"COALESCE(json_extract(data, '$.{field}.__datetime__'), "
+                f"json_extract(data, '$.{field}'))")
+
+    @contextmanager
+    def transaction(self):
+        with self.lock:
+            outermost = self._depth == 0
+            if outermost:
+                self._conn.execute('BEGIN IMMEDIATE')
+            self._depth += 1
+            try:
+                yield
+            except BaseException:
+                self._depth -= 1
+                if outermost:
+                    self._conn.execute('ROLLBACK')
+                raise
+            self._depth -= 1
+            if outermost:
+                self._conn.execute('COMMIT')
+
+    def close(self):
+        with self.lock:
+            self._conn.close()
+
+    def _row(self, row):
+        data, create_time, update_time = row
+        return (json.loads(data, object_hook=_decode_object),
+                datetime.fromisoformat(create_time), datetime.fromisoformat(update_time))
+
+    def _load(self, collection, doc_id):
+        row = self._conn.execute(
+            'SELECT data, create_time, update_time FROM documents WHERE collection = ? AND id = ?',
+            (collection, doc_id)
+        ).fetchone()
+        return self._row(row) if row else (None, None, None)
+
+    def _ids(self, collection):
+        return [row[0] for row in self._conn.execute(
+            'SELECT id FROM documents WHERE collection = ? ORDER BY id', (collection,))]
+
+    def _scan(self, collection, filters):
+        clauses, params = ['collection = ?'], [collection]
+        indexed = INDEXED_FIELDS.get(collection, [])
+        for field, op, value in filters:
+            if field not in indexed:
+                continue
+            expression = self._field_expression(field)
+            if op == '==' or op in _RANGE_OPERATORS:
+                sql_value = _sql_value(value)
+                if sql_value is None:
+                    continue
+                clauses.append(f'{expression} {"=" if op == "==" else op} ?')
+                params.append(sql_value)
+            elif op == 'in':
+                values = [_sql_value(item) for item in value]
+                if not values or any(item is None for item in values):
+                    continue
+                clauses.append(f'{expression} IN ({", ".join("?" * len(values))})')
+                params.extend(values)
+
+        rows = self._conn.execute(
+            f'SELECT id, data, create_time, update_time FROM documents WHERE {" AND ".join(clauses)}',
+            params
+        )
+        return {row[0]: self._row(row[1:]) for row in rows}
+
+    def _write(self, staged, now):
+        # Called from commit(), which already holds the write transaction
+        timestamp = now.isoformat()
+        for (collection, doc_id), data in staged.items():
+            if data is None:
+                self._conn.execute('DELETE FROM documents WHERE collection = ? AND id = ?', (collection, doc_id))
+                continue
+            self._conn.execute(
+                'INSERT INTO documents (collection, id, data, create_time, update_time) VALUES (?, ?, ?, ?, ?) '
+                'ON CONFLICT (collection, id) DO UPDATE SET data = excluded.data, update_time = excluded.update_time',
+                (collection, doc_id, json.dumps(data, default=_encode_value), timestamp, timestamp)
+            )
+
+
+class LocalFirestoreClient:
+    """A Firestore client backed by a local DocumentStore.
+
+    Implements the subset of the google-cloud-firestore API the services
+    use (collections, documents, queries with cursors and projections,
+    batches, transactions, get_all and field transforms) with the same
+    ordering and filter semantics.
+    """
+
+    def __init__(self, store: Optional[DocumentStore] = None):
+        self._store = store or MemoryStore()
+
+    def collection(self, name: str) -> CollectionReference:
+        return CollectionReference(self, name)
+
+    def document(self, path: str) -> DocumentReference:
+        collection, doc_id = path.rsplit('/', 1)
+        return DocumentReference(self, collection, doc_id)
+
+    def batch(self) -> WriteBatch:
+        return WriteBatch(self)
+
+    def transaction(self) -> Transaction:
+        return Transaction(self)
+
+    def get_all(self, references, field_paths=None, transaction=None) -> Iterator[DocumentSnapshot]:
+        for ref in references:
+            yield ref.get(field_paths, transaction=transaction)
+
+    def run_transaction(self, callback, max_attempts: int = MAX_TRANSACTION_ATTEMPTS):
+        """Run callback(transaction) and commit its writes, retrying if a document it read changed"""
+        for attempt in range(1, max_attempts + 1):
+            transaction = Transaction(self)
+            result = callback(transaction)
+            try:
+                transaction.commit()
+                return result
+            except gexc.Aborted:
+                if attempt == max_attempts:
+                    raise
+                # Jittered exponential backoff before retrying, like the Firestore client
+                time.sleep(random.uniform(0, TRANSACTION_BACKOFF_SECONDS * 2 ** attempt))
+
+    def close(self):
+        self._store.close()
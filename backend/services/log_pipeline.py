@@ -0,0 +1,212 @@
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from config import Config
+from services.json_provider import dumps_bytes
+from services.tracing import current_trace_id
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Arguments of these types can't change after the call, so formatting them
+# is left to the listener thread
+_IMMUTABLE_ARGS = (str, int, float, bool, type(None))
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional['NonBlockingQueueHandler'] = None
+_lock = threading.Lock()
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """Hands records to the listener thread without ever waiting on it.
+
+    When the queue is full the record is dropped and counted; the next
+    record that fits is preceded by a warning saying how many were lost.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The stdlib version formats the message here, on the caller's
+        # thread. Only snapshot what could change before the listener gets to it.
+        record.trace_id = current_trace_id()
+        if record.args:
+            # A lone mapping argument is the caller's own dict, so it's copied
+            mapping = isinstance(record.args, dict)
+            values = record.args.values() if mapping else record.args
+            if not all(isinstance(value, _IMMUTABLE_ARGS) for value in values):
+                record.msg = record.getMessage()
+                record.args = None
+            elif mapping:
+                record.args = dict(record.args)
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        if self.dropped:
+            with self._dropped_lock:
+                dropped, self.dropped = self.dropped, 0
+            if dropped:
+                self._put(logging.makeLogRecord({
+                    'name': __name__, 'levelno': logging.WARNING, 'levelname': 'WARNING',
+                    'msg': '%d log records dropped, the log queue was full', 'args': (dropped,)
+                }))
+        self._put(record)
+
+    def _put(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += 1
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps a fraction of the INFO and DEBUG records from chatty loggers.
+
+    rates maps logger names to the fraction kept; a logger uses the rate
+    of its closest configured ancestor. Warnings and errors always pass.
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+        self._resolved: Dict[str, float] = {}
+
+    def _rate(self, name: str) -> float:
+        rate = self._resolved.get(name)
+        if rate is None:
+            rate = 1.0
+            candidate = name
+            while candidate:
+                if candidate in self.rates:
+                    rate = self.rates[candidate]
+                    break
+                candidate = candidate.rpartition('.')[0]
+            self._resolved[name] = rate
+        return rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.INFO:
+            return True
+        rate = self._rate(record.name)
+        return rate >= 1 or random.random() < rate
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line, carrying the request's trace id when there is one"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'timestamp': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'pid': record.process,
+            'thread': record.threadName
+        }
+        trace_id = getattr(record, 'trace_id', None)
+        if trace_id:
+            entry['trace_id'] = trace_id
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exception'] = record.exc_text
+        return dumps_bytes(entry).decode('utf-8')
+
+
+def parse_sample_rates(value: str) -> Dict[str, float]:
+    """Parse 'logger=rate,logger=rate' (e.g. services.firebase_service=0.01)"""
+    rates = {}
+    for item in value.split(','):
+        if not item.strip():
+            continue
+        name, separator, rate = item.partition('=')
+        if not separator:
+            raise ValueError(f"Invalid log sample rate '{item}', expected logger=rate")
+        rates[name.strip()] = float(rate)
+    return rates
+
+
+def _file_handler(path: str) -> logging.Handler:
+    """Handler for the log file. size and time rotation rename the file from
+    inside the process, which is only safe when no other process writes it.
+    With none, any number of processes can append and an external logrotate
+    rotates the file; each process reopens it once it has been moved.
+    """
+    if Config.LOG_ROTATION == 'size':
+        return logging.handlers.RotatingFileHandler(
+            path, maxBytes=Config.LOG_MAX_BYTES, backupCount=Config.LOG_BACKUP_COUNT
+        )
+    if Config.LOG_ROTATION == 'time':
+        return logging.handlers.TimedRotatingFileHandler(
+            path, when=Config.LOG_ROTATE_WHEN, backupCount=Config.LOG_BACKUP_COUNT, utc=True
+        )
+    if Config.LOG_ROTATION == 'none':
+        return logging.handlers.WatchedFileHandler(path)
+    raise ValueError(f"Invalid LOG_ROTATION '{Config.LOG_ROTATION}', expected size, time or none")
+
+
+def _restart_after_fork():
+    """Give a forked child its own queue and listener thread.
+
+    Threads don't survive fork(), so without this a worker forked after
+    configure_logging would queue records that nothing ever writes.
+    """
+    global _listener, _lock
+    if _listener is None:
+        return
+    _lock = threading.Lock()
+    _queue_handler._dropped_lock = threading.Lock()
+    _queue_handler.queue = queue.Queue(maxsize=Config.LOG_QUEUE_SIZE)
+    _listener = logging.handlers.QueueListener(_queue_handler.queue, *_listener.handlers, respect_handler_level=True)
+    _listener.start()
+
+
+def stop_logging():
+    """Write out everything still queued and stop the listener thread"""
+    with _lock:
+        if _listener is not None and _listener._thread is not None:
+            _listener.stop()
+
+
+def configure_logging(log_file: Optional[str] = None):
+    """Route all logging through a queue to a background thread that does the formatting and I/O.
+
+    Records go to stderr and, if log_file is given, to that file with
+    Config.LOG_ROTATION. Config.LOG_SAMPLE_RATES thins out INFO records
+    from busy loggers before they are queued. Calling it again is a no-op.
+    """
+    global _listener, _queue_handler
+    with _lock:
+        if _listener is not None:
+            return
+
+        formatter = JSONFormatter() if Config.LOG_FORMAT == 'json' else logging.Formatter(TEXT_FORMAT)
+        handlers = [logging.StreamHandler()]
+        if log_file:
+            handlers.append(_file_handler(log_file))
+        for handler in handlers:
+            handler.setFormatter(formatter)
+
+        _queue_handler = NonBlockingQueueHandler(queue.Queue(maxsize=Config.LOG_QUEUE_SIZE))
+        rates = parse_sample_rates(Config.LOG_SAMPLE_RATES)
+        if rates:
+            _queue_handler.addFilter(SamplingFilter(rates))
+
+        root = logging.getLogger()
+        root.setLevel(Config.LOG_LEVEL.upper())
+        root.addHandler(_queue_handler)
+
+        _listener = logging.handlers.QueueListener(_queue_handler.queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        atexit.register(stop_logging)
+        os.register_at_fork(after_in_child=_restart_after_fork)
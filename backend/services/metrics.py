@@ -0,0 +1,215 @@
+import contextvars
+import functools
+import hmac
+import inspect
+import ipaddress
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+from flask import Flask, Response, g, jsonify, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+)
+
+from config import Config
+from services.tracing import SPAN_KIND_CLIENT, is_warm_up_request, span
+
+# prometheus_client switches to per-process files when this is set before import;
+# gunicorn.conf.py sets it so /metrics can add up every worker's samples
+MULTIPROCESS_DIR_ENV = 'PROMETHEUS_MULTIPROC_DIR'
+
+DOCUMENT_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 5000, 10000, 50000, 100000)
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds',
+    'Time to produce a response (streamed bodies are timed to the first byte)',
+    ['method', 'route']
+)
+REQUESTS = Counter('http_requests_total', 'Responses returned', ['method', 'route', 'status'])
+REQUESTS_IN_FLIGHT = Gauge(
+    'http_requests_in_flight', 'Requests currently being handled', ['route'], multiprocess_mode='livesum'
+)
+REQUEST_DOCUMENTS_READ = Histogram(
+    'http_request_documents_read', 'Firestore documents read while handling a request',
+    ['method', 'route'], buckets=DOCUMENT_BUCKETS
+)
+
+SERVICE_LATENCY = Histogram('service_call_duration_seconds', 'FirebaseService and StellarService call time',
+                            ['service', 'method'])
+SERVICE_ERRORS = Counter('service_call_errors_total', 'Service calls that raised or logged an error',
+                         ['service', 'method'])
+
+HORIZON_LATENCY = Histogram('horizon_request_duration_seconds', 'Horizon round trip time', ['operation'])
+HORIZON_ERRORS = Counter('horizon_request_errors_total', 'Horizon requests that raised', ['operation', 'error'])
+
+# Per-request read counter; gather() copies context into its threads so fan-out reads count too
+_request_reads: contextvars.ContextVar[Optional['_ReadCounter']] = contextvars.ContextVar('request_reads', default=None)
+# The innermost instrumented service call, so errors it logs are attributed to it
+_current_call: contextvars.ContextVar[Optional['_Call']] = contextvars.ContextVar('service_call', default=None)
+
+
+class _ReadCounter:
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def add(self, count: int):
+        with self._lock:
+            self.count += count
+
+
+class _Call:
+    __slots__ = ('failed',)
+
+    def __init__(self):
+        self.failed = False
+
+
+class _ErrorLogFilter(logging.Filter):
+    """Marks the active service call as failed when it logs an error.
+
+    The services catch their exceptions and log them, so the log is the
+    only place most failures surface.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.ERROR:
+            call = _current_call.get()
+            if call is not None:
+                call.failed = True
+        return True
+
+
+def instrument_service(name: str):
+    """Class decorator timing and tracing every public method and counting the ones that fail"""
+    def decorate(cls):
+        if not Config.METRICS_ENABLED:
+            return cls
+
+        logging.getLogger(cls.__module__).addFilter(_ErrorLogFilter())
+        for attr, method in list(vars(cls).items()):
+            if attr.startswith('_') or not inspect.isfunction(method):
+                continue
+            setattr(cls, attr, _timed(method, f'{name}.{attr}', SERVICE_LATENCY.labels(name, attr),
+                                      SERVICE_ERRORS.labels(name, attr)))
+        return cls
+    return decorate
+
+
+def _timed(method, span_name, latency, errors):
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        call = _Call()
+        token = _current_call.set(call)
+        started = time.perf_counter()
+        try:
+            with span(span_name):
+                return method(*args, **kwargs)
+        except BaseException:
+            call.failed = True
+            raise
+        finally:
+            latency.observe(time.perf_counter() - started)
+            _current_call.reset(token)
+            if call.failed:
+                errors.inc()
+    return wrapper
+
+
+@contextmanager
+def horizon_call(operation: str):
+    """Time and trace one Horizon request, counting it as an error if it raises"""
+    started = time.perf_counter()
+    try:
+        with span(f'horizon.{operation}', SPAN_KIND_CLIENT):
+            yield
+    except Exception as e:
+        HORIZON_ERRORS.labels(operation, type(e).__name__).inc()
+        raise
+    finally:
+        HORIZON_LATENCY.labels(operation).observe(time.perf_counter() - started)
+
+
+def count_reads(count: int = 1):
+    """Add Firestore document reads to the current request's total (see services.firestore_reads)"""
+    reads = _request_reads.get()
+    if reads is not None:
+        reads.add(count)
+
+
+def _route() -> str:
+    return request.url_rule.rule if request.url_rule else 'unmatched'
+
+
+def _start_request():
+    if is_warm_up_request():
+        return
+    g.metrics_started = time.perf_counter()
+    g.metrics_route = _route()
+    g.metrics_reads = _ReadCounter()
+    _request_reads.set(g.metrics_reads)
+    REQUESTS_IN_FLIGHT.labels(g.metrics_route).inc()
+
+
+def _finish_request(response):
+    started = g.pop('metrics_started', None)
+    if started is not None:
+        route = g.metrics_route
+        REQUEST_LATENCY.labels(request.method, route).observe(time.perf_counter() - started)
+        REQUESTS.labels(request.method, route, str(response.status_code)).inc()
+        REQUEST_DOCUMENTS_READ.labels(request.method, route).observe(g.metrics_reads.count)
+    return response
+
+
+def _teardown_request(error=None):
+    route = g.pop('metrics_route', None)
+    if route is not None:
+        REQUESTS_IN_FLIGHT.labels(route).dec()
+        _request_reads.set(None)
+
+
+def metrics_registry():
+    """Registry to expose: every worker's files in multiprocess mode, otherwise this process"""
+    if os.environ.get(MULTIPROCESS_DIR_ENV):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def _metrics_allowed(networks) -> bool:
+    """Whether the request carries Config.METRICS_TOKEN or comes from an allowed address"""
+    if Config.METRICS_TOKEN:
+        auth_header = request.headers.get('Authorization', '')
+        if auth_header.startswith('Bearer ') and hmac.compare_digest(
+            auth_header[len('Bearer '):].encode(), Config.METRICS_TOKEN.encode()
+        ):
+            return True
+    try:
+        address = ipaddress.ip_address(request.remote_addr or '')
+    except ValueError:
+        return False
+    return any(address in network for network in networks)
+
+
+def init_metrics(app: Flask):
+    """Record request metrics for the app and serve them at Config.METRICS_PATH"""
+    if not Config.METRICS_ENABLED:
+        return
+
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    app.teardown_request(_teardown_request)
+
+    networks = [ipaddress.ip_network(ip.strip(), strict=False) for ip in Config.METRICS_ALLOWED_IPS]
+
+    def metrics():
+        if not _metrics_allowed(networks):
+            return jsonify({'error': 'Forbidden'}), 403
+        return Response(generate_latest(metrics_registry()), mimetype=CONTENT_TYPE_LATEST)
+
+    app.add_url_rule(Config.METRICS_PATH, 'metrics', metrics, methods=['GET'])
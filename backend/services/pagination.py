@@ -0,0 +1,123 @@
+import base64
+import json
+from datetime import datetime
+from typing import Optional, List, Dict, Any, Tuple
+
+from config import Config
+from services.firestore_reads import stream_query
+
+FORWARD = 'next'
+BACKWARD = 'prev'
+
+
+def clamp_page_size(limit: Optional[Any], default: Optional[int] = None) -> int:
+    """Parse a requested page size and cap it at Config.MAX_PAGE_SIZE"""
+    if limit is None or limit == '':
+        limit = default or Config.DEFAULT_PAGE_SIZE
+    limit = int(limit)
+    if limit <= 0:
+        raise ValueError('limit must be positive')
+    return min(limit, Config.MAX_PAGE_SIZE)
+
+
+def encode_page_token(order_field: str, values: List[Any], direction: str) -> str:
+    """Build an opaque token for a cursor position"""
+    payload = {
+        'f': order_field,
+        'd': direction,
+        'v': [{'dt': v.isoformat()} if isinstance(v, datetime) else v for v in values]
+    }
+    raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_page_token(token: str, order_field: str) -> Tuple[List[Any], str]:
+    """Return the cursor values and direction encoded in a page token"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        values = [
+            datetime.fromisoformat(v['dt']) if isinstance(v, dict) and 'dt' in v else v
+            for v in payload['v']
+        ]
+        direction = payload['d']
+    except Exception:
+        raise ValueError('Invalid page token')
+
+    if payload.get('f') != order_field or direction not in (FORWARD, BACKWARD):
+        raise ValueError('Invalid page token')
+    return values, direction
+
+
+def paginate_query(query, order_field: str, page_size: int, page_token: Optional[str] = None,
+                   descending: bool = True) -> Dict[str, Any]:
+    """Fetch one page of a query ordered by (order_field, document id).
+
+    Uses start_after cursors, so every page reads at most page_size + 1
+    documents regardless of how deep into the collection it is. Returns the
+    page's snapshots plus tokens for the following and preceding pages.
+    """
+    cursor, direction = (None, FORWARD)
+    if page_token:
+        cursor, direction = decode_page_token(page_token, order_field)
+
+    # Imported here so the routes can use clamp_page_size without loading the Firestore client
+    from firebase_admin import firestore
+    forward = firestore.Query.DESCENDING if descending else firestore.Query.ASCENDING
+    backward = firestore.Query.ASCENDING if descending else firestore.Query.DESCENDING
+    order = forward if direction == FORWARD else backward
+
+    query = query.order_by(order_field, direction=order).order_by('__name__', direction=order)
+    if cursor:
+        query = query.start_after({order_field: cursor[0], '__name__': cursor[1]})
+
+    snapshots = list(stream_query(query.limit(page_size + 1)))
+    has_more = len(snapshots) > page_size
+    snapshots = snapshots[:page_size]
+
+    if direction == BACKWARD:
+        snapshots.reverse()
+
+    def token_for(snapshot, token_direction):
+        return encode_page_token(order_field, [snapshot.get(order_field), snapshot.id], token_direction)
+
+    next_token = prev_token = None
+    if snapshots:
+        if direction == FORWARD:
+            next_token = token_for(snapshots[-1], FORWARD) if has_more else None
+            prev_token = token_for(snapshots[0], BACKWARD) if cursor else None
+        else:
+            next_token = token_for(snapshots[-1], FORWARD)
+            prev_token = token_for(snapshots[0], BACKWARD) if has_more else None
+
+    return {
+        'snapshots': snapshots,
+        'next_page_token': next_token,
+        'prev_page_token': prev_token
+    }
+
+
+def iter_query_chunks(query, order_field: str, chunk_size: int = 500, descending: bool = False):
+    """Yield every snapshot of a query, reading it in chunks of chunk_size.
+
+    Each chunk is a separate start_after query, so arbitrarily large result
+    sets are streamed with bounded memory and no single long-lived RPC.
+    """
+    from firebase_admin import firestore
+    direction = firestore.Query.DESCENDING if descending else firestore.Query.ASCENDING
+    query = query.order_by(order_field, direction=direction).order_by('__name__', direction=direction)
+
+    last = None
+    while True:
+        chunk_query = query
+        if last is not None:
+            chunk_query = chunk_query.start_after({order_field: last.get(order_field), '__name__': last.id})
+
+        count = 0
+        for snapshot in stream_query(chunk_query.limit(chunk_size)):
+            count += 1
+            last = snapshot
+            yield snapshot
+
+        if count < chunk_size:
+            return
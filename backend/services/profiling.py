@@ -0,0 +1,302 @@
+import contextvars
+import cProfile
+import json
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+from flask import Flask, g, request
+
+from config import Config
+from services.tracing import current_trace_id, is_warm_up_request
+
+logger = logging.getLogger(__name__)
+
+# Output formats: folded stacks from the sampler (flamegraph.pl, speedscope)
+# or a cProfile dump (pstats, snakeviz)
+PROFILE_FORMATS = {
+    'collapsed': 'text/plain',
+    'pstats': 'application/octet-stream'
+}
+
+PROFILE_ID_HEADER = 'X-Profile-Id'
+
+_PROFILE_ID = re.compile(r'^\d{13}-\d+-[0-9a-f]{6}$')
+_ENABLE_VALUES = {'1', 'true', 'yes'}
+
+# The profile of the request being handled; gather() copies context onto
+# its pool threads, which then get sampled alongside the request thread
+_current_profile: contextvars.ContextVar[Optional['RequestProfile']] = contextvars.ContextVar('profile', default=None)
+
+_rotation_lock = threading.Lock()
+
+
+class StackSampler:
+    """Statistical profiler: a background thread records the stacks of the
+    watched threads every `interval` seconds.
+
+    The profiled code runs untouched, so the cost is one stack walk per
+    sample rather than a hook on every call.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.samples = 0
+        self._stacks: Counter = Counter()
+        self._threads = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='profile-sampler', daemon=True)
+
+    def watch(self, thread_id: int):
+        with self._lock:
+            self._threads.add(thread_id)
+
+    def unwatch(self, thread_id: int):
+        with self._lock:
+            self._threads.discard(thread_id)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                threads = list(self._threads)
+            frames = sys._current_frames()
+            for thread_id in threads:
+                frame = frames.get(thread_id)
+                if frame is not None:
+                    self._stacks[_fold(frame)] += 1
+            self.samples += 1
+            del frames
+
+    def collapsed(self) -> str:
+        return ''.join(f"{stack} {count}\n" for stack, count in self._stacks.most_common())
+
+
+def _frame_label(code) -> str:
+    path = code.co_filename.replace('\\', '/').rsplit('/', 2)
+    return f"{code.co_name} ({'/'.join(path[-2:])}:{code.co_firstlineno})"
+
+
+def _fold(frame) -> str:
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame.f_code))
+        frame = frame.f_back
+    return ';'.join(reversed(labels))
+
+
+class RequestProfile:
+    """One profiled request: the profiler plus what's needed to label its output"""
+
+    def __init__(self, profile_format: str, trigger: str):
+        self.profile_id = f"{int(time.time() * 1000)}-{os.getpid()}-{os.urandom(3).hex()}"
+        self.format = profile_format
+        self.trigger = trigger
+        self.method = request.method
+        self.route = request.url_rule.rule if request.url_rule else 'unmatched'
+        self.path = request.path
+        self.trace_id = current_trace_id()
+        self.status_code = None
+        self._thread_id = threading.get_ident()
+        self._started = time.perf_counter()
+        self.duration_ms = None
+        if profile_format == 'pstats':
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        else:
+            self._profiler = StackSampler(Config.PROFILE_INTERVAL_MS / 1000)
+            self._profiler.watch(self._thread_id)
+            self._profiler.start()
+
+    def stop(self):
+        if self.format == 'pstats':
+            self._profiler.disable()
+        else:
+            self._profiler.stop()
+        self.duration_ms = round((time.perf_counter() - self._started) * 1000, 3)
+
+    def metadata(self) -> Dict[str, Any]:
+        return {
+            'id': self.profile_id,
+            'format': self.format,
+            'trigger': self.trigger,
+            'method': self.method,
+            'route': self.route,
+            'path': self.path,
+            'status_code': self.status_code,
+            'duration_ms': self.duration_ms,
+            'samples': self._profiler.samples if self.format == 'collapsed' else None,
+            'trace_id': self.trace_id,
+            'pid': os.getpid(),
+            'created_at': int(self.profile_id.split('-', 1)[0]) / 1000
+        }
+
+    def save(self, directory: str):
+        data_path = os.path.join(directory, f"{self.profile_id}.{self.format}")
+        if self.format == 'pstats':
+            self._profiler.dump_stats(data_path)
+        else:
+            with open(data_path, 'w') as f:
+                f.write(self._profiler.collapsed())
+        with open(os.path.join(directory, f"{self.profile_id}.json"), 'w') as f:
+            json.dump(self.metadata(), f)
+
+
+@contextmanager
+def profiled_thread():
+    """Sample the current thread as part of the request profile it was handed (see services.concurrency)"""
+    profile = _current_profile.get()
+    if profile is None or profile.format != 'collapsed' or profile._thread_id == threading.get_ident():
+        yield
+        return
+
+    thread_id = threading.get_ident()
+    profile._profiler.watch(thread_id)
+    try:
+        yield
+    finally:
+        profile._profiler.unwatch(thread_id)
+
+
+def _requested_format() -> Optional[str]:
+    value = (request.headers.get(Config.PROFILE_HEADER) or request.args.get('profile') or '').lower()
+    if value in _ENABLE_VALUES:
+        return Config.PROFILE_DEFAULT_FORMAT
+    return value if value in PROFILE_FORMATS else None
+
+
+def _start(profile_format: str, trigger: str):
+    profile = RequestProfile(profile_format, trigger)
+    g.profile = profile
+    _current_profile.set(profile)
+
+
+def start_requested_profile():
+    """Profile the rest of the request if the caller asked for it.
+
+    Called by admin_required once the caller is known to be an admin, so the
+    header or ?profile= flag does nothing for anyone else.
+    """
+    if not Config.PROFILING_ENABLED or g.get('profile') is not None:
+        return
+    profile_format = _requested_format()
+    if profile_format is not None:
+        _start(profile_format, 'requested')
+
+
+def _start_sampled_profile():
+    if random.random() < Config.PROFILE_SAMPLE_RATE and not is_warm_up_request():
+        _start(Config.PROFILE_DEFAULT_FORMAT, 'sampled')
+
+
+def _finish_profile(response):
+    profile = g.get('profile')
+    if profile is not None:
+        profile.status_code = response.status_code
+        response.headers[PROFILE_ID_HEADER] = profile.profile_id
+    return response
+
+
+def _end_profile(error=None):
+    profile = g.pop('profile', None)
+    if profile is None:
+        return
+    _current_profile.set(None)
+    profile.stop()
+    try:
+        os.makedirs(Config.PROFILE_DIR, exist_ok=True)
+        profile.save(Config.PROFILE_DIR)
+        rotate_profiles()
+    except OSError as e:
+        logger.error(f"Failed to store profile {profile.profile_id}: {e}")
+
+
+def _stored_profiles() -> List[Dict[str, Any]]:
+    """Stored profiles, oldest first, with the files that make up each one"""
+    profiles = {}
+    try:
+        names = os.listdir(Config.PROFILE_DIR)
+    except FileNotFoundError:
+        return []
+    for name in names:
+        profile_id, _, extension = name.partition('.')
+        if not _PROFILE_ID.match(profile_id):
+            continue
+        try:
+            size = os.path.getsize(os.path.join(Config.PROFILE_DIR, name))
+        except FileNotFoundError:
+            continue
+        entry = profiles.setdefault(profile_id, {'id': profile_id, 'files': [], 'size': 0, 'format': None})
+        entry['files'].append(name)
+        entry['size'] += size
+        if extension in PROFILE_FORMATS:
+            entry['format'] = extension
+    # Ids start with a millisecond timestamp, so they sort by age
+    return [profiles[profile_id] for profile_id in sorted(profiles)]
+
+
+def rotate_profiles():
+    """Delete the oldest profiles until the directory is within PROFILE_MAX_FILES and PROFILE_MAX_BYTES"""
+    with _rotation_lock:
+        profiles = _stored_profiles()
+        total = sum(profile['size'] for profile in profiles)
+        while profiles and (len(profiles) > Config.PROFILE_MAX_FILES or total > Config.PROFILE_MAX_BYTES):
+            oldest = profiles.pop(0)
+            total -= oldest['size']
+            for name in oldest['files']:
+                try:
+                    os.remove(os.path.join(Config.PROFILE_DIR, name))
+                except FileNotFoundError:
+                    # Another worker rotated it first
+                    pass
+
+
+def list_profiles() -> List[Dict[str, Any]]:
+    """Metadata of the stored profiles, newest first"""
+    result = []
+    for profile in reversed(_stored_profiles()):
+        if profile['format'] is None:
+            continue
+        try:
+            with open(os.path.join(Config.PROFILE_DIR, f"{profile['id']}.json")) as f:
+                metadata = json.load(f)
+        except (OSError, ValueError):
+            metadata = {'id': profile['id'], 'format': profile['format']}
+        metadata['size'] = profile['size']
+        result.append(metadata)
+    return result
+
+
+def profile_path(profile_id: str) -> Optional[str]:
+    """Path of a stored profile's output, or None if there is no such profile"""
+    if not _PROFILE_ID.match(profile_id):
+        return None
+    for profile_format in PROFILE_FORMATS:
+        path = os.path.join(Config.PROFILE_DIR, f"{profile_id}.{profile_format}")
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def init_profiling(app: Flask):
+    """Profile a Config.PROFILE_SAMPLE_RATE fraction of requests, plus admin requests that ask for it"""
+    if not Config.PROFILING_ENABLED:
+        return
+
+    app.before_request(_start_sampled_profile)
+    app.after_request(_finish_profile)
+    app.teardown_request(_end_profile)
@@ -0,0 +1,23 @@
+from typing import Optional, List
+
+from models import APPLICATION_VIEWS, ScholarshipApplication
+
+
+def resolve_application_fields(fields: Optional[str] = None, view: Optional[str] = None,
+                               default_view: str = 'summary') -> Optional[List[str]]:
+    """Translate ?fields= / ?view= query parameters into a Firestore projection.
+
+    An explicit comma-separated ``fields`` list wins over ``view``. Returns
+    None when the full document should be read.
+    """
+    if fields:
+        requested = [field.strip() for field in fields.split(',') if field.strip()]
+        unknown = [field for field in requested if field not in ScholarshipApplication.model_fields]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        return requested
+
+    view = view or default_view
+    if view not in APPLICATION_VIEWS:
+        raise ValueError(f"Invalid view. Valid options: {list(APPLICATION_VIEWS)}")
+    return APPLICATION_VIEWS[view]
@@ -0,0 +1,111 @@
+import atexit
+import logging
+import os
+import threading
+from typing import Callable, Optional
+
+from flask import current_app, has_app_context
+
+logger = logging.getLogger(__name__)
+
+EXTENSION_KEY = 'service_registry'
+
+
+def _default_firebase_factory():
+    from services.firebase_service import FirebaseService
+    return FirebaseService()
+
+
+def _default_stellar_factory():
+    from services.stellar_service import StellarService
+    return StellarService()
+
+
+class ServiceRegistry:
+    """Process-wide owner of the backend's service clients.
+
+    Each worker process gets exactly one FirebaseService (one Firestore client)
+    and one StellarService (one pooled Horizon session and parsed admin keypair),
+    created lazily on first use. Instances inherited across a fork are dropped
+    so the child builds its own network clients.
+    """
+
+    def __init__(self, firebase_factory: Optional[Callable] = None,
+                 stellar_factory: Optional[Callable] = None):
+        self._firebase_factory = firebase_factory or _default_firebase_factory
+        self._stellar_factory = stellar_factory or _default_stellar_factory
+        self._lock = threading.RLock()
+        self._pid = os.getpid()
+        self._firebase = None
+        self._stellar = None
+
+    @property
+    def firebase(self):
+        """Return this process's FirebaseService"""
+        self._check_pid()
+        if self._firebase is None:
+            with self._lock:
+                if self._firebase is None:
+                    self._firebase = self._firebase_factory()
+        return self._firebase
+
+    @property
+    def stellar(self):
+        """Return this process's StellarService"""
+        self._check_pid()
+        if self._stellar is None:
+            with self._lock:
+                if self._stellar is None:
+                    self._stellar = self._stellar_factory()
+        return self._stellar
+
+    def init_app(self, app):
+        """Attach the registry to a Flask app so routes resolve services through it"""
+        app.extensions[EXTENSION_KEY] = self
+
+    def reset(self):
+        """Forget all services without closing them (used in a forked child)"""
+        self._lock = threading.RLock()
+        self._pid = os.getpid()
+        self._firebase = None
+        self._stellar = None
+
+    def teardown(self):
+        """Close all network clients owned by this process"""
+        with self._lock:
+            for name, service in (('firebase', self._firebase), ('stellar', self._stellar)):
+                if service is None:
+                    continue
+                try:
+                    service.close()
+                except Exception as e:
+                    logger.error(f"Failed to close {name} service: {e}")
+            self._firebase = None
+            self._stellar = None
+
+    def _check_pid(self):
+        if self._pid != os.getpid():
+            self.reset()
+
+
+registry = ServiceRegistry()
+
+os.register_at_fork(after_in_child=registry.reset)
+atexit.register(registry.teardown)
+
+
+def get_registry() -> ServiceRegistry:
+    """Return the registry of the current app, or the process default"""
+    if has_app_context():
+        return current_app.extensions.get(EXTENSION_KEY, registry)
+    return registry
+
+
+def get_firebase_service():
+    """Return the shared FirebaseService for this worker"""
+    return get_registry().firebase
+
+
+def get_stellar_service():
+    """Return the shared StellarService for this worker"""
+    return get_registry().stellar
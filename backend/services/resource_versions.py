@@ -0,0 +1,15 @@
+from typing import Optional
+
+# Counters bumped on every write to a resource, used to build ETags without
+# running the resource's queries. Each is a sharded counter, so the version
+# is the sum of its shards (see FirebaseService.get_resource_versions).
+# Kept apart from firebase_service so the routes can name them without
+# importing the Firestore client.
+RESOURCE_VERSIONS_COLLECTION = 'resource_versions'
+APPLICATIONS_VERSION = 'applications'
+RECORDS_VERSION = 'scholarship_records'
+
+
+def student_version_key(student_wallet: Optional[str]) -> Optional[str]:
+    """Version counter covering one student's applications, records and profile"""
+    return f"student_{student_wallet}" if student_wallet else None
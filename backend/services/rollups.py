@@ -0,0 +1,132 @@
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+DAILY_ROLLUPS_COLLECTION = 'stats_daily'
+MONTHLY_ROLLUPS_COLLECTION = 'stats_monthly'
+
+ROLLUP_FIELDS = ['applications_received', 'approvals', 'rejections', 'disbursements', 'amount_disbursed']
+
+# Calendar periods used by the admin UI, plus rolling windows such as "30d"
+CALENDAR_TIMEFRAMES = ('all', 'year', 'quarter', 'month')
+_ROLLING_TIMEFRAME = re.compile(r'^(\d{1,3})d$')
+MAX_ROLLING_DAYS = 366
+
+# Windows longer than this are charted from monthly rollups
+MAX_DAILY_SERIES_DAYS = 92
+
+
+def timeframe_bounds(timeframe: str, now: Optional[datetime] = None) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """Return the [start, end) range for a timeframe ending now.
+
+    "year", "quarter" and "month" are the current calendar periods and "Nd"
+    is the last N days including today. "all" has no bounds.
+    """
+    now = now or datetime.now(timezone.utc)
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    rolling = _ROLLING_TIMEFRAME.match(timeframe or '')
+    if rolling and 0 < int(rolling.group(1)) <= MAX_ROLLING_DAYS:
+        return today - timedelta(days=int(rolling.group(1)) - 1), None
+
+    if timeframe not in CALENDAR_TIMEFRAMES:
+        raise ValueError(f"timeframe must be one of: {', '.join(CALENDAR_TIMEFRAMES)} or a number of days such as 30d")
+    if timeframe == 'all':
+        return None, None
+    if timeframe == 'year':
+        return today.replace(month=1, day=1), None
+    if timeframe == 'quarter':
+        return today.replace(month=(today.month - 1) // 3 * 3 + 1, day=1), None
+    return today.replace(day=1), None
+
+
+def rollup_delta(new_applications: int = 0, status_changes: Optional[Dict[str, int]] = None,
+                 disbursed: float = 0, disbursements: int = 0) -> Dict[str, Any]:
+    """Translate a statistics change into rollup counter increments.
+
+    Approvals and rejections are counted when applications enter those
+    states; approved -> disbursed is not a second approval.
+    """
+    status_changes = status_changes or {}
+    approvals = status_changes.get('approved', 0) + status_changes.get('disbursed', 0)
+    rejections = status_changes.get('rejected', 0)
+
+    delta = {
+        'applications_received': new_applications,
+        'approvals': max(approvals, 0),
+        'rejections': max(rejections, 0),
+        'disbursements': disbursements,
+        'amount_disbursed': disbursed
+    }
+    return {field: value for field, value in delta.items() if value}
+
+
+def rollup_periods(moment: datetime) -> List[Tuple[str, str, datetime]]:
+    """Return (collection, document id, period start) for the daily and monthly rollups covering moment"""
+    day = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    return [
+        (DAILY_ROLLUPS_COLLECTION, day.strftime('%Y-%m-%d'), day),
+        (MONTHLY_ROLLUPS_COLLECTION, day.strftime('%Y-%m'), day.replace(day=1))
+    ]
+
+
+def rollup_shard_id(doc_id: str, shard: int) -> str:
+    """Document id of one shard of a rollup; increments are spread over shards, rebuilds write doc_id itself"""
+    return f"{doc_id}_{shard}"
+
+
+def merge_rollup_shards(rollups: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Sum the rollup documents (base and shards) that share a date, keeping their order"""
+    merged: Dict[datetime, Dict[str, Any]] = {}
+    for rollup in rollups:
+        entry = merged.setdefault(rollup['date'], {'date': rollup['date']})
+        for field in ROLLUP_FIELDS:
+            if field in rollup:
+                entry[field] = entry.get(field, 0) + rollup[field]
+    return list(merged.values())
+
+
+def series_granularity(start: Optional[datetime], now: Optional[datetime] = None) -> str:
+    """Pick daily rollups for short windows and monthly ones for long calendar periods.
+
+    Windows that do not start on the first of a month always use daily
+    rollups so the first monthly bucket never counts days outside the window.
+    """
+    now = now or datetime.now(timezone.utc)
+    if start is None:
+        return 'monthly'
+    if (now - start).days < MAX_DAILY_SERIES_DAYS or start.day != 1:
+        return 'daily'
+    return 'monthly'
+
+
+def build_series(rollups: List[Dict[str, Any]], start: Optional[datetime], granularity: str,
+                 now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    """Return one point per period from start to now, filling gaps with zeros"""
+    now = now or datetime.now(timezone.utc)
+    by_date = {rollup['date'].strftime('%Y-%m-%d'): rollup for rollup in rollups}
+
+    if start is None:
+        if not rollups:
+            return []
+        start = min(rollup['date'] for rollup in rollups)
+
+    period = start.replace(hour=0, minute=0, second=0, microsecond=0)
+    if granularity == 'monthly':
+        period = period.replace(day=1)
+
+    series = []
+    while period <= now:
+        key = period.strftime('%Y-%m-%d')
+        rollup = by_date.get(key, {})
+        series.append({'date': key, **{field: rollup.get(field, 0) for field in ROLLUP_FIELDS}})
+        if granularity == 'daily':
+            period += timedelta(days=1)
+        else:
+            period = (period.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return series
+
+
+def summarize_series(series: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Sum a series into totals for the whole window"""
+    return {field: sum(point[field] for point in series) for field in ROLLUP_FIELDS}
@@ -0,0 +1,104 @@
+import logging
+import queue
+import threading
+from contextlib import contextmanager
+from typing import List, Optional
+
+from stellar_sdk import Account, Keypair
+
+from services.metrics import horizon_call
+
+logger = logging.getLogger(__name__)
+
+
+class SequenceManager:
+    """Hands out sequence numbers for one source account.
+
+    The account's sequence is loaded from Horizon once and then incremented
+    locally for every transaction built, so concurrent submissions from this
+    process never reuse a number. Horizon rejects a transaction whose
+    predecessor hasn't arrived yet, so reserve() also keeps the account to
+    one transaction at a time until it has been submitted. Call resync()
+    after tx_bad_seq (or any submission whose outcome is unknown) to reload
+    it on next use.
+
+    The cache is per process: two processes submitting from the same
+    account will still collide, which is why each process gets its own
+    channel accounts (see ChannelPool).
+    """
+
+    def __init__(self, server, public_key: str):
+        self.server = server
+        self.public_key = public_key
+        self._sequence: Optional[int] = None
+        self._lock = threading.Lock()
+        self._submit_lock = threading.Lock()
+
+    @contextmanager
+    def reserve(self):
+        """Hold the account for one transaction, yielding the Account to build it from.
+
+        Other threads wait until the block ends, so submit inside it.
+        """
+        with self._submit_lock:
+            yield self.next_account()
+
+    def next_account(self) -> Account:
+        """Return an Account whose next built transaction gets a fresh sequence number"""
+        with self._lock:
+            if self._sequence is None:
+                with horizon_call('load_account'):
+                    self._sequence = self.server.load_account(self.public_key).sequence
+                logger.info("Loaded sequence %s for %s", self._sequence, self.public_key)
+
+            # TransactionBuilder.build() increments the account's sequence itself
+            account = Account(self.public_key, self._sequence)
+            self._sequence += 1
+            return account
+
+    def resync(self):
+        """Forget the local sequence so the next transaction reloads it from Horizon"""
+        with self._lock:
+            self._sequence = None
+
+
+class ChannelPool:
+    """Pool of channel accounts used as transaction sources for parallel submissions.
+
+    Each channel has its own sequence number, so N channels allow N
+    transactions in flight at once while payments still come from the admin
+    account. A channel is held exclusively from build until submission.
+
+    Sequence numbers are only tracked within a process, so processes must
+    not share channels: the one at worker_index out of worker_count uses
+    every worker_count-th channel starting at its index. With fewer channels
+    than processes some have to share one, and tx_bad_seq retries follow.
+    """
+
+    def __init__(self, server, secrets: List[str], worker_index: int = 0, worker_count: int = 1,
+                 acquire_timeout: float = 30):
+        self.acquire_timeout = acquire_timeout
+        self._available: 'queue.Queue' = queue.Queue()
+
+        channels = [Keypair.from_secret(secret) for secret in secrets]
+        if len(channels) >= worker_count:
+            channels = channels[worker_index::worker_count]
+        else:
+            logger.warning("%s channel accounts for %s worker processes; worker %s shares one with others",
+                           len(channels), worker_count, worker_index)
+            channels = [channels[worker_index % len(channels)]]
+        for keypair in channels:
+            self._available.put((keypair, SequenceManager(server, keypair.public_key)))
+        self.size = len(channels)
+
+    @contextmanager
+    def acquire(self):
+        """Borrow a (keypair, SequenceManager) pair for one transaction"""
+        try:
+            channel = self._available.get(timeout=self.acquire_timeout)
+        except queue.Empty:
+            raise TimeoutError('No Stellar channel account available')
+        try:
+            yield channel
+        finally:
+            self._available.put(channel)
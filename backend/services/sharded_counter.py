@@ -0,0 +1,97 @@
+import random
+import threading
+import time
+from typing import Optional, Dict, Any, List
+
+from firebase_admin import firestore
+
+from services.firestore_reads import get_document, stream_query
+
+SHARDS_COLLECTION = 'shards'
+
+
+def _add(total, value):
+    if isinstance(value, dict):
+        total = dict(total or {})
+        for key, change in value.items():
+            total[key] = total.get(key, 0) + change
+        return total
+    return (total or 0) + value
+
+
+class ShardedCounter:
+    """A set of numeric totals spread across N shard documents.
+
+    Firestore sustains only about one write per second on a single
+    document, so each increment goes to a randomly chosen shard under
+    ``<doc>/shards/<n>`` and reads sum all of them. Values already stored on
+    the parent document count as a base, so existing totals carry over.
+    A counter field may also be a map of totals, summed key by key.
+    Sums are cached in-process for ``cache_seconds``.
+    """
+
+    def __init__(self, doc_ref, fields: List[str], num_shards: int = 10, cache_seconds: float = 5):
+        self.doc_ref = doc_ref
+        self.fields = fields
+        self.num_shards = max(num_shards, 1)
+        self.cache_seconds = cache_seconds
+        self._cached: Optional[Dict[str, Any]] = None
+        self._cached_at = 0.0
+        self._lock = threading.Lock()
+
+    def shard_ref(self, index: Optional[int] = None):
+        """Return a shard document, a random one unless index is given"""
+        if index is None:
+            index = random.randrange(self.num_shards)
+        return self.doc_ref.collection(SHARDS_COLLECTION).document(str(index))
+
+    def increment(self, writer, deltas: Dict[str, Any], **fields):
+        """Add deltas to a random shard through a transaction or write batch.
+
+        Extra keyword fields (e.g. a last-updated timestamp) are written to
+        the shard as-is. Call invalidate() once the write has committed; a
+        transaction callback may run several times or not commit at all.
+        """
+        update = {}
+        for name, value in deltas.items():
+            if isinstance(value, dict):
+                value = {key: firestore.Increment(change) for key, change in value.items() if change}
+                if value:
+                    update[name] = value
+            elif value:
+                update[name] = firestore.Increment(value)
+        update.update(fields)
+        writer.set(self.shard_ref(), update, merge=True)
+
+    def reset(self, writer, values: Dict[str, Any]):
+        """Overwrite the base document with values and delete every shard, through a write batch"""
+        writer.set(self.doc_ref, values)
+        for shard in stream_query(self.doc_ref.collection(SHARDS_COLLECTION).select([])):
+            writer.delete(shard.reference)
+
+    def read(self, use_cache: bool = True) -> Optional[Dict[str, Any]]:
+        """Return the base document's fields with every shard added in, or None if nothing is stored"""
+        if use_cache and self._cached is not None and time.monotonic() - self._cached_at < self.cache_seconds:
+            return dict(self._cached)
+
+        base = get_document(self.doc_ref)
+        totals = base.to_dict() if base.exists else None
+        for shard in stream_query(self.doc_ref.collection(SHARDS_COLLECTION)):
+            if totals is None:
+                totals = {}
+            for name, value in shard.to_dict().items():
+                if name in self.fields:
+                    totals[name] = _add(totals.get(name), value)
+                elif name not in totals or (value is not None and totals[name] is not None and value > totals[name]):
+                    # Non-counter fields such as timestamps keep their latest value
+                    totals[name] = value
+
+        with self._lock:
+            self._cached = totals
+            self._cached_at = time.monotonic()
+        return dict(totals) if totals is not None else None
+
+    def invalidate(self):
+        """Drop the cached sum so the next read hits Firestore"""
+        with self._lock:
+            self._cached = None
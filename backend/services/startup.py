@@ -0,0 +1,85 @@
+import importlib
+import logging
+import time
+from typing import Dict
+
+from flask import Flask
+
+from config import Config
+from services.disbursement_queue import start_background_worker
+from services.registry import get_registry
+from services.resource_versions import APPLICATIONS_VERSION
+from services.tracing import WARM_UP_ENVIRON_KEY
+
+logger = logging.getLogger(__name__)
+
+# Neither app.py nor the blueprints import these: they load on first service
+# use or first Parquet export. A preloading gunicorn master imports them up
+# front so workers inherit them
+PRELOAD_MODULES = (
+    'services.firebase_service',
+    'services.stellar_service',
+    'services.local_firestore',
+    'google.auth.transport.requests',
+    'pyarrow.parquet'
+)
+
+
+def preload_modules():
+    """Import the modules the app otherwise loads on first use. Missing optional ones are skipped."""
+    for name in PRELOAD_MODULES:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            pass
+
+
+def start_services(app: Flask):
+    """Log the startup banner and start the in-app disbursement worker, once per process"""
+    if getattr(app, '_startup_done', False):
+        return
+    app._startup_done = True
+    logger.info("Scholarship Distribution API starting up...")
+    logger.info(f"Environment: {'Development' if Config.DEBUG else 'Production'}")
+    logger.info(f"Stellar Network: {Config.STELLAR_NETWORK}")
+
+    if Config.DISBURSEMENT_WORKER_IN_APP:
+        services = get_registry()
+        start_background_worker(services.firebase, services.stellar)
+
+
+def warm_up(app: Flask) -> Dict[str, float]:
+    """Get a freshly started worker ready before it accepts traffic.
+
+    Creates this process's Firestore and Horizon clients, opens their
+    connections and the token certificate cache with one cheap call each,
+    and sends a request through the app so the first real one isn't the
+    cold one; that request is kept out of metrics and traces. Each step is best-effort: a failure is logged and the worker
+    starts anyway. Returns each step's time in milliseconds.
+    """
+    from services.token_verifier import get_token_verifier
+
+    timings = {}
+    with app.app_context():
+        services = get_registry()
+        steps = (
+            ('firebase_client', lambda: services.firebase),
+            ('stellar_client', lambda: services.stellar),
+            ('token_certificates', lambda: get_token_verifier().certificates.get_certs()),
+            ('firestore', lambda: services.firebase.get_resource_versions([APPLICATIONS_VERSION])),
+            ('horizon', lambda: services.stellar.admin_keypair and services.stellar.get_account_info(
+                services.stellar.admin_keypair.public_key
+            )),
+            ('services', lambda: start_services(app)),
+            ('request', lambda: app.test_client().get('/health', environ_base={WARM_UP_ENVIRON_KEY: True}))
+        )
+        for name, step in steps:
+            started = time.perf_counter()
+            try:
+                step()
+            except Exception as e:
+                logger.warning("Warm-up step %s failed: %s", name, e)
+            timings[name] = round((time.perf_counter() - started) * 1000, 3)
+
+    logger.info("Worker warm-up finished in %.1f ms: %s", sum(timings.values()), timings)
+    return timings
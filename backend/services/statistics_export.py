@@ -0,0 +1,197 @@
+import importlib.util
+import io
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from services.export import csv_lines
+from services.json_provider import dumps_bytes
+
+
+STATISTICS_EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'json': 'application/json',
+    'parquet': 'application/vnd.apache.parquet'
+}
+
+EXPORT_BREAKDOWNS = ('status', 'university')
+
+APPLICATION_EXPORT_COLUMNS = [
+    'id', 'applied_at', 'status', 'university', 'major', 'year_of_study', 'student_wallet',
+    'scholarship_amount_requested', 'disbursed_amount', 'reviewed_at', 'transaction_hash'
+]
+DISBURSEMENT_EXPORT_COLUMNS = ['id', 'timestamp', 'application_id', 'student_wallet', 'amount', 'transaction_hash']
+BREAKDOWN_EXPORT_COLUMNS = ['breakdown', 'group', 'applications', 'requested_amount', 'disbursed_amount']
+
+# Rows per Parquet row group; each group is flushed to the client as it is written
+PARQUET_ROW_GROUP_SIZE = 5000
+
+
+def parquet_available() -> bool:
+    """Whether the optional pyarrow dependency is installed"""
+    return importlib.util.find_spec('pyarrow') is not None
+
+
+def _pyarrow():
+    """Import pyarrow on first use; it is slow to import and only Parquet exports need it"""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:  # pragma: no cover - Parquet export is optional
+        return None
+    return pyarrow
+
+
+def parse_breakdowns(value: Optional[str]) -> List[str]:
+    """Parse a comma-separated breakdown list, defaulting to all of them"""
+    if not value:
+        return list(EXPORT_BREAKDOWNS)
+    breakdowns = [b.strip() for b in value.split(',') if b.strip()]
+    invalid = [b for b in breakdowns if b not in EXPORT_BREAKDOWNS]
+    if invalid:
+        raise ValueError(f"breakdown must be a subset of: {', '.join(EXPORT_BREAKDOWNS)}")
+    return breakdowns
+
+
+class StatisticsReport:
+    """Aggregates breakdowns and totals while applications and disbursements stream past.
+
+    Only one entry per group is kept, so memory does not grow with the
+    number of rows exported.
+    """
+
+    def __init__(self, breakdowns: List[str]):
+        self.breakdowns = breakdowns
+        self.groups: Dict[str, Dict[str, Dict[str, Any]]] = {name: {} for name in breakdowns}
+        self.totals = {
+            'applications': 0,
+            'requested_amount': 0.0,
+            'disbursed_amount': 0.0,
+            'disbursements': 0,
+            'disbursement_records_amount': 0.0
+        }
+
+    def track_applications(self, applications: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Pass applications through, counting them"""
+        for application in applications:
+            requested = application.get('scholarship_amount_requested') or 0
+            disbursed = application.get('disbursed_amount') or 0
+            self.totals['applications'] += 1
+            self.totals['requested_amount'] += requested
+            self.totals['disbursed_amount'] += disbursed
+
+            for name in self.breakdowns:
+                key = str(application.get(name) or 'unknown').strip()
+                group = self.groups[name].setdefault(key, {'applications': 0, 'requested_amount': 0.0, 'disbursed_amount': 0.0})
+                group['applications'] += 1
+                group['requested_amount'] += requested
+                group['disbursed_amount'] += disbursed
+            yield application
+
+    def track_disbursements(self, records: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Pass scholarship records through, counting them"""
+        for record in records:
+            self.totals['disbursements'] += 1
+            self.totals['disbursement_records_amount'] += record.get('amount') or 0
+            yield record
+
+    def breakdown_rows(self) -> List[Dict[str, Any]]:
+        """Return one row per breakdown group, largest groups first"""
+        rows = []
+        for name in self.breakdowns:
+            groups = sorted(self.groups[name].items(), key=lambda item: -item[1]['applications'])
+            rows.extend({'breakdown': name, 'group': key, **values} for key, values in groups)
+        return rows
+
+
+def csv_report(header: Dict[str, Any], applications: Iterable[Dict[str, Any]],
+               records: Iterable[Dict[str, Any]], report: StatisticsReport) -> Iterator[str]:
+    """Stream the report as CSV sections: applications, disbursements, breakdowns, totals"""
+    yield from csv_lines([header], list(header))
+    yield '\n# applications\n'
+    yield from csv_lines(report.track_applications(applications), APPLICATION_EXPORT_COLUMNS)
+    yield '\n# disbursements\n'
+    yield from csv_lines(report.track_disbursements(records), DISBURSEMENT_EXPORT_COLUMNS)
+    yield '\n# breakdowns\n'
+    yield from csv_lines(report.breakdown_rows(), BREAKDOWN_EXPORT_COLUMNS)
+    yield '\n# totals\n'
+    yield from csv_lines([report.totals], list(report.totals))
+
+
+def json_report(header: Dict[str, Any], applications: Iterable[Dict[str, Any]],
+                records: Iterable[Dict[str, Any]], report: StatisticsReport) -> Iterator[bytes]:
+    """Stream the report as a single JSON object, one row at a time"""
+    def array(rows, columns):
+        separator = b''
+        for row in rows:
+            yield separator + dumps_bytes({column: row.get(column) for column in columns})
+            separator = b','
+
+    yield dumps_bytes(header)[:-1] + b',"applications":['
+    yield from array(report.track_applications(applications), APPLICATION_EXPORT_COLUMNS)
+    yield b'],"disbursements":['
+    yield from array(report.track_disbursements(records), DISBURSEMENT_EXPORT_COLUMNS)
+    yield b'],"breakdowns":' + dumps_bytes(report.breakdown_rows())
+    yield b',"totals":' + dumps_bytes(report.totals) + b'}\n'
+
+
+class _Drain(io.RawIOBase):
+    """Write-only file that hands back whatever was written since the last drain"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def parquet_report(applications: Iterable[Dict[str, Any]]) -> Iterator[bytes]:
+    """Stream applications (with their disbursed amounts) as a Parquet file, one row group at a time"""
+    pyarrow = _pyarrow()
+    if pyarrow is None:
+        raise ValueError('Parquet export requires the pyarrow package')
+
+    schema = pyarrow.schema([
+        ('id', pyarrow.string()),
+        ('applied_at', pyarrow.timestamp('us', tz='UTC')),
+        ('status', pyarrow.string()),
+        ('university', pyarrow.string()),
+        ('major', pyarrow.string()),
+        ('year_of_study', pyarrow.int64()),
+        ('student_wallet', pyarrow.string()),
+        ('scholarship_amount_requested', pyarrow.float64()),
+        ('disbursed_amount', pyarrow.float64()),
+        ('reviewed_at', pyarrow.timestamp('us', tz='UTC')),
+        ('transaction_hash', pyarrow.string())
+    ])
+
+    def to_utc(value):
+        if isinstance(value, datetime) and value.tzinfo is None:
+            return value.replace(tzinfo=timezone.utc)
+        return value
+
+    sink = _Drain()
+    writer = pyarrow.parquet.ParquetWriter(sink, schema)
+    try:
+        rows = []
+        for application in applications:
+            rows.append({
+                column: to_utc(application.get(column)) for column in APPLICATION_EXPORT_COLUMNS
+            })
+            if len(rows) >= PARQUET_ROW_GROUP_SIZE:
+                writer.write_table(pyarrow.Table.from_pylist(rows, schema=schema))
+                rows = []
+                yield sink.drain()
+        if rows:
+            writer.write_table(pyarrow.Table.from_pylist(rows, schema=schema))
+    finally:
+        writer.close()
+    yield sink.drain()
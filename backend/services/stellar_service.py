@@ -1,28 +1,64 @@
 from stellar_sdk import Keypair, Network, Server, TransactionBuilder, Asset
-from stellar_sdk.exceptions import SdkError
+from stellar_sdk.client.requests_client import RequestsClient
+from stellar_sdk.exceptions import SdkError, BadRequestError, NotFoundError
+from stellar_sdk.xdr import TransactionResult, TransactionResultCode, OperationResultCode, PaymentResultCode
 import logging
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple, Callable
 from config import Config
-from datetime import datetime
+from services.sequence_manager import SequenceManager, ChannelPool
+from services.metrics import instrument_service, horizon_call
 
 logger = logging.getLogger(__name__)
 
+# Protocol limit on operations in a single transaction
+MAX_OPERATIONS_PER_TRANSACTION = 100
+
+# Transactions are only valid for this long after being built
+TRANSACTION_TIMEOUT_SECONDS = 30
+
+@instrument_service('stellar')
 class StellarService:
-    def __init__(self):
+    def __init__(self, server: Optional[Server] = None, firebase_service=None):
         self.network = Network.TESTNET_NETWORK_PASSPHRASE
-        self.server = Server(Config.STELLAR_HORIZON_URL)
+        self.server = server or Server(
+            Config.STELLAR_HORIZON_URL,
+            client=RequestsClient(pool_size=Config.HORIZON_POOL_SIZE)
+        )
         self.contract_id = Config.CONTRACT_ID
+        self._firebase_service = firebase_service
         
         if Config.ADMIN_SECRET_KEY:
             self.admin_keypair = Keypair.from_secret(Config.ADMIN_SECRET_KEY)
+            self.sequences = SequenceManager(self.server, self.admin_keypair.public_key)
         else:
             logger.warning("Admin secret key not configured")
             self.admin_keypair = None
+            self.sequences = None
+        
+        self.channels = None
+        if self.admin_keypair and Config.STELLAR_CHANNEL_SECRETS:
+            self.channels = ChannelPool(
+                self.server, Config.STELLAR_CHANNEL_SECRETS, Config.WORKER_INDEX, Config.WORKER_COUNT
+            )
+            logger.info("Using %s channel accounts for parallel submissions", self.channels.size)
+
+    @property
+    def firebase_service(self):
+        """FirebaseService used for the contract simulation state"""
+        if self._firebase_service is not None:
+            return self._firebase_service
+        from services.registry import get_firebase_service
+        return get_firebase_service()
+
+    def close(self):
+        """Close the pooled Horizon HTTP session"""
+        self.server.close()
 
     def get_account_info(self, public_key: str) -> Optional[Dict[str, Any]]:
         """Get account information from Stellar network"""
         try:
-            account = self.server.load_account(public_key)
+            with horizon_call('load_account'):
+                account = self.server.load_account(public_key)
             return {
                 'account_id': account.account_id,
                 'sequence': account.sequence,
@@ -39,18 +75,19 @@ class StellarService:
             logger.error(f"Failed to get account info for {public_key}: {e}")
             return None
 
-    def invoke_contract_function(self, function_name: str, params: list) -> Optional[Dict[str, Any]]:
+    def invoke_contract_function(self, function_name: str, params: list,
+                                 on_submit: Optional[Callable[[str], None]] = None) -> Optional[Dict[str, Any]]:
         """Smart contract simulation with database tracking"""
         if not self.admin_keypair:
             logger.error("Admin keypair not configured")
             return None
 
         try:
-            logger.info(f"Processing smart contract function: {function_name} with params: {params}")
+            logger.info("Processing smart contract function: %s with params: %s", function_name, params)
             
             # Handle different contract functions
             if function_name == 'release_scholarship':
-                return self._handle_release_scholarship(params)
+                return self._handle_release_scholarship(params, on_submit)
             elif function_name == 'get_student_amount':
                 return self._handle_get_student_amount(params)
             elif function_name == 'get_total_disbursed':
@@ -60,7 +97,7 @@ class StellarService:
             elif function_name == 'get_student_scholarship_count':
                 return self._handle_get_student_scholarship_count(params)
             else:
-                logger.warning(f"Unknown contract function: {function_name}")
+                logger.warning("Unknown contract function: %s", function_name)
                 return {
                     'success': False,
                     'error': f'Unknown contract function: {function_name}'
@@ -73,23 +110,23 @@ class StellarService:
                 'error': str(e)
             }
 
-    def _handle_release_scholarship(self, params: list) -> Dict[str, Any]:
+    def _handle_release_scholarship(self, params: list,
+                                    on_submit: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
         """Handle scholarship release with real Stellar payment + database tracking"""
         try:
             if len(params) < 3:
                 return {'success': False, 'error': 'Invalid parameters for release_scholarship'}
             
-            admin_address = params[0]
             student_address = params[1]
             amount_scaled = params[2]  # Amount in contract format (10^7)
             
             # Convert to real amount
             amount = float(amount_scaled) / 10**7
             
-            logger.info(f"Smart contract release: {amount} XLM to {student_address}")
+            logger.info("Smart contract release: %s XLM to %s", amount, student_address)
             
             # Execute real Stellar payment
-            payment_result = self.transfer_xlm(student_address, amount)
+            payment_result = self.transfer_xlm(student_address, amount, on_submit=on_submit)
             
             if not payment_result or not payment_result.get('success'):
                 return {
@@ -97,38 +134,14 @@ class StellarService:
                     'error': payment_result.get('error', 'Payment failed') if payment_result else 'Payment failed'
                 }
             
-            # Store scholarship record in Firebase (simulating smart contract storage)
-            # NOTE: Record creation is now handled by the admin route to avoid duplicates
-            from services.firebase_service import FirebaseService
-            firebase_service = FirebaseService()
-            
             # Generate scholarship ID
             scholarship_id = self._generate_scholarship_id()
             
-            # Create scholarship record - COMMENTED OUT to prevent duplicates
-            # The admin route (routes/admin.py) handles scholarship record creation
-            # scholarship_record = {
-            #     'scholarship_id': scholarship_id,
-            #     'student_wallet': student_address,  # Use student_wallet to match query
-            #     'student_address': student_address,  # Keep both for compatibility
-            #     'admin_address': admin_address,
-            #     'amount': amount,
-            #     'amount_scaled': amount_scaled,
-            #     'timestamp': datetime.utcnow(),
-            #     'transaction_hash': payment_result['transaction_hash'],
-            #     'contract_function': 'release_scholarship'
-            # }
-            
-            # Store the record - COMMENTED OUT to prevent duplicates
-            # firebase_service.create_scholarship_record(scholarship_record)
-            
-            # Update student profile
-            self._update_student_profile(student_address, amount)
+            # The scholarship record, student profile and contract stats are stored
+            # together once the disbursement worker finalizes the payment, so a
+            # payment found on the ledger after a retry is counted too
             
-            # Update contract stats
-            self._update_contract_stats(amount, student_address)
-            
-            logger.info(f"Smart contract simulation complete: Scholarship #{scholarship_id}")
+            logger.info("Smart contract simulation complete: Scholarship #%s", scholarship_id)
             
             return {
                 'success': True,
@@ -149,61 +162,6 @@ class StellarService:
         import time
         return int(time.time() * 1000) % 1000000  # Use timestamp as ID
 
-    def _update_student_profile(self, student_address: str, amount: float):
-        """Update student profile with new scholarship"""
-        try:
-            from services.firebase_service import FirebaseService
-            firebase_service = FirebaseService()
-            
-            # Get existing profile or create new one
-            profile = firebase_service.get_student_profile(student_address) or {
-                'address': student_address,
-                'total_received': 0,
-                'scholarship_count': 0,
-                'last_scholarship_date': None
-            }
-            
-            # Update profile
-            profile['total_received'] = profile.get('total_received', 0) + amount
-            profile['scholarship_count'] = profile.get('scholarship_count', 0) + 1
-            profile['last_scholarship_date'] = datetime.utcnow()
-            
-            # Save updated profile
-            firebase_service.update_student_profile(student_address, profile)
-            
-        except Exception as e:
-            logger.error(f"Error updating student profile: {e}")
-
-    def _update_contract_stats(self, amount: float, student_address: str):
-        """Update global contract statistics"""
-        try:
-            from services.firebase_service import FirebaseService
-            firebase_service = FirebaseService()
-            
-            # Get existing stats
-            stats = firebase_service.get_contract_stats() or {
-                'total_disbursed': 0,
-                'total_students': 0,
-                'total_scholarships': 0,
-                'last_scholarship_id': 0
-            }
-            
-            # Check if this is a new student
-            is_new_student = not firebase_service.get_student_profile(student_address)
-            
-            # Update stats
-            stats['total_disbursed'] = stats.get('total_disbursed', 0) + amount
-            stats['total_scholarships'] = stats.get('total_scholarships', 0) + 1
-            if is_new_student:
-                stats['total_students'] = stats.get('total_students', 0) + 1
-            stats['last_updated'] = datetime.utcnow()
-            
-            # Save updated stats
-            firebase_service.update_contract_stats(stats)
-            
-        except Exception as e:
-            logger.error(f"Error updating contract stats: {e}")
-
     def _handle_get_student_amount(self, params: list) -> Dict[str, Any]:
         """Get total amount received by student"""
         try:
@@ -212,8 +170,7 @@ class StellarService:
             
             student_address = params[0]
             
-            from services.firebase_service import FirebaseService
-            firebase_service = FirebaseService()
+            firebase_service = self.firebase_service
             
             profile = firebase_service.get_student_profile(student_address)
             amount = profile.get('total_received', 0) if profile else 0
@@ -230,8 +187,7 @@ class StellarService:
     def _handle_get_total_disbursed(self) -> Dict[str, Any]:
         """Get total amount disbursed by contract"""
         try:
-            from services.firebase_service import FirebaseService
-            firebase_service = FirebaseService()
+            firebase_service = self.firebase_service
             
             stats = firebase_service.get_contract_stats()
             total = stats.get('total_disbursed', 0) if stats else 0
@@ -248,8 +204,7 @@ class StellarService:
     def _handle_get_contract_stats(self) -> Dict[str, Any]:
         """Get comprehensive contract statistics"""
         try:
-            from services.firebase_service import FirebaseService
-            firebase_service = FirebaseService()
+            firebase_service = self.firebase_service
             
             stats = firebase_service.get_contract_stats() or {}
             
@@ -275,8 +230,7 @@ class StellarService:
             
             student_address = params[0]
             
-            from services.firebase_service import FirebaseService
-            firebase_service = FirebaseService()
+            firebase_service = self.firebase_service
             
             profile = firebase_service.get_student_profile(student_address)
             count = profile.get('scholarship_count', 0) if profile else 0
@@ -290,8 +244,13 @@ class StellarService:
             logger.error(f"Error getting student scholarship count: {e}")
             return {'success': False, 'error': str(e)}
 
-    def transfer_xlm(self, destination_address: str, amount: float) -> Optional[Dict[str, Any]]:
-        """Transfer XLM directly to student's wallet address"""
+    def transfer_xlm(self, destination_address: str, amount: float,
+                     on_submit: Optional[Callable[[str], None]] = None) -> Optional[Dict[str, Any]]:
+        """Transfer XLM directly to student's wallet address.
+
+        on_submit, if given, is called with the transaction hash right before
+        the signed transaction is sent to Horizon.
+        """
         if not self.admin_keypair:
             logger.error("Admin keypair not configured for XLM transfer")
             return {
@@ -300,7 +259,7 @@ class StellarService:
             }
 
         try:
-            logger.info(f"Attempting to transfer {amount} XLM to {destination_address}")
+            logger.info("Attempting to transfer %s XLM to %s", amount, destination_address)
             
             # Validate destination address
             if not self.validate_stellar_address(destination_address):
@@ -309,32 +268,11 @@ class StellarService:
                     'error': f'Invalid destination address: {destination_address}'
                 }
             
-            # Load admin account
-            admin_account = self.server.load_account(self.admin_keypair.public_key)
-            logger.info(f"Admin account loaded successfully: {self.admin_keypair.public_key}")
+            # Build, sign and submit the payment transaction
+            response = self._submit_payments([(destination_address, amount)], on_submit=on_submit)
             
-            # Build payment transaction
-            transaction = (
-                TransactionBuilder(
-                    source_account=admin_account,
-                    network_passphrase=self.network,
-                    base_fee=100
-                )
-                .append_payment_op(
-                    destination=destination_address,
-                    asset=Asset.native(),  # XLM
-                    amount=str(amount)
-                )
-                .set_timeout(30)
-                .build()
-            )
-            
-            # Sign and submit transaction
-            transaction.sign(self.admin_keypair)
-            response = self.server.submit_transaction(transaction)
-            
-            logger.info(f"Successfully transferred {amount} XLM to {destination_address}")
-            logger.info(f"Transaction hash: {response['hash']}")
+            logger.info("Successfully transferred %s XLM to %s", amount, destination_address)
+            logger.info("Transaction hash: %s", response['hash'])
             
             return {
                 'transaction_hash': response['hash'],
@@ -359,10 +297,235 @@ class StellarService:
                 'error': error_details
             }
 
-    def release_scholarship(self, student_address: str, amount: float) -> Optional[Dict[str, Any]]:
+    def transfer_xlm_batch(self, payments: List[Tuple[str, float]], max_retries: int = 2,
+                           on_submit: Optional[Callable[[str, List[int]], None]] = None) -> List[Dict[str, Any]]:
+        """Transfer XLM to many destinations, packing up to 100 payments per transaction.
+
+        When a transaction fails because of individual operations, the result
+        XDR is decoded, the failing payments are reported and the remaining
+        ones are resubmitted without them. Returns one result per payment, in
+        the order given.
+
+        on_submit, if given, is called with each transaction's hash and the
+        indexes of the payments it carries right before it is sent; if it
+        raises, that transaction is not sent and its payments fail.
+
+        A payment whose transaction was submitted without a definite answer
+        (a timeout or a dropped connection) has success None and carries the
+        transaction_hash: it may still land, so check it with
+        get_transaction_outcome before paying it again.
+        """
+        results: List[Dict[str, Any]] = [
+            {'destination': destination, 'amount': amount, 'success': False}
+            for destination, amount in payments
+        ]
+
+        if not self.admin_keypair:
+            logger.error("Admin keypair not configured for XLM transfer")
+            for result in results:
+                result['error'] = 'Admin wallet not configured. XLM transfer cannot proceed.'
+            return results
+
+        pending = []
+        for index, (destination, amount) in enumerate(payments):
+            if self.validate_stellar_address(destination):
+                pending.append(index)
+            else:
+                results[index]['error'] = f'Invalid destination address: {destination}'
+
+        for start in range(0, len(pending), MAX_OPERATIONS_PER_TRANSACTION):
+            batch = pending[start:start + MAX_OPERATIONS_PER_TRANSACTION]
+
+            for attempt in range(max_retries + 1):
+                outcome = self._submit_payment_batch(
+                    [payments[index] for index in batch],
+                    on_submit=(lambda transaction_hash: on_submit(transaction_hash, batch)) if on_submit else None
+                )
+
+                if outcome['success'] is None:
+                    outcome = self._check_unknown_outcome(outcome)
+                    if outcome['success'] is None:
+                        for op_index, index in enumerate(batch):
+                            results[index].update({
+                                'success': None,
+                                'transaction_hash': outcome['transaction_hash'],
+                                'operation_index': op_index,
+                                'error': outcome['error']
+                            })
+                        break
+
+                if outcome['success']:
+                    for op_index, index in enumerate(batch):
+                        results[index].update({
+                            'success': True,
+                            'transaction_hash': outcome['transaction_hash'],
+                            'operation_index': op_index
+                        })
+                    break
+
+                failed_ops = outcome.get('failed_operations')
+                if not failed_ops or attempt == max_retries:
+                    for index in batch:
+                        results[index]['error'] = outcome['error']
+                    break
+
+                # Split off the payments that failed and retry the rest on their own
+                for op_index, code in failed_ops.items():
+                    results[batch[op_index]]['error'] = f'Payment failed: {code}'
+                batch = [index for op_index, index in enumerate(batch) if op_index not in failed_ops]
+                if not batch:
+                    break
+
+        succeeded = sum(1 for result in results if result['success'])
+        unknown = sum(1 for result in results if result['success'] is None)
+        logger.info("Batch transfer complete: %s/%s payments succeeded, %s unknown", succeeded, len(payments), unknown)
+        return results
+
+    def _submit_payment_batch(self, payments: List[Tuple[str, float]],
+                              on_submit: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+        """Submit one transaction containing a payment operation per entry.
+
+        success is None when the transaction was sent but no definite answer
+        came back; transaction_hash then identifies it.
+        """
+        submitted: List[str] = []
+
+        def record_submission(transaction_hash: str):
+            if on_submit:
+                on_submit(transaction_hash)
+            submitted.append(transaction_hash)
+
+        try:
+            response = self._submit_payments(payments, on_submit=record_submission)
+
+            logger.info("Submitted %s payments in transaction %s", len(payments), response['hash'])
+            return {'success': True, 'transaction_hash': response['hash']}
+
+        except BadRequestError as e:
+            failed_ops = self._decode_failed_operations(e.result_xdr)
+            logger.error(f"Batch of {len(payments)} payments rejected: {(e.extras or {}).get('result_codes')}")
+            return {
+                'success': False,
+                'error': str((e.extras or {}).get('result_codes', e)),
+                'failed_operations': failed_ops
+            }
+        except Exception as e:
+            if submitted:
+                # Sent, but the response was lost: the transaction may still land
+                logger.error(f"Outcome of batch transaction {submitted[-1]} unknown: {e}")
+                return {
+                    'success': None,
+                    'transaction_hash': submitted[-1],
+                    'error': f'Transaction outcome unknown: {e}'
+                }
+            logger.error(f"Failed to submit batch of {len(payments)} payments: {e}")
+            return {'success': False, 'error': str(e)}
+
+    def _check_unknown_outcome(self, outcome: Dict[str, Any]) -> Dict[str, Any]:
+        """Look up a transaction whose submission gave no answer; it stays unknown if Horizon hasn't seen it"""
+        transaction_hash = outcome['transaction_hash']
+        try:
+            successful = self.get_transaction_outcome(transaction_hash)
+        except Exception as e:
+            logger.error(f"Could not look up transaction {transaction_hash}: {e}")
+            return outcome
+
+        if successful:
+            return {'success': True, 'transaction_hash': transaction_hash}
+        if successful is False:
+            return {'success': False, 'error': 'Transaction failed on the ledger'}
+        return outcome
+
+    def _submit_payments(self, payments: List[Tuple[str, float]],
+                         on_submit: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+        """Build, sign and submit one transaction paying each (destination, amount) from the admin account.
+
+        Sequence numbers come from the local SequenceManager instead of a
+        load_account call per transaction. With channel accounts configured,
+        the transaction's source is a borrowed channel (which pays the fee)
+        while every payment operation's source stays the admin account.
+        On tx_bad_seq the sequence is resynced and the submission retried.
+        """
+        for attempt in range(Config.STELLAR_BAD_SEQ_RETRIES + 1):
+            try:
+                if self.channels:
+                    with self.channels.acquire() as (channel_keypair, sequences):
+                        return self._build_and_submit(payments, channel_keypair, sequences, on_submit)
+                return self._build_and_submit(payments, self.admin_keypair, self.sequences, on_submit)
+            except BadRequestError as e:
+                result_codes = (e.extras or {}).get('result_codes', {})
+                if result_codes.get('transaction') != 'tx_bad_seq' or attempt == Config.STELLAR_BAD_SEQ_RETRIES:
+                    raise
+                logger.warning("Sequence number out of date (tx_bad_seq), resyncing and retrying")
+
+    def _build_and_submit(self, payments: List[Tuple[str, float]], source_keypair: Keypair,
+                          sequences: SequenceManager,
+                          on_submit: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+        uses_channel = source_keypair.public_key != self.admin_keypair.public_key
+
+        # The account is held until submission so its transactions reach Horizon in sequence order
+        with sequences.reserve() as source_account:
+            builder = TransactionBuilder(
+                source_account=source_account,
+                network_passphrase=self.network,
+                base_fee=100
+            )
+            for destination, amount in payments:
+                builder.append_payment_op(
+                    destination=destination,
+                    asset=Asset.native(),  # XLM
+                    amount=str(amount),
+                    source=self.admin_keypair.public_key if uses_channel else None
+                )
+            transaction = builder.set_timeout(TRANSACTION_TIMEOUT_SECONDS).build()
+
+            transaction.sign(source_keypair)
+            if uses_channel:
+                transaction.sign(self.admin_keypair)
+
+            try:
+                if on_submit:
+                    on_submit(transaction.hash_hex())
+                with horizon_call('submit'):
+                    return self.server.submit_transaction(transaction)
+            except BadRequestError as e:
+                # A tx_failed transaction still consumed its sequence number; anything else did not
+                if (e.extras or {}).get('result_codes', {}).get('transaction') != 'tx_failed':
+                    sequences.resync()
+                raise
+            except Exception:
+                # Unknown outcome (e.g. timeout): reload the sequence before the next transaction
+                sequences.resync()
+                raise
+
+    def _decode_failed_operations(self, result_xdr: Optional[str]) -> Dict[int, str]:
+        """Map operation index to result code for the operations that failed in a tx_failed result"""
+        if not result_xdr:
+            return {}
+        try:
+            tx_result = TransactionResult.from_xdr(result_xdr).result
+        except Exception as e:
+            logger.error(f"Could not decode transaction result XDR: {e}")
+            return {}
+
+        if tx_result.code != TransactionResultCode.txFAILED or not tx_result.results:
+            return {}
+
+        failed = {}
+        for index, op_result in enumerate(tx_result.results):
+            if op_result.code != OperationResultCode.opINNER:
+                failed[index] = op_result.code.name
+                continue
+            payment_result = op_result.tr.payment_result if op_result.tr else None
+            if payment_result and payment_result.code != PaymentResultCode.PAYMENT_SUCCESS:
+                failed[index] = payment_result.code.name
+        return failed
+
+    def release_scholarship(self, student_address: str, amount: float,
+                            on_submit: Optional[Callable[[str], None]] = None) -> Optional[Dict[str, Any]]:
         """Release scholarship to student via smart contract"""
         try:
-            logger.info(f"Releasing scholarship of {amount} to {student_address} via smart contract")
+            logger.info("Releasing scholarship of %s to %s via smart contract", amount, student_address)
             
             # Convert amount to contract format (7 decimal places for precision)
             contract_amount = int(amount * 10**7)
@@ -375,10 +538,10 @@ class StellarService:
             ]
             
             # Invoke smart contract function
-            result = self.invoke_contract_function('release_scholarship', params)
+            result = self.invoke_contract_function('release_scholarship', params, on_submit=on_submit)
             
             if result and result.get('success'):
-                logger.info(f"Smart contract scholarship release successful: {amount} to {student_address}")
+                logger.info("Smart contract scholarship release successful: %s to %s", amount, student_address)
                 return {
                     'success': True,
                     'transaction_hash': result['transaction_hash'],
@@ -480,7 +643,8 @@ class StellarService:
     def get_transaction_details(self, transaction_hash: str) -> Optional[Dict[str, Any]]:
         """Get transaction details from Stellar network"""
         try:
-            transaction = self.server.transactions().transaction(transaction_hash).call()
+            with horizon_call('get_transaction'):
+                transaction = self.server.transactions().transaction(transaction_hash).call()
             return {
                 'hash': transaction['hash'],
                 'ledger': transaction['ledger'],
@@ -494,6 +658,18 @@ class StellarService:
             logger.error(f"Failed to get transaction details for {transaction_hash}: {e}")
             return None
 
+    def get_transaction_outcome(self, transaction_hash: str) -> Optional[bool]:
+        """Return whether a submitted transaction succeeded, or None if it never reached the ledger.
+
+        Unlike get_transaction_details, network errors are raised rather than
+        reported as a missing transaction.
+        """
+        try:
+            with horizon_call('confirm'):
+                return self.server.transactions().transaction(transaction_hash).call()['successful']
+        except NotFoundError:
+            return None
+
     def fund_account(self, public_key: str) -> bool:
         """Fund account using Friendbot (for testnet only)"""
         try:
@@ -501,13 +677,13 @@ class StellarService:
                 import requests
                 response = requests.get(f"https://friendbot.stellar.org?addr={public_key}")
                 if response.status_code == 200:
-                    logger.info(f"Account {public_key} funded successfully")
+                    logger.info("Account %s funded successfully", public_key)
                     return True
             elif Config.STELLAR_NETWORK == 'futurenet':
                 import requests
                 response = requests.get(f"https://friendbot-futurenet.stellar.org?addr={public_key}")
                 if response.status_code == 200:
-                    logger.info(f"Account {public_key} funded successfully")
+                    logger.info("Account %s funded successfully", public_key)
                     return True
             return False
         except Exception as e:
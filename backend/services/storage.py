@@ -0,0 +1,101 @@
+import logging
+from abc import ABC, abstractmethod
+from typing import Callable, Optional
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+STORAGE_BACKENDS = ('firestore', 'memory', 'sqlite')
+
+
+class StorageBackend(ABC):
+    """Document database behind FirebaseService.
+
+    ``client`` exposes the Firestore client API (collections, queries,
+    batches, get_all, field transforms) that FirebaseService is written
+    against; run_transaction runs a read-then-write callback atomically.
+    """
+
+    name = None
+
+    def __init__(self, client):
+        self.client = client
+
+    @abstractmethod
+    def run_transaction(self, callback: Callable):
+        """Run callback(transaction) atomically and return its result"""
+
+    def close(self):
+        """Release the client's connections"""
+        self.client.close()
+
+
+class FirestoreBackend(StorageBackend):
+    """Cloud Firestore through firebase_admin"""
+
+    name = 'firestore'
+
+    def __init__(self):
+        import firebase_admin
+        from firebase_admin import credentials, firestore
+
+        try:
+            app = firebase_admin.get_app()
+        except ValueError:
+            try:
+                cred = credentials.Certificate(Config.FIREBASE_CREDENTIALS_PATH)
+                app = firebase_admin.initialize_app(cred, {
+                    'databaseURL': Config.FIREBASE_DATABASE_URL
+                })
+                logger.info("Firebase initialized successfully")
+            except Exception as e:
+                logger.error(f"Failed to initialize Firebase: {e}")
+                raise
+
+        # Build a client owned by this instance rather than the one cached on the
+        # firebase app, so a forked worker never reuses its parent's gRPC channel
+        super().__init__(firestore.Client(
+            credentials=app.credential.get_credential(),
+            project=app.project_id
+        ))
+        self._transactional = firestore.transactional
+
+    def run_transaction(self, callback: Callable):
+        """Run callback(transaction) in a Firestore transaction, retrying on contention"""
+        return self._transactional(callback)(self.client.transaction())
+
+
+class LocalBackend(StorageBackend):
+    """In-process document store for load tests and offline benchmarks.
+
+    A MemoryStore keeps each process's data in RAM and starts empty; a
+    SqliteStore persists to a file shared by every worker that opens it.
+    Both apply Firestore's query semantics.
+    """
+
+    name = 'local'
+
+    def __init__(self, store=None):
+        from services.local_firestore import LocalFirestoreClient
+        super().__init__(LocalFirestoreClient(store))
+
+    def run_transaction(self, callback: Callable):
+        """Run callback(transaction), retrying if a document it read changed before commit"""
+        return self.client.run_transaction(callback)
+
+
+def create_storage_backend(name: Optional[str] = None) -> StorageBackend:
+    """Build the storage backend named by Config.STORAGE_BACKEND"""
+    name = (name or Config.STORAGE_BACKEND).lower()
+    if name == 'firestore':
+        return FirestoreBackend()
+
+    from services.local_firestore import MemoryStore, SqliteStore
+    if name == 'memory':
+        logger.info("Using in-memory local storage")
+        return LocalBackend(MemoryStore())
+    if name == 'sqlite':
+        logger.info("Using SQLite local storage at %s", Config.STORAGE_SQLITE_PATH)
+        return LocalBackend(SqliteStore(Config.STORAGE_SQLITE_PATH))
+    raise ValueError(f"STORAGE_BACKEND must be one of: {', '.join(STORAGE_BACKENDS)}")
@@ -0,0 +1,243 @@
+import hashlib
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any
+
+import requests
+from google.auth import jwt as google_jwt
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+ID_TOKEN_CERT_URI = 'https://www.googleapis.com/robot/v1/metadata/x509/securetoken@system.gserviceaccount.com'
+ID_TOKEN_ISSUER_PREFIX = 'https://securetoken.google.com/'
+
+_MAX_AGE_PATTERN = re.compile(r'max-age=(\d+)')
+
+
+class TokenRevokedError(Exception):
+    """Raised when a verified token has been revoked or its user disabled"""
+
+
+class CertificateCache:
+    """Process-wide cache of Google's ID token signing certificates.
+
+    Certificates are fetched once and kept for the max-age advertised in the
+    Cache-Control header. A daemon thread refreshes them shortly before they
+    expire so request threads never wait on the certificate endpoint.
+    """
+
+    def __init__(self, cert_url: str = ID_TOKEN_CERT_URI, refresh_margin: int = 300):
+        self.cert_url = cert_url
+        self.refresh_margin = refresh_margin
+        self._certs: Dict[str, str] = {}
+        self._expires_at = 0.0
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        self._session = requests.Session()
+
+    def get_certs(self) -> Dict[str, str]:
+        """Return the current certificates, fetching them if missing or expired"""
+        if self._certs and time.time() < self._expires_at:
+            return self._certs
+
+        with self._lock:
+            if not self._certs or time.time() >= self._expires_at:
+                self._refresh()
+        return self._certs
+
+    def invalidate(self):
+        """Force the next lookup to refetch (e.g. on an unknown key id)"""
+        with self._lock:
+            self._expires_at = 0.0
+
+    def stop(self):
+        """Cancel the background refresh timer"""
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+
+    def _refresh(self):
+        response = self._session.get(self.cert_url, timeout=10)
+        response.raise_for_status()
+
+        max_age = 3600
+        match = _MAX_AGE_PATTERN.search(response.headers.get('Cache-Control', ''))
+        if match:
+            max_age = int(match.group(1))
+
+        self._certs = response.json()
+        self._expires_at = time.time() + max_age
+        logger.info("Fetched %s token signing certificates (max-age=%ss)", len(self._certs), max_age)
+        self._schedule_refresh(max_age)
+
+    def _schedule_refresh(self, max_age: int):
+        self.stop()
+        delay = max(max_age - self.refresh_margin, 60)
+        self._timer = threading.Timer(delay, self._background_refresh)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _background_refresh(self):
+        try:
+            with self._lock:
+                self._refresh()
+        except Exception as e:
+            # Keep serving the cached certificates; get_certs retries once they expire
+            logger.error(f"Background certificate refresh failed: {e}")
+
+
+class TokenVerifier:
+    """Verifies Firebase ID tokens locally and caches the verified claims.
+
+    Verified tokens are kept in an LRU keyed by the SHA-256 digest of the raw
+    token, and each entry expires at the token's own ``exp`` claim.
+    """
+
+    def __init__(self, project_id: Optional[str] = None, cache_size: int = 1024,
+                 clock_skew: int = 0, certificate_cache: Optional[CertificateCache] = None):
+        self._project_id = project_id
+        self.cache_size = cache_size
+        self.clock_skew = clock_skew
+        self.certificates = certificate_cache or CertificateCache()
+        self._cache: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.revocation_checks = 0
+
+    @property
+    def project_id(self) -> Optional[str]:
+        if not self._project_id:
+            import firebase_admin
+            try:
+                self._project_id = firebase_admin.get_app().project_id
+            except ValueError:
+                # firebase_admin hasn't been initialized
+                pass
+        return self._project_id
+
+    def verify(self, id_token: str, check_revoked: bool = False) -> Dict[str, Any]:
+        """Return the decoded claims for an ID token, raising ValueError if invalid"""
+        digest = hashlib.sha256(id_token.encode('utf-8')).hexdigest()
+
+        claims = self._cache_get(digest)
+        if claims is None:
+            claims = self._verify_signature(id_token)
+            self._cache_put(digest, claims)
+
+        if check_revoked:
+            self._check_revoked(claims)
+
+        return claims
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache counters"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'revocation_checks': self.revocation_checks,
+                'size': len(self._cache),
+                'max_size': self.cache_size
+            }
+
+    def clear(self):
+        """Drop all cached tokens"""
+        with self._lock:
+            self._cache.clear()
+
+    def _cache_get(self, digest: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            claims = self._cache.get(digest)
+            if claims is not None and claims['exp'] > time.time():
+                self._cache.move_to_end(digest)
+                self.hits += 1
+                return claims
+
+            if claims is not None:
+                del self._cache[digest]
+            self.misses += 1
+            return None
+
+    def _cache_put(self, digest: str, claims: Dict[str, Any]):
+        if self.cache_size <= 0:
+            return
+        with self._lock:
+            self._cache[digest] = claims
+            self._cache.move_to_end(digest)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _verify_signature(self, id_token: str) -> Dict[str, Any]:
+        project_id = self.project_id
+        if not project_id:
+            raise ValueError('Firebase project ID is not configured')
+
+        header = google_jwt.decode_header(id_token)
+        if header.get('alg') != 'RS256':
+            raise ValueError(f"Unexpected token algorithm: {header.get('alg')}")
+
+        certs = self.certificates.get_certs()
+        if header.get('kid') not in certs:
+            # Google rotated its keys before our cached copy expired
+            self.certificates.invalidate()
+            certs = self.certificates.get_certs()
+
+        claims = google_jwt.decode(
+            id_token,
+            certs=certs,
+            audience=project_id,
+            clock_skew_in_seconds=self.clock_skew
+        )
+
+        if claims.get('iss') != ID_TOKEN_ISSUER_PREFIX + project_id:
+            raise ValueError(f"Unexpected token issuer: {claims.get('iss')}")
+
+        subject = claims.get('sub')
+        if not isinstance(subject, str) or not subject or len(subject) > 128:
+            raise ValueError('Token has an invalid "sub" claim')
+
+        claims['uid'] = subject
+        return claims
+
+    def _check_revoked(self, claims: Dict[str, Any]):
+        from firebase_admin import auth
+
+        with self._lock:
+            self.revocation_checks += 1
+
+        try:
+            user = auth.get_user(claims['uid'])
+        except auth.UserNotFoundError:
+            raise TokenRevokedError(f"User {claims['uid']} no longer exists")
+        if user.disabled:
+            raise TokenRevokedError(f"User {claims['uid']} is disabled")
+
+        # Compared with iat like the Admin SDK does: tokens refreshed after the
+        # revocation are valid even though they keep the original auth_time
+        valid_since = (user.tokens_valid_after_timestamp or 0) / 1000
+        if claims.get('iat', 0) < valid_since:
+            raise TokenRevokedError(f"Token for user {claims['uid']} has been revoked")
+
+
+_verifier: Optional[TokenVerifier] = None
+_verifier_lock = threading.Lock()
+
+
+def get_token_verifier() -> TokenVerifier:
+    """Return the process-wide token verifier"""
+    global _verifier
+    if _verifier is None:
+        with _verifier_lock:
+            if _verifier is None:
+                _verifier = TokenVerifier(
+                    project_id=Config.FIREBASE_PROJECT_ID,
+                    cache_size=Config.TOKEN_CACHE_SIZE,
+                    clock_skew=Config.TOKEN_CLOCK_SKEW_SECONDS
+                )
+    return _verifier
@@ -0,0 +1,388 @@
+import atexit
+import contextvars
+import json
+import logging
+import os
+import queue
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+from flask import Flask, g, request
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: only a single development process writes the trace file
+    fcntl = None
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = 'scholarship-backend'
+
+# OTLP span kinds
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+
+# WSGI environ key set on the request a worker sends itself while warming up
+# (see services.startup); it is left out of traces, metrics and profiles.
+# Being outside the HTTP headers, clients can't set it.
+WARM_UP_ENVIRON_KEY = 'scholarship.warm_up'
+
+# W3C trace context: version-traceid-parentid-flags
+_TRACEPARENT = re.compile(r'^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$')
+
+_current_trace: contextvars.ContextVar[Optional['Trace']] = contextvars.ContextVar('trace', default=None)
+_current_span: contextvars.ContextVar[Optional['Span']] = contextvars.ContextVar('span', default=None)
+
+
+class Span:
+    """One timed operation within a trace"""
+
+    __slots__ = ('trace', 'span_id', 'parent_id', 'name', 'kind', 'start_ns', 'end_ns', 'attributes', 'error')
+
+    def __init__(self, trace: 'Trace', name: str, parent_id: Optional[str], attributes: Dict[str, Any],
+                 kind: int = SPAN_KIND_INTERNAL):
+        self.trace = trace
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.attributes = attributes
+        self.error = None
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def end(self):
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+            self.trace.add(self)
+
+
+class _NoopSpan:
+    """Returned when the request isn't sampled, so callers never need to check"""
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+    def end(self):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Trace:
+    """Spans finished so far for one sampled request; fan-out threads add to it concurrently"""
+
+    def __init__(self, trace_id: str, sampled: bool, remote_parent_id: Optional[str] = None):
+        self.trace_id = trace_id
+        self.sampled = sampled
+        self.remote_parent_id = remote_parent_id
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    def add(self, span: Span):
+        with self._lock:
+            self.spans.append(span)
+
+
+def _parent_id(trace: Trace) -> Optional[str]:
+    parent = _current_span.get()
+    return parent.span_id if parent is not None and parent.trace is trace else trace.remote_parent_id
+
+
+def start_span(name: str, kind: int = SPAN_KIND_INTERNAL, **attributes):
+    """Start a span that the caller ends explicitly; it never becomes the current span.
+
+    Used around generators, whose body runs in whatever context consumes them.
+    """
+    trace = _current_trace.get()
+    if trace is None or not trace.sampled:
+        return NOOP_SPAN
+    return Span(trace, name, _parent_id(trace), attributes, kind)
+
+
+@contextmanager
+def span(name: str, kind: int = SPAN_KIND_INTERNAL, **attributes):
+    """Trace the enclosed block as a child of the current span"""
+    trace = _current_trace.get()
+    if trace is None or not trace.sampled:
+        yield NOOP_SPAN
+        return
+
+    current = Span(trace, name, _parent_id(trace), attributes, kind)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _current_span.reset(token)
+        current.end()
+
+
+def current_trace_id() -> Optional[str]:
+    """Trace id of the request being handled, sampled or not"""
+    trace = _current_trace.get()
+    return trace.trace_id if trace is not None else None
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+
+def _otlp_span(span: Span) -> Dict[str, Any]:
+    data = {
+        'traceId': span.trace.trace_id,
+        'spanId': span.span_id,
+        'name': span.name,
+        'kind': span.kind,
+        'startTimeUnixNano': str(span.start_ns),
+        'endTimeUnixNano': str(span.end_ns),
+        'attributes': [{'key': key, 'value': _otlp_value(value)} for key, value in span.attributes.items()],
+        'status': {'code': 2, 'message': span.error} if span.error else {'code': 1}
+    }
+    if span.parent_id:
+        data['parentSpanId'] = span.parent_id
+    return data
+
+
+class FileSpanExporter:
+    """Appends finished traces to a file as lines of OTLP/JSON.
+
+    Every line is an ExportTraceServiceRequest, so it can be replayed into
+    an OpenTelemetry collector or read with jq. export() only queues the
+    trace; a background thread serializes and writes it, so requests never
+    wait on the file. When the queue is full the trace is dropped and
+    counted. Once the file reaches max_bytes it is rotated, keeping
+    backup_count old files; an flock on <path>.lock lets every worker
+    process share the file.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 0, backup_count: int = 0, queue_size: int = 1000):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.queue_size = queue_size
+        self.dropped = 0
+        self._queue: Optional[queue.Queue] = None
+        self._thread: Optional[threading.Thread] = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        # Started lazily, so a worker forked from a preloading master gets its own thread
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                self._queue = queue.Queue(maxsize=self.queue_size)
+                self._thread = threading.Thread(target=self._run, name='trace-exporter', daemon=True)
+                self._thread.start()
+                self._pid = os.getpid()
+
+    def export(self, trace: Trace):
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(trace)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+
+    def stop(self, timeout: float = 5):
+        """Write out every queued trace and stop the background thread"""
+        if self._pid != os.getpid():
+            return
+        self._queue.put(None)
+        self._thread.join(timeout)
+        self._pid = None
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            traces = [self._queue.get()]
+            # Write whatever else is already queued in the same pass
+            while len(traces) < 100:
+                try:
+                    traces.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stopping = None in traces
+            traces = [trace for trace in traces if trace is not None]
+
+            with self._lock:
+                dropped, self.dropped = self.dropped, 0
+            if dropped:
+                logger.warning("%d traces dropped, the trace export queue was full", dropped)
+            if traces:
+                self._write(''.join(self._line(trace) + '\n' for trace in traces))
+
+    def _line(self, trace: Trace) -> str:
+        with trace._lock:
+            spans = [_otlp_span(span) for span in trace.spans]
+        return json.dumps({
+            'resourceSpans': [{
+                'resource': {'attributes': [
+                    {'key': 'service.name', 'value': {'stringValue': SERVICE_NAME}},
+                    {'key': 'process.pid', 'value': {'intValue': str(os.getpid())}}
+                ]},
+                'scopeSpans': [{'scope': {'name': __name__}, 'spans': spans}]
+            }]
+        }, separators=(',', ':'))
+
+    def _write(self, data: str):
+        try:
+            with open(f"{self.path}.lock", 'a') as lock:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_EX)
+                if self.max_bytes and os.path.exists(self.path) and \
+                        os.path.getsize(self.path) + len(data) > self.max_bytes:
+                    self._rotate()
+                with open(self.path, 'a') as f:
+                    f.write(data)
+        except OSError as e:
+            logger.error(f"Failed to export traces: {e}")
+
+    def _rotate(self):
+        for index in range(self.backup_count - 1, 0, -1):
+            source = f"{self.path}.{index}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{index + 1}")
+        if self.backup_count:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+
+_exporter: Optional[FileSpanExporter] = None
+
+
+class _RateLimiter:
+    """Token bucket allowing `rate` events per second, with bursts of up to one second's worth"""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.capacity = max(rate, 1) if rate > 0 else 0
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self._tokens + (now - self._updated) * self.rate, self.capacity)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+
+_parent_sampled_limiter: Optional[_RateLimiter] = None
+
+
+def _sample(parent_sampled: Optional[bool]) -> bool:
+    """Decide whether to record a request's trace.
+
+    A caller can ask for its trace to be recorded with the traceparent
+    sampled flag, but anyone can set that flag, so only
+    TRACE_PARENT_SAMPLED_PER_SECOND such requests per process are recorded
+    on the caller's say-so; beyond that the local TRACE_SAMPLE_RATE applies.
+    A caller that isn't recording its trace is never overridden.
+    """
+    if parent_sampled is False:
+        return False
+    if parent_sampled and _parent_sampled_limiter is not None and _parent_sampled_limiter.allow():
+        return True
+    return random.random() < Config.TRACE_SAMPLE_RATE
+
+
+def is_warm_up_request() -> bool:
+    """Whether the current request is a worker's own warm-up request"""
+    return bool(request.environ.get(WARM_UP_ENVIRON_KEY))
+
+
+def _start_trace():
+    if is_warm_up_request():
+        return
+    match = _TRACEPARENT.match(request.headers.get('traceparent', ''))
+    if match:
+        # Continue the caller's trace
+        trace = Trace(match.group(1), _sample(bool(int(match.group(3), 16) & 1)), match.group(2))
+    else:
+        trace = Trace(os.urandom(16).hex(), _sample(None))
+
+    _current_trace.set(trace)
+    _current_span.set(None)
+    root = start_span(
+        f"{request.method} {request.url_rule.rule if request.url_rule else 'unmatched'}",
+        SPAN_KIND_SERVER,
+        **{'http.method': request.method, 'http.target': request.path}
+    )
+    if root is not NOOP_SPAN:
+        _current_span.set(root)
+    g.trace_root = root
+
+
+def _finish_trace(response):
+    trace = _current_trace.get()
+    if trace is not None:
+        response.headers[Config.TRACE_ID_HEADER] = trace.trace_id
+        g.get('trace_root', NOOP_SPAN).set_attribute('http.status_code', response.status_code)
+    return response
+
+
+def _end_trace(error=None):
+    trace = _current_trace.get()
+    if trace is None:
+        return
+    root = g.pop('trace_root', NOOP_SPAN)
+    if error is not None and root is not NOOP_SPAN:
+        root.error = f"{type(error).__name__}: {error}"
+    root.end()
+    if trace.sampled and _exporter is not None:
+        _exporter.export(trace)
+    _current_trace.set(None)
+    _current_span.set(None)
+
+
+def stop_tracing():
+    """Write out every queued trace and stop the exporter thread"""
+    if _exporter is not None:
+        _exporter.stop()
+
+
+def init_tracing(app: Flask):
+    """Give every request a trace id (returned in Config.TRACE_ID_HEADER) and export sampled traces"""
+    global _exporter, _parent_sampled_limiter
+    if not Config.TRACING_ENABLED:
+        return
+
+    if _exporter is None:
+        atexit.register(stop_tracing)
+    else:
+        _exporter.stop()
+    _exporter = FileSpanExporter(
+        Config.TRACE_EXPORT_PATH, Config.TRACE_MAX_BYTES, Config.TRACE_BACKUP_COUNT, Config.TRACE_QUEUE_SIZE
+    )
+    _parent_sampled_limiter = _RateLimiter(Config.TRACE_PARENT_SAMPLED_PER_SECOND)
+    app.before_request(_start_trace)
+    app.after_request(_finish_trace)
+    app.teardown_request(_end_trace)
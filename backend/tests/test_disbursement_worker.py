@@ -0,0 +1,129 @@
+"""Tests for the disbursement worker in services.disbursement_queue. Run from the backend directory:
+
+    python -m unittest discover tests
+"""
+import unittest
+from datetime import datetime, timezone
+from unittest import mock
+
+from stellar_sdk import Account, Keypair
+from stellar_sdk.client.response import Response
+from stellar_sdk.exceptions import NotFoundError
+
+from config import Config
+from services.disbursement_queue import (
+    JOB_CONFIRMED, JOB_FAILED, JOB_SUBMITTED, DisbursementWorker, enqueue_disbursement
+)
+from services.firebase_service import FirebaseService
+from services.local_firestore import MemoryStore
+from services.stellar_service import StellarService
+from services.storage import LocalBackend
+
+
+class FakeHorizon:
+    """Accepts every transaction and remembers it; lose_responses makes submissions land without an answer"""
+
+    def __init__(self):
+        self.submitted = []
+        self.landed = {}
+        self.lose_responses = False
+
+    def load_account(self, public_key: str) -> Account:
+        return Account(public_key, 100)
+
+    def submit_transaction(self, envelope):
+        self.submitted.append(envelope)
+        if self.lose_responses:
+            raise ConnectionError('connection reset')
+        record = {'hash': envelope.hash_hex(), 'successful': True}
+        self.landed[record['hash']] = record
+        return record
+
+    def transactions(self):
+        horizon = self
+
+        class _Builder:
+            def transaction(self, transaction_hash: str):
+                self.transaction_hash = transaction_hash
+                return self
+
+            def call(self):
+                record = horizon.landed.get(self.transaction_hash)
+                if record is None:
+                    raise NotFoundError(Response(404, '{}', {}, ''))
+                return record
+
+        return _Builder()
+
+    def close(self):
+        pass
+
+
+class DisbursementWorkerTest(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.multiple(Config, ADMIN_SECRET_KEY=Keypair.random().secret, STELLAR_CHANNEL_SECRETS=[])
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.firebase = FirebaseService(LocalBackend(MemoryStore()))
+        self.horizon = FakeHorizon()
+        self.stellar = StellarService(server=self.horizon, firebase_service=self.firebase)
+        self.worker = DisbursementWorker(self.firebase, self.stellar, concurrency=2)
+        self.addCleanup(self.worker.stop)
+
+    def _approved_application(self, amount: float = 10.0) -> str:
+        wallet = Keypair.random().public_key
+        application_id = self.firebase.create_application({
+            'student_wallet': wallet, 'student_name': 'Student', 'status': 'approved',
+            'scholarship_amount_requested': amount, 'applied_at': datetime.now(timezone.utc)
+        })
+        application = self.firebase.get_application(application_id)
+        enqueue_disbursement(self.firebase, application, amount, '', 'admin')
+        return application_id
+
+    def test_one_round_pays_every_job_in_one_transaction(self):
+        application_ids = [self._approved_application(amount) for amount in (10.0, 20.0, 30.0)]
+
+        self.assertEqual(self.worker.run_once(), 3)
+
+        self.assertEqual(len(self.horizon.submitted), 1)
+        self.assertEqual(len(self.horizon.submitted[0].transaction.operations), 3)
+        transaction_hash = self.horizon.submitted[0].hash_hex()
+        for application_id in application_ids:
+            job = self.firebase.get_disbursement_job(application_id)
+            self.assertEqual(job['status'], JOB_CONFIRMED)
+            self.assertEqual(job['transaction_hash'], transaction_hash)
+            self.assertEqual(self.firebase.get_application(application_id)['status'], 'disbursed')
+        self.assertEqual(self.firebase.get_contract_stats(use_cache=False)['total_scholarships'], 3)
+
+    def test_unanswered_submission_keeps_the_hash_and_waits(self):
+        application_ids = [self._approved_application() for _ in range(2)]
+        self.horizon.lose_responses = True
+
+        self.assertEqual(self.worker.run_once(), 2)
+
+        transaction_hash = self.horizon.submitted[0].hash_hex()
+        for application_id in application_ids:
+            job = self.firebase.get_disbursement_job(application_id)
+            self.assertEqual(job['status'], JOB_SUBMITTED)
+            self.assertEqual(job['transaction_hash'], transaction_hash)
+            self.assertGreater(job['next_attempt_at'], datetime.now(timezone.utc))
+            self.assertEqual(self.firebase.get_application(application_id)['status'], 'approved')
+        # Nothing is due until the submission has had time to land
+        self.assertEqual(self.worker.run_once(), 0)
+        self.assertEqual(len(self.horizon.submitted), 1)
+
+    def test_job_whose_application_moved_on_is_failed_and_not_paid(self):
+        paid_id = self._approved_application()
+        rejected_id = self._approved_application()
+        self.firebase.update_application(rejected_id, {'status': 'rejected'})
+
+        self.assertEqual(self.worker.run_once(), 2)
+
+        self.assertEqual(len(self.horizon.submitted[0].transaction.operations), 1)
+        self.assertEqual(self.firebase.get_disbursement_job(paid_id)['status'], JOB_CONFIRMED)
+        self.assertEqual(self.firebase.get_disbursement_job(rejected_id)['status'], JOB_FAILED)
+
+
+if __name__ == '__main__':
+    unittest.main()
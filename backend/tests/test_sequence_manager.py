@@ -0,0 +1,106 @@
+"""Tests for services.sequence_manager. Run from the backend directory:
+
+    python -m unittest discover tests
+"""
+import threading
+import time
+import unittest
+
+from stellar_sdk import Account, Keypair
+
+from services.sequence_manager import ChannelPool, SequenceManager
+
+
+class FakeHorizon:
+    """Answers load_account with a fixed sequence per account and counts the calls"""
+
+    def __init__(self, sequence: int = 100):
+        self.sequence = sequence
+        self.loads = 0
+
+    def load_account(self, public_key: str) -> Account:
+        self.loads += 1
+        return Account(public_key, self.sequence)
+
+
+class SequenceManagerTest(unittest.TestCase):
+    def setUp(self):
+        self.server = FakeHorizon()
+        self.manager = SequenceManager(self.server, Keypair.random().public_key)
+
+    def test_reserve_hands_out_consecutive_sequences_from_one_load(self):
+        sequences = []
+        for _ in range(3):
+            with self.manager.reserve() as account:
+                sequences.append(account.sequence)
+
+        self.assertEqual(sequences, [100, 101, 102])
+        self.assertEqual(self.server.loads, 1)
+
+    def test_resync_reloads_from_horizon(self):
+        with self.manager.reserve():
+            pass
+        self.server.sequence = 250
+        self.manager.resync()
+
+        with self.manager.reserve() as account:
+            self.assertEqual(account.sequence, 250)
+        self.assertEqual(self.server.loads, 2)
+
+    def test_reserve_holds_the_account_until_the_block_ends(self):
+        order = []
+
+        def submit(name: str, delay: float):
+            with self.manager.reserve() as account:
+                order.append((name, 'start', account.sequence))
+                time.sleep(delay)
+                order.append((name, 'end', account.sequence))
+
+        with self.manager.reserve():
+            # Both threads wait for this reservation, then run one at a time
+            threads = [threading.Thread(target=submit, args=(name, 0.02)) for name in ('a', 'b')]
+            for thread in threads:
+                thread.start()
+            time.sleep(0.05)
+            self.assertEqual(order, [])
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual([event for _, event, _ in order], ['start', 'end', 'start', 'end'])
+        self.assertEqual(sorted(sequence for _, event, sequence in order if event == 'start'), [101, 102])
+
+
+class ChannelPoolTest(unittest.TestCase):
+    def setUp(self):
+        self.secrets = [Keypair.random().secret for _ in range(4)]
+        self.public_keys = [Keypair.from_secret(secret).public_key for secret in self.secrets]
+
+    def _channels(self, pool: ChannelPool):
+        return sorted(keypair.public_key for keypair, _ in pool._available.queue)
+
+    def test_workers_get_disjoint_channels(self):
+        pools = [ChannelPool(FakeHorizon(), self.secrets, index, 2) for index in range(2)]
+
+        self.assertEqual(self._channels(pools[0]), sorted(self.public_keys[0::2]))
+        self.assertEqual(self._channels(pools[1]), sorted(self.public_keys[1::2]))
+
+    def test_more_workers_than_channels_share_one(self):
+        pool = ChannelPool(FakeHorizon(), self.secrets[:2], worker_index=3, worker_count=5)
+
+        self.assertEqual(pool.size, 1)
+        self.assertEqual(self._channels(pool), [self.public_keys[1]])
+
+    def test_acquire_leases_a_channel_exclusively(self):
+        pool = ChannelPool(FakeHorizon(), self.secrets[:1], acquire_timeout=0.05)
+
+        with pool.acquire() as (keypair, _):
+            self.assertEqual(keypair.public_key, self.public_keys[0])
+            with self.assertRaises(TimeoutError):
+                with pool.acquire():
+                    pass
+        with pool.acquire() as (keypair, _):
+            self.assertEqual(keypair.public_key, self.public_keys[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+"""Tests for services.sharded_counter. Run from the backend directory:
+
+    python -m unittest discover tests
+"""
+import unittest
+
+from services.local_firestore import LocalFirestoreClient, MemoryStore
+from services.sharded_counter import ShardedCounter
+
+
+class ShardedCounterTest(unittest.TestCase):
+    def setUp(self):
+        self.db = LocalFirestoreClient(MemoryStore())
+        self.counter = ShardedCounter(
+            self.db.collection('stats').document('dashboard'), ['total', 'by_status'], num_shards=4, cache_seconds=0
+        )
+
+    def _increment(self, deltas):
+        batch = self.db.batch()
+        self.counter.increment(batch, deltas)
+        batch.commit()
+
+    def test_read_sums_numbers_and_maps_across_shards(self):
+        self.db.collection('stats').document('dashboard').set({'total': 10, 'by_status': {'pending': 10}})
+        for _ in range(20):
+            self._increment({'total': 1, 'by_status': {'pending': 1, 'approved': 0}})
+        self._increment({'by_status': {'pending': -1, 'approved': 1}})
+
+        self.assertEqual(self.counter.read(), {'total': 30, 'by_status': {'pending': 29, 'approved': 1}})
+
+    def test_reset_replaces_the_base_and_drops_the_shards(self):
+        for _ in range(10):
+            self._increment({'total': 1})
+
+        batch = self.db.batch()
+        self.counter.reset(batch, {'total': 3})
+        batch.commit()
+
+        self.assertEqual(self.counter.read(), {'total': 3})
+        self.assertEqual(list(self.counter.doc_ref.collection('shards').stream()), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
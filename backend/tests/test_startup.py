@@ -0,0 +1,25 @@
+"""Tests for services.startup. Run from the backend directory:
+
+    python -m unittest discover tests
+"""
+import subprocess
+import sys
+import unittest
+
+from services.startup import PRELOAD_MODULES
+
+
+class LazyImportTest(unittest.TestCase):
+    def test_create_app_leaves_the_preload_modules_unimported(self):
+        # A fresh interpreter, since this one may already have imported them
+        script = (
+            'import sys, app\n'
+            'app.create_app()\n'
+            f'print("loaded:", [name for name in {PRELOAD_MODULES!r} if name in sys.modules])\n'
+        )
+        output = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True).stdout
+        self.assertEqual(output.strip().splitlines()[-1], 'loaded: []')
+
+
+if __name__ == '__main__':
+    unittest.main()
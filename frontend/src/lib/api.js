@@ -294,7 +294,23 @@ class ApiClient {
   }
 
   async exportStatistics(format = 'csv', timeframe = 'all') {
-    return this.request(`/api/admin/export/statistics?format=${format}&timeframe=${timeframe}`);
+    // The export is a file download, not a JSON response
+    try {
+      const token = localStorage.getItem('authToken');
+      const response = await fetch(
+        `${this.baseUrl}/api/admin/export/statistics?format=${format}&timeframe=${timeframe}`,
+        { headers: token ? { Authorization: `Bearer ${token}` } : {} }
+      );
+
+      if (!response.ok) {
+        const errorData = await response.json().catch(() => ({}));
+        return { error: errorData.error || `HTTP error! status: ${response.status}` };
+      }
+
+      return { data: await response.blob() };
+    } catch (error) {
+      return { error: error instanceof Error ? error.message : 'Export failed' };
+    }
   }
 
   async getSystemSettings() {